@@ -0,0 +1,175 @@
+"""Executor Node: Tool Selection 결과의 MCP 도구들을 병렬 실행"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from src.llm_scheduler import llm_priority
+from src.mcp_client import get_mcp_pool
+from src.state_schemas import AnalysisState, ExecutionResults
+
+# Tool Selection이 축약명을 쓰는 경우 MCP 도구명으로 변환
+TOOL_ALIASES = {
+    "correlation": "correlation_analysis",
+    "regression": "regression_analysis",
+    "anova": "anova_test",
+    "t-test": "t_test",
+    "ttest": "t_test",
+    "chi-square": "chi_square_test",
+    "chi_square": "chi_square_test",
+    "pca": "pca_analysis",
+    "time_series": "time_series_analysis",
+    "control_chart": "control_chart_analysis",
+    "plot_generator": "generate_plot",
+}
+
+# 동시에 실행할 최대 도구 호출 수
+EXECUTOR_MAX_FANOUT = int(os.getenv("EXECUTOR_MAX_FANOUT", "8"))
+# 도구 1회 호출 타임아웃 (초)
+EXECUTOR_TOOL_TIMEOUT = float(os.getenv("EXECUTOR_TOOL_TIMEOUT_SEC", "300"))
+
+
+async def executor_node(state: AnalysisState) -> AnalysisState:
+    """
+    state["tools"]["assignments"]의 각 도구를 MCP로 실행하여 state["execution"]을 채웁니다.
+
+    - 분석 데이터는 text_to_sql로 한 번만 조회하여 모든 도구 호출에 columnar 형식으로 전달
+      (state["sampling"]이 있으면 표본 조회, 표본 메타데이터를 payload에 함께 실어 도구가 보정된 CI 보고)
+    - 독립적인 도구 호출은 EXECUTOR_MAX_FANOUT 한도 내에서 동시 실행
+    - 개별 호출 실패는 해당 결과만 failed로 기록 (다른 호출은 계속 실행)
+    - 체크포인트에서 복원된 이전 실행 결과 중 같은 호출의 성공 결과는 재사용
+    """
+    if state.get("tools") is None:
+        raise ValueError("tools is missing")
+    if state.get("columns") is None:
+        raise ValueError("columns is missing")
+
+    pool = get_mcp_pool()
+    assignments = state["tools"]["assignments"]
+    start = time.perf_counter()
+
+    # 재분석 시 이전 실행에서 성공한 동일 호출은 재실행하지 않음
+    previous = {
+        r["assignment_key"]: r
+        for r in ((state.get("execution") or {}).get("results") or [])
+        if r.get("status") == "success" and r.get("assignment_key")
+    }
+    pending = [a for a in assignments if assignment_key(a) not in previous]
+
+    dataset = None
+    if any(_needs_data(a) for a in pending):
+        dataset = await _fetch_dataset(pool, state)
+
+    semaphore = asyncio.Semaphore(EXECUTOR_MAX_FANOUT)
+    results = await asyncio.gather(*[
+        _reuse(previous[assignment_key(assignment)], f"exec_{i + 1:03d}")
+        if assignment_key(assignment) in previous
+        else _run_assignment(pool, semaphore, f"exec_{i + 1:03d}", assignment, state, dataset)
+        for i, assignment in enumerate(assignments)
+    ])
+
+    success = sum(1 for r in results if r["status"] == "success")
+    execution: ExecutionResults = {
+        "results": results,
+        "summary": {
+            "total": len(results),
+            "success": success,
+            "failed": len(results) - success,
+            "wall_time": round(time.perf_counter() - start, 3),
+        },
+    }
+    return {**state, "execution": execution}
+
+
+async def _run_assignment(pool, semaphore, execution_id: str, assignment: dict, state: AnalysisState, dataset) -> dict:
+    tool_name = TOOL_ALIASES.get(assignment["tool_name"], assignment["tool_name"])
+    result = {
+        "execution_id": execution_id,
+        "assignment_key": assignment_key(assignment),
+        "tool_name": tool_name,
+        "column_name": assignment.get("column_name"),
+        "output": {},
+        "status": "failed",
+        "error": None,
+        "duration": 0.0,
+    }
+
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            if isinstance(dataset, Exception) and _needs_data(assignment):
+                raise dataset
+            arguments = _build_arguments(tool_name, assignment, state, dataset)
+            result["output"] = await pool.call_tool(tool_name, arguments, timeout=EXECUTOR_TOOL_TIMEOUT)
+            result["status"] = "success"
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+        finally:
+            result["duration"] = round(time.perf_counter() - start, 3)
+
+    return result
+
+
+async def _reuse(previous: dict, execution_id: str) -> dict:
+    return {**previous, "execution_id": execution_id, "duration": 0.0, "reused": True}
+
+
+def assignment_key(assignment: dict) -> str:
+    """같은 도구 호출인지 판별하는 키 (도구명, 컬럼, params, options 기준)"""
+    tool_name = TOOL_ALIASES.get(assignment["tool_name"], assignment["tool_name"])
+    payload = [tool_name, assignment.get("column_name"), assignment.get("params"), assignment.get("options")]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _needs_data(assignment: dict) -> bool:
+    tool_name = TOOL_ALIASES.get(assignment["tool_name"], assignment["tool_name"])
+    return tool_name != "text_to_sql" and "data" not in assignment.get("params", {})
+
+
+def _build_arguments(tool_name: str, assignment: dict, state: AnalysisState, dataset: dict | None) -> dict:
+    """assignment["params"]가 있으면 우선 사용하고, 없으면 문제 정의에서 기본 인자 구성"""
+    arguments = dict(assignment.get("params") or {})
+
+    if tool_name == "text_to_sql":
+        arguments.setdefault("natural_query", assignment.get("rationale", ""))
+        arguments.setdefault("priority", llm_priority.get())
+        return arguments
+
+    if tool_name != "generate_plot":
+        arguments.setdefault("target", state["problem"]["affected_parameter"])
+        arguments.setdefault("features", [assignment["column_name"]] if assignment.get("column_name") else [])
+        if assignment.get("options"):
+            arguments.setdefault("options", assignment["options"])
+
+    if "data" not in arguments:
+        arguments["data"] = dataset
+    return arguments
+
+
+async def _fetch_dataset(pool, state: AnalysisState) -> dict | Exception:
+    """후보 컬럼 데이터를 text_to_sql로 한 번 조회하여 columnar payload로 변환"""
+    try:
+        problem = state["problem"]
+        column_names = [c["column_name"] for c in state["columns"]["columns"]]
+        query = (
+            f"{problem['equipment_id']} 장비의 {problem['start_time']} ~ {problem['end_time']} 기간 "
+            f"{', '.join([problem['affected_parameter']] + column_names)} 조회"
+        )
+        arguments = {"natural_query": query, "priority": llm_priority.get()}
+        if state.get("sampling"):
+            arguments["sampling"] = state["sampling"]
+        output = await pool.call_tool("text_to_sql", arguments, timeout=EXECUTOR_TOOL_TIMEOUT)
+        # 응답 변환 실패(data 누락 등)도 예외로 돌려 데이터가 필요한 호출만 failed로 기록
+        dataset = rows_to_columnar(output["data"], output.get("columns"))
+        if output.get("sampling"):
+            dataset["sampling"] = output["sampling"]
+        return dataset
+    except Exception as e:
+        return e
+
+
+def rows_to_columnar(rows: list[dict], columns: list[str] | None = None) -> dict:
+    """행 단위 list[dict]를 MCP 도구의 columnar 입력 형식으로 변환"""
+    columns = columns or (list(rows[0].keys()) if rows else [])
+    return {"columns": {col: [row.get(col) for row in rows] for col in columns}}
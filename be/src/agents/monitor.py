@@ -0,0 +1,262 @@
+"""Monitor Node: watermark 기반 증분 SPC 감시"""
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+from dotenv import load_dotenv
+
+from src.state_schemas import AnalysisState
+
+load_dotenv()
+
+# 감시 주기 (초, 0이면 주기 실행 안 함)
+MONITOR_INTERVAL_SEC = float(os.getenv("MONITOR_INTERVAL_SEC", "0"))
+# watermark가 없는 신규 파라미터의 최초 조회 구간 (초)
+MONITOR_INITIAL_LOOKBACK_SEC = float(os.getenv("MONITOR_INITIAL_LOOKBACK_SEC", "3600"))
+# 관리 한계선 캐시 유지 시간 (초)
+MONITOR_LIMITS_TTL_SEC = float(os.getenv("MONITOR_LIMITS_TTL_SEC", "3600"))
+# 새 포인트를 한 번에 가져올 행 수 (서버 측 커서로 나눠 읽어 메모리 사용량 제한)
+MONITOR_FETCH_BATCH = int(os.getenv("MONITOR_FETCH_BATCH", "10000"))
+
+TREND_POINTS = 7    # 연속 증가/감소
+CYCLE_POINTS = 14   # 교대 증감
+WINDOW_POINTS = 3   # Western Electric Rule 2 (3점 중 2점)
+
+SEVERITY_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+FETCH_SQL = """
+SELECT m.parameter, m.timestamp, m.value
+FROM metrology_data m
+JOIN unnest(CAST(:parameters AS text[]), CAST(:since AS timestamp[])) AS w(parameter, since)
+  ON m.parameter = w.parameter AND m.timestamp > w.since
+ORDER BY m.parameter, m.timestamp
+"""
+
+UPSERT_WATERMARK_SQL = """
+INSERT INTO monitor_watermarks (parameter, last_ts, rule_state, updated_at)
+VALUES (:parameter, :last_ts, CAST(:rule_state AS jsonb), now())
+ON CONFLICT (parameter) DO UPDATE
+SET last_ts = EXCLUDED.last_ts, rule_state = EXCLUDED.rule_state, updated_at = now()
+"""
+
+
+class RuleState:
+    """
+    파라미터별 SPC 룰 상태 (scan 간 이어짐)
+
+    직전 포인트와 연속 증감 카운터만 유지하므로 새 포인트 1개 평가 비용은 이력 길이와 무관합니다.
+    """
+
+    def __init__(self, recent: list | None = None, trend_run: int = 0, trend_sign: int = 0, alt_run: int = 0):
+        self.recent: list[tuple[str, float]] = [tuple(p) for p in (recent or [])]  # 최근 WINDOW_POINTS개
+        self.trend_run = trend_run    # 같은 방향 연속 변화 수
+        self.trend_sign = trend_sign  # +1 증가 / -1 감소
+        self.alt_run = alt_run        # 방향이 교대로 바뀐 연속 변화 수
+
+    def to_dict(self) -> dict:
+        return {"recent": self.recent, "trend_run": self.trend_run,
+                "trend_sign": self.trend_sign, "alt_run": self.alt_run}
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "RuleState":
+        return cls(**(data or {}))
+
+    def update(self, ts: datetime, value: float, limits: dict) -> list[str]:
+        """포인트 1개를 반영하고 새로 위반된 룰 목록을 반환"""
+        violated = []
+        center = limits["center_line"]
+        sigma = (limits["ucl"] - center) / 3 or 1e-12
+        z = (value - center) / sigma
+
+        # Western Electric Rule 1: 1점이 3σ 초과
+        if abs(z) > 3:
+            violated.append("Western Electric Rule 1")
+
+        # Western Electric Rule 2: 연속 3점 중 2점이 같은 쪽 2σ 초과 (현재 점 포함)
+        if abs(z) > 2:
+            side = 1 if z > 0 else -1
+            prev = [(v - center) / sigma for _, v in self.recent[-(WINDOW_POINTS - 1):]]
+            if any(p * side > 2 for p in prev):
+                violated.append("Western Electric Rule 2")
+
+        if self.recent:
+            diff = value - self.recent[-1][1]
+            sign = (diff > 0) - (diff < 0)
+            prev_sign = self.trend_sign
+
+            # 추세: 7점 연속 증가/감소 (연속 구간당 1회만 보고)
+            if sign != 0 and sign == prev_sign:
+                self.trend_run += 1
+            else:
+                self.trend_run = 1 if sign != 0 else 0
+            if self.trend_run == TREND_POINTS - 1:
+                violated.append("Trend Pattern")
+
+            # 주기: 14점 교대 증감
+            if sign != 0 and sign == -prev_sign:
+                self.alt_run += 1
+            else:
+                self.alt_run = 1 if sign != 0 else 0
+            if self.alt_run == CYCLE_POINTS - 1:
+                violated.append("Cyclic Pattern")
+            self.trend_sign = sign
+
+        self.recent = (self.recent + [(ts.isoformat(), value)])[-WINDOW_POINTS:]
+        return violated
+
+
+def _severity(rule_type: str, sigma_level: float) -> str:
+    if rule_type == "Western Electric Rule 1" or sigma_level >= 3:
+        return "high"
+    if rule_type in ("Western Electric Rule 2", "Trend Pattern"):
+        return "medium"
+    return "low"
+
+
+class MonitorEngine:
+    """
+    전체 감시 파라미터를 한 번의 배치 쿼리로 증분 조회하여 SPC 룰을 검사합니다.
+
+    - 파라미터별 watermark(마지막 처리 timestamp)와 룰 상태를 monitor_watermarks에 저장
+    - scan 1회 비용은 새로 들어온 포인트 수에 비례 (이력 재조회 없음)
+    - watermark/룰 상태는 DB 트랜잭션이 commit된 뒤에만 메모리에 반영 (실패 시 다음 scan에서 같은 포인트를 다시 평가)
+    """
+
+    def __init__(self, engine=None):
+        self._engine = engine
+        self._lock = threading.Lock()
+        self._limits: dict[str, dict] = {}
+        self._limits_loaded_at = 0.0
+        self._watermarks: dict[str, datetime] | None = None
+        self._states: dict[str, RuleState] = {}
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from src.db import get_engine
+            self._engine = get_engine()
+        return self._engine
+
+    def scan(self) -> list[dict]:
+        """새 데이터를 조회·평가하고 감지된 trigger 목록을 반환"""
+        from sqlalchemy import text
+
+        with self._lock:
+            with self.engine.begin() as conn:
+                limits = self._load_limits(conn)
+                if self._watermarks is None:
+                    self._load_watermarks(conn)
+
+                default_since = datetime.now() - timedelta(seconds=MONITOR_INITIAL_LOOKBACK_SEC)
+                parameters = list(limits)
+                since = [self._watermarks.get(p, default_since) for p in parameters]
+                result = conn.execute(text(FETCH_SQL).execution_options(stream_results=True),
+                                      {"parameters": parameters, "since": since})
+                batches = iter(lambda: result.fetchmany(MONITOR_FETCH_BATCH), [])
+
+                triggers, watermarks, states = self._evaluate(batches, limits)
+                if watermarks:
+                    conn.execute(text(UPSERT_WATERMARK_SQL), [
+                        {"parameter": p, "last_ts": ts, "rule_state": json.dumps(states[p].to_dict())}
+                        for p, ts in watermarks.items()
+                    ])
+            # commit 성공 후에만 반영
+            self._watermarks.update(watermarks)
+            self._states.update(states)
+        return triggers
+
+    def _evaluate(self, batches, limits: dict[str, dict]) -> tuple[list[dict], dict[str, datetime], dict[str, RuleState]]:
+        """
+        (parameter, timestamp) 순으로 정렬된 새 포인트를 배치 단위로 평가
+
+        Returns:
+            (trigger 목록, 갱신된 파라미터별 watermark, 갱신된 룰 상태) — 기존 self 상태는 변경하지 않음
+        """
+        violations: dict[tuple[str, str], list[tuple[datetime, float]]] = {}
+        watermarks: dict[str, datetime] = {}
+        states: dict[str, RuleState] = {}
+
+        for rows in batches:
+            for parameter, ts, value in rows:
+                watermarks[parameter] = ts
+                state = states.get(parameter)
+                if state is None:
+                    previous = self._states.get(parameter)
+                    state = states[parameter] = RuleState.from_dict(previous.to_dict() if previous else None)
+                if value is None:
+                    continue
+                for rule_type in state.update(ts, float(value), limits[parameter]):
+                    violations.setdefault((parameter, rule_type), []).append((ts, float(value)))
+
+        triggers = []
+        for (parameter, rule_type), points in violations.items():
+            lim = limits[parameter]
+            sigma = (lim["ucl"] - lim["center_line"]) / 3 or 1e-12
+            sigma_level = round(max(abs(v - lim["center_line"]) / sigma for _, v in points), 3)
+            triggers.append({
+                "rule_type": rule_type,
+                "parameter": parameter,
+                "detection_time": points[-1][0],
+                "violated_points": points,
+                "control_limits": dict(lim),
+                "sigma_level": sigma_level,
+                "severity": _severity(rule_type, sigma_level),
+            })
+        triggers.sort(key=lambda t: (SEVERITY_ORDER[t["severity"]], t["sigma_level"]), reverse=True)
+        return triggers, watermarks, states
+
+    def _load_limits(self, conn) -> dict[str, dict]:
+        from sqlalchemy import text
+
+        if not self._limits or time.monotonic() - self._limits_loaded_at > MONITOR_LIMITS_TTL_SEC:
+            rows = conn.execute(text("SELECT parameter, ucl, lcl, center_line FROM spc_control_limits")).fetchall()
+            self._limits = {
+                r.parameter: {"ucl": float(r.ucl), "lcl": float(r.lcl), "center_line": float(r.center_line)}
+                for r in rows
+            }
+            self._limits_loaded_at = time.monotonic()
+        return self._limits
+
+    def _load_watermarks(self, conn) -> None:
+        from sqlalchemy import text
+
+        rows = conn.execute(text("SELECT parameter, last_ts, rule_state FROM monitor_watermarks")).fetchall()
+        self._watermarks = {r.parameter: r.last_ts for r in rows}
+        self._states = {r.parameter: RuleState.from_dict(r.rule_state) for r in rows}
+
+
+_monitor: MonitorEngine | None = None
+
+
+def get_monitor() -> MonitorEngine:
+    global _monitor
+    if _monitor is None:
+        _monitor = MonitorEngine()
+    return _monitor
+
+
+async def monitor_node(state: AnalysisState) -> AnalysisState:
+    """
+    증분 scan 1회를 실행하여 가장 심각한 위반을 trigger로 설정합니다.
+    위반이 없으면 trigger는 None (워크플로우 종료).
+    """
+    triggers = await asyncio.to_thread(get_monitor().scan)
+    return {**state, "trigger": triggers[0] if triggers else None}
+
+
+async def run_monitor_loop(launch: Callable[[dict], object], interval: float = MONITOR_INTERVAL_SEC):
+    """interval마다 scan하여 감지된 trigger마다 launch(trigger)로 워크플로우를 실행"""
+    monitor = get_monitor()
+    while True:
+        started = time.monotonic()
+        try:
+            for trigger in await asyncio.to_thread(monitor.scan):
+                launch(trigger)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[monitor] scan 실패: {e}")
+        await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
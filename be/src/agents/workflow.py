@@ -0,0 +1,106 @@
+"""Orchestrator 워크플로우 실행 진입점 (Job 워커에서 호출)"""
+import uuid
+from typing import AsyncIterator
+
+from src.checkpoints import NODE_OUTPUTS
+from src.schemas import TaskRequest
+from src.state_schemas import AnalysisState
+
+# 컴파일된 LangGraph (StateGraph(AnalysisState).compile()) — Orchestrator 구현 후 set_workflow로 등록
+_workflow = None
+# 재분석(entry_node부터 실행)용으로 checkpointer를 붙여 compile한 그래프
+_resume_graph = None
+
+
+def set_workflow(graph) -> None:
+    global _workflow, _resume_graph
+    _workflow = graph
+    _resume_graph = None
+
+
+def initial_state(request: TaskRequest | None = None, trigger: dict | None = None) -> AnalysisState:
+    """사용자 요청 또는 (병합된) drift 알람 trigger로부터 초기 State 구성"""
+    state: AnalysisState = {
+        "trigger": None,
+        "problem": None,
+        "columns": None,
+        "tools": None,
+        "execution": None,
+        "interpretation": None,
+        "recommendation": None,
+        "history": [],
+        "interactions": [],
+        "report": None,
+        "sampling": None,
+    }
+    if request is not None:
+        state["interactions"] = [{"role": "user", "content": request.user_input,
+                                  "eqp_id": request.eqp_id, "lot_id": request.lot_id}]
+        state["sampling"] = request.sampling
+    if trigger is not None:
+        state["trigger"] = trigger
+    return state
+
+
+async def run_workflow(state: AnalysisState, entry_node: str | None = None) -> AsyncIterator[tuple[str, dict]]:
+    """
+    워크플로우를 실행하며 노드가 끝날 때마다 (노드명, state 업데이트)를 yield
+
+    Args:
+        entry_node: 재분석 시 다시 실행할 첫 노드. 지정하면 state를 직전 노드의 출력으로 기록한 뒤
+                    그 다음 노드(entry_node)부터 실행합니다 (앞쪽 LLM 노드를 다시 실행하지 않음).
+    """
+    if _workflow is None:
+        # TODO: Orchestrator 에이전트 연결 전까지 더미 응답
+        if state.get("trigger"):
+            trigger = state["trigger"]
+            report = f"[더미 응답] {trigger['rule_type']} 감지: {trigger.get('summary') or trigger.get('parameter')}"
+        else:
+            report = f"[더미 응답] 입력: {state['interactions'][0]['content']}"
+        yield "report_generator", {"report": report}
+        return
+
+    previous = _previous_node(entry_node)
+    if previous is None:
+        async for chunk in _workflow.astream(state, stream_mode="updates"):
+            for node, update in chunk.items():
+                yield node, update or {}
+        return
+
+    # 복원한 state를 직전 노드의 출력으로 기록하고, 입력 없이 이어서 실행 → entry_node부터 실행
+    graph = _resumable()
+    config = {"configurable": {"thread_id": f"resume-{uuid.uuid4()}"}}
+    try:
+        await graph.aupdate_state(config, state, as_node=previous)
+        async for chunk in graph.astream(None, config, stream_mode="updates"):
+            for node, update in chunk.items():
+                yield node, update or {}
+    finally:
+        delete = getattr(graph.checkpointer, "delete_thread", None)
+        if delete is not None:
+            delete(config["configurable"]["thread_id"])
+
+
+def _previous_node(entry_node: str | None) -> str | None:
+    """그래프에 있는 노드 중 entry_node 바로 앞 노드 (entry_node가 첫 노드거나 없으면 None)"""
+    if entry_node is None:
+        return None
+    names = [name for name, _ in NODE_OUTPUTS]
+    if entry_node not in names:
+        raise ValueError(f"알 수 없는 노드: {entry_node}")
+    nodes = set(_workflow.get_graph().nodes)
+    if entry_node not in nodes:
+        raise ValueError(f"워크플로우에 '{entry_node}' 노드가 없습니다.")
+    earlier = [name for name in names[:names.index(entry_node)] if name in nodes]
+    return earlier[-1] if earlier else None
+
+
+def _resumable():
+    """중간 노드부터 이어서 실행할 수 있도록 checkpointer가 있는 그래프 반환 (없으면 MemorySaver로 다시 compile)"""
+    global _resume_graph
+    if _workflow.checkpointer is not None:
+        return _workflow
+    if _resume_graph is None:
+        from langgraph.checkpoint.memory import MemorySaver
+        _resume_graph = _workflow.builder.compile(checkpointer=MemorySaver())
+    return _resume_graph
@@ -0,0 +1,136 @@
+"""Drift 알람 병합(coalescing) — 같은 장비/지표의 알람 폭주 시 워크플로우 1회만 실행"""
+import os
+import time
+from datetime import datetime
+from typing import Callable
+from dotenv import load_dotenv
+
+from src.schemas import DriftAlert
+
+load_dotenv()
+
+# (eqp_id, metric) 별 병합 window (마지막 알람 이후 이 시간 안에 들어온 알람은 같은 작업에 병합)
+DRIFT_COALESCE_WINDOW_SEC = float(os.getenv("DRIFT_COALESCE_WINDOW_SEC", "600"))
+
+
+class CoalescedAlert:
+    """한 window 동안 병합된 drift 알람"""
+
+    def __init__(self, alert: DriftAlert):
+        self.metric = alert.metric
+        self.eqp_id = alert.eqp_id
+        self.drift_pct = alert.drift_pct
+        self.summary = alert.summary
+        self.ranges: list[tuple[datetime, datetime]] = [(alert.time_from, alert.time_to)]
+        self.count = 1
+        self.first_seen = self.last_seen = time.monotonic()
+        self.task_id: str | None = None
+
+    @property
+    def time_from(self) -> datetime:
+        return self.ranges[0][0]
+
+    @property
+    def time_to(self) -> datetime:
+        return max(end for _, end in self.ranges)
+
+    def merge(self, alert: DriftAlert) -> None:
+        """시간 구간 병합 + 최대 drift_pct 유지 (요약은 최대 drift 알람 기준)"""
+        self.count += 1
+        self.last_seen = time.monotonic()
+        if alert.drift_pct > self.drift_pct:
+            self.drift_pct = alert.drift_pct
+            self.summary = alert.summary
+        self.ranges = _merge_ranges(self.ranges + [(alert.time_from, alert.time_to)])
+
+    def to_trigger(self) -> dict:
+        return {
+            "rule_type": "Drift",
+            "detection_time": self.time_to,
+            "metric": self.metric,
+            "eqp_id": self.eqp_id,
+            "drift_pct": self.drift_pct,
+            "time_from": self.time_from,
+            "time_to": self.time_to,
+            "time_ranges": [list(r) for r in self.ranges],
+            "alert_count": self.count,
+            "summary": self.summary,
+        }
+
+
+class AlertCoalescer:
+    """
+    (eqp_id, metric) 키로 알람을 병합합니다.
+
+    - 마지막 알람 이후 window 안이면 (sliding window) 기존 작업에 병합 — 작업이 이미 끝났어도
+      새로 실행하지 않고 그 작업을 반환 (알람 폭주 중에는 window당 워크플로우 1회)
+    - window가 지났거나 작업 기록이 저장소에서 사라졌으면 launch 콜백으로 새 워크플로우 실행
+    """
+
+    def __init__(self, window_sec: float = DRIFT_COALESCE_WINDOW_SEC):
+        self.window_sec = window_sec
+        self._entries: dict[tuple[str, str], CoalescedAlert] = {}
+        self.merged_total = 0
+        self.launched_total = 0
+
+    def submit(self, alert: DriftAlert, launch: Callable[[dict], str],
+               exists: Callable[[str], bool]) -> tuple[CoalescedAlert, bool]:
+        """
+        Args:
+            launch: trigger dict를 받아 워크플로우를 시작하고 task_id 반환
+            exists: task_id의 작업 기록이 저장소에 남아 있는지 여부 (끝난 작업 포함)
+
+        Returns:
+            (병합된 알람, 새로 실행했는지 여부)
+        """
+        self._prune()
+        key = (alert.eqp_id, alert.metric)
+        entry = self._entries.get(key)
+
+        if entry is not None and exists(entry.task_id):
+            entry.merge(alert)
+            self.merged_total += 1
+            return entry, False
+
+        entry = CoalescedAlert(alert)
+        entry.task_id = launch(entry.to_trigger())
+        self._entries[key] = entry
+        self.launched_total += 1
+        return entry, True
+
+    def stats(self) -> dict:
+        return {
+            "active_keys": len(self._entries),
+            "launched_total": self.launched_total,
+            "merged_total": self.merged_total,
+        }
+
+    def _in_window(self, entry: CoalescedAlert) -> bool:
+        return time.monotonic() - entry.last_seen <= self.window_sec
+
+    def _prune(self) -> None:
+        """window가 지난 키 삭제 (작업 종료 여부와 무관)"""
+        expired = [key for key, entry in self._entries.items() if not self._in_window(entry)]
+        for key in expired:
+            del self._entries[key]
+
+
+def _merge_ranges(ranges: list[tuple[datetime, datetime]]) -> list[tuple[datetime, datetime]]:
+    """겹치거나 맞닿은 구간을 병합"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+_coalescer: AlertCoalescer | None = None
+
+
+def get_alert_coalescer() -> AlertCoalescer:
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = AlertCoalescer()
+    return _coalescer
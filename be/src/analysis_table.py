@@ -0,0 +1,234 @@
+"""
+MI × FDC (× PM) 비정규화 분석 테이블
+
+근본 원인 분석 질의 대부분이 계측(MI) 결과와 FDC 센서 요약을 Lot/Wafer 키로 조인하고,
+장비 키로 직전 PM 이력을 붙입니다. 이 조인을 적재 시 한 번만 수행하여 mi_fdc_wide에 저장합니다.
+
+- MI 컬럼: 그대로
+- FDC: Lot(/Wafer)별 숫자 컬럼 평균 → fdc_{컬럼}, 행 수 → fdc_rows
+- PM: 같은 장비에서 MI 측정 시각 이전의 마지막 PM 행 → pm_{컬럼}
+
+갱신:
+- append 적재: 적재한 MI/FDC 행의 Lot만 삭제 후 다시 생성 (이전 시각으로 늦게 들어온 행 포함)
+- 적재 정보 없는 증분 실행: watermark 이후 MI/FDC 행이 들어온 Lot만 다시 생성
+- replace/upsert 적재, PM 변경, 스키마 변경: 새 테이블로 전체 생성 후 교체
+
+실행 (be/ 디렉토리에서):
+    python -m src.analysis_table           # 증분 갱신
+    python -m src.analysis_table --full    # 전체 재생성
+"""
+import argparse
+import time
+from dotenv import load_dotenv
+
+from src.db import get_engine
+from src.layout import EQUIPMENT_COLUMNS, resolve_layout, apply_layout
+
+load_dotenv()
+
+WIDE_TABLE = "mi_fdc_wide"
+MI, FDC, PM = "MI", "FDC", "PM"
+WIDE_SOURCES = (MI, FDC, PM)
+
+LOT_COLUMNS = ["lot_id"]
+WAFER_COLUMNS = ["wafer_id"]
+NUMERIC_TYPES = {"double precision", "real", "numeric", "bigint", "integer", "smallint"}
+
+WATERMARK_DDL = """
+CREATE TABLE IF NOT EXISTS analysis_watermarks (
+    target TEXT NOT NULL,
+    source_table TEXT NOT NULL,
+    last_ts TIMESTAMP,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (target, source_table)
+)
+"""
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _columns(cur, table: str) -> dict[str, str]:
+    cur.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'public' AND table_name = %s ORDER BY ordinal_position",
+        (table,),
+    )
+    return dict(cur.fetchall())
+
+
+def _find(candidates: list[str], columns: dict[str, str]) -> str | None:
+    lower = {c.lower(): c for c in columns}
+    return next((lower[c] for c in candidates if c in lower), None)
+
+
+def _time_column(columns: dict[str, str]) -> str | None:
+    return next((c for c, t in columns.items() if t.startswith("timestamp")), None)
+
+
+def _plan(cur) -> dict | None:
+    """조인 키와 SELECT 절 구성 (MI/FDC에 공통 Lot 키가 없으면 None)"""
+    mi, fdc, pm = _columns(cur, MI), _columns(cur, FDC), _columns(cur, PM)
+    mi_lot, fdc_lot = _find(LOT_COLUMNS, mi), _find(LOT_COLUMNS, fdc)
+    if not mi or not fdc or mi_lot is None or fdc_lot is None:
+        return None
+
+    plan = {"mi_lot": mi_lot, "fdc_lot": fdc_lot, "mi_time": _time_column(mi), "fdc_time": _time_column(fdc)}
+    mi_wafer, fdc_wafer = _find(WAFER_COLUMNS, mi), _find(WAFER_COLUMNS, fdc)
+    fdc_keys = [fdc_lot] + ([fdc_wafer] if mi_wafer and fdc_wafer else [])
+    join = f"f.{_quote(fdc_lot)}::text = mi.{_quote(mi_lot)}::text"
+    if mi_wafer and fdc_wafer:
+        join += f" AND f.{_quote(fdc_wafer)}::text = mi.{_quote(mi_wafer)}::text"
+
+    key_lower = {k.lower() for k in LOT_COLUMNS + WAFER_COLUMNS + EQUIPMENT_COLUMNS}
+    fdc_params = [c for c, t in fdc.items() if t in NUMERIC_TYPES and c.lower() not in key_lower]
+    fdc_select = ", ".join([f"{_quote(k)}" for k in fdc_keys] + ["count(*) AS fdc_rows"]
+                           + [f"avg({_quote(c)}) AS {_quote('fdc_' + c)}" for c in fdc_params])
+    columns = list(mi) + ["fdc_rows"] + [f"fdc_{c}" for c in fdc_params]
+    select = ["mi.*", "f.fdc_rows"] + [f"f.{_quote('fdc_' + c)}" for c in fdc_params]
+
+    # 같은 장비의 MI 측정 시각 이전 마지막 PM
+    pm_join = ""
+    mi_eqp, pm_eqp, pm_time = _find(EQUIPMENT_COLUMNS, mi), _find(EQUIPMENT_COLUMNS, pm), _time_column(pm)
+    if mi_eqp and pm_eqp and pm_time and plan["mi_time"]:
+        pm_cols = [c for c in pm if c != pm_eqp]
+        pm_select = ", ".join(f"p.{_quote(c)} AS {_quote('pm_' + c)}" for c in pm_cols)
+        pm_join = (
+            f" LEFT JOIN LATERAL (SELECT {pm_select} FROM {_quote(PM)} p "
+            f"WHERE p.{_quote(pm_eqp)}::text = mi.{_quote(mi_eqp)}::text "
+            f"AND p.{_quote(pm_time)} <= mi.{_quote(plan['mi_time'])} "
+            f"ORDER BY p.{_quote(pm_time)} DESC LIMIT 1) pm ON true"
+        )
+        columns += [f"pm_{c}" for c in pm_cols]
+        select += [f"pm.{_quote('pm_' + c)}" for c in pm_cols]
+
+    plan["columns"] = columns
+    plan["fdc_keys"] = fdc_keys
+    plan["query"] = (
+        f"WITH f AS (SELECT {fdc_select} FROM {_quote(FDC)} {{fdc_filter}} GROUP BY {', '.join(map(_quote, fdc_keys))}) "
+        f"SELECT {', '.join(select)} FROM {_quote(MI)} mi LEFT JOIN f ON {join}{pm_join} {{mi_filter}}"
+    )
+    return plan
+
+
+def _watermarks(cur) -> dict[str, object]:
+    cur.execute("SELECT source_table, last_ts FROM analysis_watermarks WHERE target = %s", (WIDE_TABLE,))
+    return dict(cur.fetchall())
+
+
+def _save_watermarks(cur, plan: dict) -> None:
+    for source, col in ((MI, plan["mi_time"]), (FDC, plan["fdc_time"])):
+        last_ts = None
+        if col:
+            cur.execute(f"SELECT max({_quote(col)}) FROM {_quote(source)}")
+            last_ts = cur.fetchone()[0]
+        cur.execute(
+            "INSERT INTO analysis_watermarks (target, source_table, last_ts, refreshed_at) "
+            "VALUES (%s, %s, %s, now()) ON CONFLICT (target, source_table) DO UPDATE SET "
+            "last_ts = EXCLUDED.last_ts, refreshed_at = now()",
+            (WIDE_TABLE, source, last_ts),
+        )
+
+
+def _rebuild(cur, plan: dict) -> int:
+    """새 테이블에 전체 생성 후 한 트랜잭션에서 교체"""
+    loading = f"{WIDE_TABLE}__loading"
+    cur.execute(f"DROP TABLE IF EXISTS {_quote(loading)}")
+    cur.execute(f"CREATE TABLE {_quote(loading)} AS " + plan["query"].format(fdc_filter="", mi_filter=""))
+    rows = cur.rowcount
+
+    types = {c: ("TIMESTAMP" if t.startswith("timestamp") else t.upper()) for c, t in _columns(cur, loading).items()}
+    indexes = apply_layout(cur, loading, resolve_layout(WIDE_TABLE, types))
+
+    cur.execute(f"DROP TABLE IF EXISTS {_quote(WIDE_TABLE)}")
+    cur.execute(f"ALTER TABLE {_quote(loading)} RENAME TO {_quote(WIDE_TABLE)}")
+    for name in indexes:
+        cur.execute(f"ALTER INDEX {_quote(name)} RENAME TO {_quote(name.replace(loading, WIDE_TABLE, 1))}")
+    return rows
+
+
+def _refresh_lots(cur, plan: dict, watermarks: dict, lots: set[str] | None = None) -> int | None:
+    """
+    변경된 Lot만 다시 생성
+
+    lots(loader가 넘긴 적재 batch의 Lot)가 있으면 그 Lot만, 없으면 watermark 이후 MI/FDC 행이 들어온 Lot
+    (이 경우 시간 컬럼이 없으면 None → 전체 재생성)
+    """
+    cur.execute("DROP TABLE IF EXISTS wide_refresh_lots")
+    if lots is not None:
+        cur.execute("CREATE TEMP TABLE wide_refresh_lots AS SELECT DISTINCT unnest(%s::text[]) AS lot", (sorted(lots),))
+    else:
+        if not plan["mi_time"] or not plan["fdc_time"]:
+            return None
+
+        lot_sources = []
+        for source, lot, col in ((MI, plan["mi_lot"], plan["mi_time"]), (FDC, plan["fdc_lot"], plan["fdc_time"])):
+            since = watermarks.get(source)
+            where = f" WHERE {_quote(col)} >= %(since_{source})s" if since is not None else ""
+            lot_sources.append(f"SELECT DISTINCT {_quote(lot)}::text AS lot FROM {_quote(source)}{where}")
+        params = {f"since_{source}": watermarks.get(source) for source in (MI, FDC)}
+        cur.execute(f"CREATE TEMP TABLE wide_refresh_lots AS {' UNION '.join(lot_sources)}", params)
+
+    cur.execute(f"DELETE FROM {_quote(WIDE_TABLE)} WHERE {_quote(plan['mi_lot'])}::text "
+                f"IN (SELECT lot FROM wide_refresh_lots)")
+    query = plan["query"].format(
+        fdc_filter=f"WHERE {_quote(plan['fdc_lot'])}::text IN (SELECT lot FROM wide_refresh_lots)",
+        mi_filter=f"WHERE mi.{_quote(plan['mi_lot'])}::text IN (SELECT lot FROM wide_refresh_lots)",
+    )
+    cur.execute(f"INSERT INTO {_quote(WIDE_TABLE)} {query}")
+    rows = cur.rowcount
+    cur.execute(f"ANALYZE {_quote(WIDE_TABLE)}")
+    return rows
+
+
+def refresh_wide_table(full: bool = False, lots: set[str] | None = None) -> dict:
+    """
+    mi_fdc_wide 갱신
+
+    Args:
+        full: True면 전체 재생성 (replace/upsert 적재 또는 PM 변경 후)
+        lots: append 적재한 MI/FDC 행의 Lot (loader) — 주어지면 이 Lot만 다시 생성
+
+    Returns:
+        {"table", "full", "rows", "seconds"} 또는 {"table", "skipped"}
+    """
+    start = time.perf_counter()
+    conn = get_engine().raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(WATERMARK_DDL)
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"wide:{WIDE_TABLE}",))
+
+        plan = _plan(cur)
+        if plan is None:
+            conn.rollback()
+            return {"table": WIDE_TABLE, "skipped": "MI/FDC 테이블 또는 공통 Lot 키가 없습니다."}
+
+        # 원본 스키마가 바뀌었거나 처음이면 전체 재생성
+        existing = list(_columns(cur, WIDE_TABLE))
+        watermarks = _watermarks(cur)
+        rows = None
+        if not full and existing == plan["columns"] and watermarks:
+            rows = _refresh_lots(cur, plan, watermarks, lots)
+        full = rows is None
+        if full:
+            rows = _rebuild(cur, plan)
+
+        _save_watermarks(cur, plan)
+        conn.commit()
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {"table": WIDE_TABLE, "full": full, "rows": rows, "seconds": round(time.perf_counter() - start, 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"{WIDE_TABLE} 분석 테이블 갱신")
+    parser.add_argument("--full", action="store_true", help="전체 재생성")
+    args = parser.parse_args()
+    print(refresh_wide_table(full=args.full))
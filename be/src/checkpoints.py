@@ -0,0 +1,292 @@
+"""
+워크플로우 체크포인트 저장소 (SQLite)
+
+- 노드가 끝날 때마다 직전 체크포인트와 달라진 State 필드만 delta로 기록
+- 큰 값(도구 출력, 조회 데이터 등)은 content hash로 blob 테이블에 한 번만 저장하고 참조
+- 재분석 시 재시작 노드 이전 필드만 복원하여 새 작업으로 분기
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.db")
+# 이 크기(bytes, JSON 기준) 이상인 값은 blob으로 분리
+CHECKPOINT_BLOB_MIN_BYTES = int(os.getenv("CHECKPOINT_BLOB_MIN_BYTES", "4096"))
+# delta 계산용으로 메모리에 보관할 task별 마지막 State 수 (초과 시 오래 안 쓴 것부터 제거, 필요하면 DB에서 복원)
+CHECKPOINT_HEAD_CACHE_MAX = int(os.getenv("CHECKPOINT_HEAD_CACHE_MAX", "256"))
+
+# 노드 실행 순서와 각 노드가 쓰는 State 필드 (재분석 entry point 기준)
+NODE_OUTPUTS = [
+    ("monitor", "trigger"),
+    ("classify", "problem"),
+    ("column_selector", "columns"),
+    ("tool_selection", "tools"),
+    ("executor", "execution"),
+    ("interpreter", "interpretation"),
+    ("action_advisor", "recommendation"),
+    ("report_generator", "report"),
+]
+
+# 노드가 쓰지 않고 요청 시 정해지는 입력 필드 (재분석 시 항상 복원)
+INPUT_KEYS = ["sampling"]
+# 관리 필드
+MANAGED_KEYS = ["history", "interactions"]
+
+BLOB_KEY = "$blob"
+DATETIME_KEY = "$dt"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    task_id TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    node TEXT,
+    parent_task_id TEXT,
+    parent_step INTEGER,
+    delta TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (task_id, step)
+);
+"""
+
+
+class CheckpointNotFound(Exception):
+    """요청한 task/step의 체크포인트가 없을 때 발생"""
+
+
+def _encode(value):
+    """JSON 직렬화 전 datetime 보존"""
+    if isinstance(value, datetime):
+        return {DATETIME_KEY: value.isoformat()}
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if len(value) == 1 and DATETIME_KEY in value:
+            return datetime.fromisoformat(value[DATETIME_KEY])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _changed(compact: dict, base: dict) -> dict:
+    return {k: v for k, v in compact.items() if k not in base or _dumps(v) != _dumps(base[k])}
+
+
+class CheckpointStore:
+    def __init__(self, path: str = CHECKPOINT_DB_PATH, blob_min_bytes: int = CHECKPOINT_BLOB_MIN_BYTES,
+                 head_cache_max: int = CHECKPOINT_HEAD_CACHE_MAX):
+        self.path = path
+        self.blob_min_bytes = blob_min_bytes
+        self.head_cache_max = head_cache_max
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        # task별 마지막 체크포인트의 compact State (delta 계산용, LRU)
+        self._heads: OrderedDict[str, tuple[int, dict]] = OrderedDict()
+
+    # --- 저장 ---
+
+    def save(self, task_id: str, state: dict, node: str | None = None) -> int:
+        """State를 체크포인트로 기록하고 step 번호를 반환 (변경된 필드만 저장)"""
+        with self._lock, self._conn:
+            step, head = self._head(task_id)
+            compact = {key: self._compact(_encode(value)) for key, value in state.items()}
+
+            changed = _changed(compact, head)
+            removed = [k for k in head if k not in compact]
+            step = step + 1
+            self._insert(task_id, step, node, {"set": changed, "unset": removed})
+            self._set_head(task_id, step, compact)
+            return step
+
+    def branch(self, task_id: str, step: int, new_task_id: str, state: dict, node: str | None = None) -> int:
+        """(task_id, step)에서 갈라진 새 task의 첫 체크포인트 기록 (부모와의 delta만 저장)"""
+        with self._lock, self._conn:
+            parent = self._materialize(task_id, step)
+            compact = {key: self._compact(_encode(value)) for key, value in state.items()}
+            changed = _changed(compact, parent)
+            removed = [k for k in parent if k not in compact]
+            self._insert(new_task_id, 0, node, {"set": changed, "unset": removed},
+                         parent=(task_id, step))
+            self._set_head(new_task_id, 0, compact)
+            return 0
+
+    def _insert(self, task_id: str, step: int, node: str | None, delta: dict, parent: tuple | None = None):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (task_id, step, node, parent[0] if parent else None, parent[1] if parent else None,
+             _dumps(delta), datetime.now().isoformat()),
+        )
+
+    def _compact(self, value):
+        """큰 값은 blob으로 저장하고 {"$blob": hash} 참조로 대체 (하위 값부터 분리)"""
+        if isinstance(value, dict) and not (len(value) == 1 and DATETIME_KEY in value):
+            value = {k: self._compact(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            value = [self._compact(v) for v in value]
+        else:
+            return value
+
+        data = _dumps(value).encode()
+        if len(data) < self.blob_min_bytes:
+            return value
+        digest = hashlib.sha256(data).hexdigest()
+        self._conn.execute("INSERT OR IGNORE INTO checkpoint_blobs VALUES (?, ?, ?)", (digest, data, len(data)))
+        return {BLOB_KEY: digest}
+
+    def _head(self, task_id: str) -> tuple[int, dict]:
+        if task_id in self._heads:
+            self._heads.move_to_end(task_id)
+            return self._heads[task_id]
+        row = self._conn.execute("SELECT MAX(step) FROM checkpoints WHERE task_id = ?", (task_id,)).fetchone()
+        if row[0] is None:
+            return -1, {}
+        head = (row[0], self._materialize(task_id, row[0]))
+        self._set_head(task_id, *head)
+        return head
+
+    def _set_head(self, task_id: str, step: int, compact: dict) -> None:
+        self._heads[task_id] = (step, compact)
+        self._heads.move_to_end(task_id)
+        while len(self._heads) > self.head_cache_max:
+            self._heads.popitem(last=False)
+
+    # --- 복원 ---
+
+    def load(self, task_id: str, step: int | None = None, keys: list[str] | None = None) -> dict:
+        """
+        체크포인트의 State 복원
+
+        Args:
+            step: None이면 마지막 체크포인트
+            keys: 지정 시 해당 필드의 blob만 풀어서 반환 (나머지 필드는 제외)
+        """
+        with self._lock:
+            if step is None:
+                step = self.latest_step(task_id)
+            compact = self._materialize(task_id, step)
+            if keys is not None:
+                compact = {k: v for k, v in compact.items() if k in keys}
+            return {k: _decode(self._expand(v)) for k, v in compact.items()}
+
+    def restore_for(self, task_id: str, step: int | None, entry_node: str) -> dict:
+        """
+        entry_node부터 다시 실행하기 위한 State 복원
+
+        entry_node 이전 노드의 출력, 입력 필드(sampling 등), 관리 필드만 풀고, 이후 노드 출력은 None으로 둡니다.
+        executor 결과는 도구 재실행을 피하기 위해 항상 복원합니다 (Executor가 동일 호출 결과를 재사용).
+        표본 조회 실행을 재분석하면 sampling도 복원되므로 다시 조회하는 데이터도 같은 방식의 표본입니다.
+        """
+        names = [n for n, _ in NODE_OUTPUTS]
+        if entry_node not in names:
+            raise ValueError(f"알 수 없는 노드: {entry_node}")
+        index = names.index(entry_node)
+        upstream = [key for _, key in NODE_OUTPUTS[:index]]
+        downstream = [key for _, key in NODE_OUTPUTS[index:]]
+
+        state = self.load(task_id, step, keys=upstream + ["execution"] + INPUT_KEYS + MANAGED_KEYS)
+        for key in downstream:
+            if key != "execution":
+                state[key] = None
+        for key in ["execution"] + INPUT_KEYS:
+            state.setdefault(key, None)
+        return state
+
+    def latest_step(self, task_id: str) -> int:
+        row = self._conn.execute("SELECT MAX(step) FROM checkpoints WHERE task_id = ?", (task_id,)).fetchone()
+        if row[0] is None:
+            raise CheckpointNotFound(f"task '{task_id}'의 체크포인트가 없습니다.")
+        return row[0]
+
+    def list(self, task_id: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT step, node, parent_task_id, parent_step, delta, created_at "
+                "FROM checkpoints WHERE task_id = ? ORDER BY step", (task_id,)
+            ).fetchall()
+        result = []
+        for step, node, parent_task_id, parent_step, delta, created_at in rows:
+            delta = json.loads(delta)
+            result.append({
+                "step": step,
+                "node": node,
+                "parent": {"task_id": parent_task_id, "step": parent_step} if parent_task_id else None,
+                "changed": sorted(delta["set"]),
+                "delta_bytes": len(_dumps(delta)),
+                "created_at": created_at,
+            })
+        return result
+
+    def _materialize(self, task_id: str, step: int) -> dict:
+        """부모 체인의 delta를 순서대로 적용하여 compact State 구성 (blob은 풀지 않음)"""
+        chain = []
+        current = (task_id, step)
+        while current is not None:
+            tid, upto = current
+            rows = self._conn.execute(
+                "SELECT step, parent_task_id, parent_step, delta FROM checkpoints "
+                "WHERE task_id = ? AND step <= ? ORDER BY step", (tid, upto)
+            ).fetchall()
+            if not rows or rows[-1][0] != upto:
+                raise CheckpointNotFound(f"체크포인트 없음: {tid} step {upto}")
+            chain.append([json.loads(r[3]) for r in rows])
+            first = rows[0]
+            current = (first[1], first[2]) if first[1] else None
+
+        state: dict = {}
+        for deltas in reversed(chain):
+            for delta in deltas:
+                state.update(delta["set"])
+                for key in delta["unset"]:
+                    state.pop(key, None)
+        return state
+
+    def _expand(self, value):
+        if isinstance(value, dict):
+            if len(value) == 1 and BLOB_KEY in value:
+                row = self._conn.execute("SELECT data FROM checkpoint_blobs WHERE hash = ?",
+                                         (value[BLOB_KEY],)).fetchone()
+                if row is None:
+                    raise CheckpointNotFound(f"blob 없음: {value[BLOB_KEY]}")
+                return self._expand(json.loads(row[0]))
+            return {k: self._expand(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._expand(v) for v in value]
+        return value
+
+    def close(self):
+        self._conn.close()
+
+
+_store: CheckpointStore | None = None
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    global _store
+    if _store is None:
+        _store = CheckpointStore()
+    return _store
@@ -0,0 +1,137 @@
+"""
+백엔드 공용 연결 관리자
+
+- Postgres: src.db의 풀링된 SQLAlchemy 엔진 (요청마다 TLS 연결을 새로 맺지 않음)
+- HTTP: ChromaDB / Ollama 호출용 httpx.AsyncClient 1개 재사용 (keep-alive)
+- 상태 점검: 백그라운드에서 주기적으로 probe하고, /check/* 엔드포인트는 캐시된 결과만 반환
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+from src.db import get_engine, dispose_engine
+
+load_dotenv()
+
+# 상태 점검 주기 (초)
+HEALTH_PROBE_INTERVAL_SEC = float(os.getenv("HEALTH_PROBE_INTERVAL_SEC", "15"))
+HEALTH_PROBE_TIMEOUT_SEC = float(os.getenv("HEALTH_PROBE_TIMEOUT_SEC", "5"))
+
+CHROMADB_URL = os.getenv("CHROMADB_URL", "http://chromadb:8000")
+
+
+class ConnectionManager:
+    def __init__(self, interval: float = HEALTH_PROBE_INTERVAL_SEC):
+        self.interval = interval
+        self._http = None
+        self._task: asyncio.Task | None = None
+        self._health: dict[str, dict] = {}
+        self.probes = {
+            "db": self._probe_db,
+            "chromadb": self._probe_chromadb,
+            "llm": self._probe_llm,
+        }
+
+    @property
+    def http(self):
+        """공용 HTTP 클라이언트 (최초 사용 시 생성)"""
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient(timeout=HEALTH_PROBE_TIMEOUT_SEC)
+        return self._http
+
+    @property
+    def engine(self):
+        return get_engine()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        dispose_engine()
+
+    async def health(self, name: str, refresh: bool = False) -> dict:
+        """캐시된 점검 결과 반환 (아직 점검 전이거나 refresh=True면 즉시 점검)"""
+        if refresh or name not in self._health:
+            await self.probe(name)
+        return self._health[name]
+
+    async def probe(self, name: str) -> dict:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.probes[name](), HEALTH_PROBE_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            result = {"status": "error", "detail": f"{HEALTH_PROBE_TIMEOUT_SEC}s 내 응답 없음"}
+        except Exception as e:
+            result = {"status": "error", "detail": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["checked_at"] = datetime.now().isoformat()
+        self._health[name] = result
+        return result
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.gather(*(self.probe(name) for name in self.probes))
+            await asyncio.sleep(self.interval)
+
+    # --- 개별 probe ---
+
+    async def _probe_db(self) -> dict:
+        def query():
+            from sqlalchemy import text
+            with self.engine.connect() as conn:
+                return conn.execute(text("SELECT version();")).scalar()
+
+        version = await asyncio.to_thread(query)
+        pool = self.engine.pool
+        return {"status": "ok", "version": version,
+                "pool": {"size": pool.size(), "checked_out": pool.checkedout()}}
+
+    async def _probe_chromadb(self) -> dict:
+        res = await self.http.get(f"{CHROMADB_URL}/api/v2/heartbeat")
+        res.raise_for_status()
+        return {"status": "ok", "heartbeat": res.json()}
+
+    async def _probe_llm(self) -> dict:
+        provider = os.getenv("LLM_PROVIDER", "ollama")
+        if provider == "ollama":
+            base_url = os.getenv("OLLAMA_BASE_URL", "http://host.docker.internal:11434")
+            model = os.getenv("OLLAMA_MODEL", "qwen3:8b")
+            res = await self.http.get(f"{base_url}/api/tags")
+            res.raise_for_status()
+            model_names = [m["name"] for m in res.json().get("models", [])]
+            if any(model in name for name in model_names):
+                return {"status": "ok", "provider": "ollama", "model": model}
+            return {"status": "error", "provider": "ollama", "detail": f"'{model}' 모델 없음. 설치된 모델: {model_names}"}
+
+        aws_key = os.getenv("AWS_ACCESS_KEY_ID", "")
+        aws_secret = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+        if provider == "bedrock" and (not aws_key or not aws_secret):
+            return {"status": "error", "provider": "bedrock", "detail": "AWS 자격증명 미설정"}
+        return {
+            "status": "ok",
+            "provider": provider,
+            "model": os.getenv("BEDROCK_MODEL_ID", "openai.gpt-oss-120b-1:0") if provider == "bedrock"
+            else os.getenv("OPENAI_MODEL_ID", "gpt-4o"),
+            "region": os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
+        }
+
+
+_connections: ConnectionManager | None = None
+
+
+def get_connections() -> ConnectionManager:
+    global _connections
+    if _connections is None:
+        _connections = ConnectionManager()
+    return _connections
@@ -0,0 +1,48 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+USER = os.getenv("POSTGRES_USER", "myuser")
+PASSWORD = os.getenv("POSTGRES_PASSWORD", "mypassword")
+HOST = os.getenv("POSTGRES_HOST", "localhost")
+PORT = os.getenv("POSTGRES_PORT", "5432")
+DB_NAME = os.getenv("POSTGRES_DB", "agent_db")
+
+db_url = f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DB_NAME}?sslmode=require"
+
+# 커넥션 풀 (TLS 연결을 재사용하여 요청마다 handshake 하지 않음)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_RECYCLE_SEC = int(os.getenv("DB_POOL_RECYCLE_SEC", "1800"))
+
+# 엔진은 첫 사용 시점에 생성 (import 시 커넥션 풀 생성 방지)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """SQLAlchemy 엔진 반환 (최초 호출 시 생성)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from sqlalchemy import create_engine
+                _engine = create_engine(
+                    db_url,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_recycle=DB_POOL_RECYCLE_SEC,
+                    pool_pre_ping=True,
+                )
+    return _engine
+
+
+def dispose_engine():
+    """풀의 연결을 모두 닫음 (서버 종료 시)"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
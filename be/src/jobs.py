@@ -0,0 +1,205 @@
+"""분석 워크플로우 비동기 작업(Job) 관리"""
+import asyncio
+import json
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Callable
+from dotenv import load_dotenv
+
+from src.checkpoints import CheckpointStore
+from src.llm import token_sink
+from src.llm_scheduler import llm_priority
+
+load_dotenv()
+
+# 동시에 실행할 워크플로우 수
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# 실행 대기 중인 작업 최대 수 (초과 시 제출 거절)
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+# 완료된 작업을 보관할 최대 수 (오래된 것부터 삭제)
+JOB_STORE_MAX = int(os.getenv("JOB_STORE_MAX", "500"))
+
+# 알람/감시로 시작된 작업은 LLM 스케줄러에서 사용자 요청보다 뒤로 밀림
+BACKGROUND_KINDS = ("drift_alert", "spc_violation")
+
+FINISHED = ("completed", "failed")
+
+
+class JobQueueFull(Exception):
+    """대기열이 가득 차 작업을 받을 수 없을 때 발생"""
+
+
+class Job:
+    def __init__(self, kind: str, state: dict, parent: tuple[str, int] | None = None,
+                 entry_node: str | None = None):
+        self.task_id = str(uuid.uuid4())
+        self.kind = kind                  # "user_request" | "drift_alert" | "spc_violation" | "reanalysis"
+        self.status = "queued"            # queued → running → completed | failed
+        self.state = state                # AnalysisState (노드 완료 시마다 갱신)
+        self.error: str | None = None
+        self.created_at = datetime.now()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.parent = parent              # 분기한 체크포인트 (task_id, step)
+        self.entry_node = entry_node      # 재분석 시 다시 실행할 첫 노드 (None이면 처음부터)
+        self.checkpoint_step: int | None = None
+        self.events: list[dict] = []
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def publish(self, event: str, data: dict, store: bool = True) -> None:
+        """이벤트 발행 (store=False면 이후 구독자에게 재전송하지 않음, 예: LLM 토큰)"""
+        item = {"event": event, "data": data, "time": datetime.now().isoformat()}
+        if store:
+            self.events.append(item)
+        for queue in self._subscribers:
+            queue.put_nowait(item)
+
+
+# runner: 초기 state와 시작 노드(None이면 처음부터)를 받아 (노드명, 해당 노드의 state 업데이트)를 순서대로 yield
+Runner = Callable[[dict, str | None], AsyncIterator[tuple[str, dict]]]
+
+
+class JobManager:
+    """
+    제출 즉시 task_id를 반환하고, 고정 개수의 워커가 대기열의 워크플로우를 실행합니다.
+    노드가 끝날 때마다 이벤트를 발행하며, 완료된 작업은 JOB_STORE_MAX개까지 보관합니다.
+    """
+
+    def __init__(self, runner: Runner, workers: int = JOB_WORKERS,
+                 queue_max: int = JOB_QUEUE_MAX, store_max: int = JOB_STORE_MAX,
+                 checkpoints: CheckpointStore | None = None):
+        self.runner = runner
+        self.checkpoints = checkpoints
+        self.workers = workers
+        self.store_max = store_max
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(maxsize=queue_max)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, state: dict, parent: tuple[str, int] | None = None,
+               entry_node: str | None = None) -> Job:
+        job = Job(kind, state, parent, entry_node)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"대기 중인 분석 작업이 너무 많습니다 (최대 {self._queue.maxsize}건).")
+
+        self._jobs[job.task_id] = job
+        job.publish("queued", {"task_id": job.task_id})
+        self._evict()
+        return job
+
+    def get(self, task_id: str) -> Job | None:
+        return self._jobs.get(task_id)
+
+    async def subscribe(self, task_id: str) -> AsyncIterator[dict]:
+        """지난 이벤트를 먼저 보내고, 작업이 끝날 때까지 새 이벤트를 전달"""
+        job = self._jobs.get(task_id)
+        if job is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        job._subscribers.add(queue)
+        try:
+            for item in list(job.events):
+                yield item
+            if job.status in FINISHED:
+                return
+            while True:
+                item = await queue.get()
+                yield item
+                if item["event"] in FINISHED:
+                    return
+        finally:
+            job._subscribers.discard(queue)
+
+    def stats(self) -> dict:
+        counts = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"queue_depth": self._queue.qsize(), "workers": self.workers, "jobs": counts}
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        job.started_at = datetime.now()
+        job.publish("running", {"task_id": job.task_id})
+
+        # 노드가 LLM 응답을 스트리밍하면 token 이벤트로 바로 전달
+        token_sink.set(lambda node, text: job.publish("token", {"node": node, "text": text}, store=False))
+        llm_priority.set("background" if job.kind in BACKGROUND_KINDS else "interactive")
+        try:
+            await self._checkpoint(job, None)
+            async for node, update in self.runner(job.state, job.entry_node):
+                job.state = {**job.state, **update}
+                await self._checkpoint(job, node)
+                job.publish("node", {"node": node, "update": update, "step": job.checkpoint_step})
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "서버 종료로 작업이 중단되었습니다."
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            job.publish(job.status, {"task_id": job.task_id, "error": job.error})
+            self._evict()
+
+    async def _checkpoint(self, job: Job, node: str | None):
+        """노드 완료 시점의 State를 체크포인트로 기록 (실패해도 작업은 계속)"""
+        if self.checkpoints is None:
+            return
+        try:
+            if job.checkpoint_step is None and job.parent is not None:
+                step = await asyncio.to_thread(self.checkpoints.branch, *job.parent, job.task_id, job.state, node)
+            else:
+                step = await asyncio.to_thread(self.checkpoints.save, job.task_id, job.state, node)
+            job.checkpoint_step = step
+        except Exception as e:
+            print(f"[checkpoint] {job.task_id} 기록 실패: {e}")
+
+    def _evict(self):
+        """완료된 작업 중 오래된 것부터 삭제 (실행 중/대기 중 작업은 유지)"""
+        finished = [tid for tid, job in self._jobs.items() if job.status in FINISHED]
+        overflow = len(self._jobs) - self.store_max
+        for task_id in finished[:max(overflow, 0)]:
+            del self._jobs[task_id]
+
+
+def format_sse(item: dict) -> str:
+    """이벤트를 text/event-stream 형식으로 직렬화"""
+    data = json.dumps(item["data"], ensure_ascii=False, default=str)
+    return f"event: {item['event']}\ndata: {data}\n\n"
+
+
+_manager: JobManager | None = None
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        from src.agents.workflow import run_workflow
+        from src.checkpoints import get_checkpoint_store
+        _manager = JobManager(run_workflow, checkpoints=get_checkpoint_store())
+    return _manager
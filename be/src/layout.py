@@ -0,0 +1,243 @@
+"""
+적재 테이블 물리 레이아웃 (인덱스 / 월별 파티션 / 통계)
+
+loader가 시트를 적재한 뒤 선언된 레이아웃을 적용합니다.
+- B-tree: 장비/Lot/Wafer 키 컬럼 (text_to_sql의 등호 필터)
+- BRIN: 시간 컬럼 (시간 순으로 적재되므로 작은 인덱스로 범위 필터 처리)
+- 복합 B-tree: (장비, 시간) — "ETCHER_01의 최근 7일" 형태의 질의
+- 월별 RANGE 파티션: FDC처럼 큰 시계열 테이블 (선택)
+- 적용 후 ANALYZE
+
+레이아웃은 시트별로 LOADER_TABLE_LAYOUT(JSON)으로 재정의할 수 있고,
+지정하지 않으면 컬럼명/타입으로 추론합니다 (없는 컬럼은 무시).
+    예: {"FDC": {"btree": ["eqp_id"], "brin": ["timestamp"], "partition": "timestamp"}}
+"""
+import json
+import os
+import statistics
+import time
+from dotenv import load_dotenv
+
+import pandas as pd
+
+load_dotenv()
+
+# 등호 필터가 주로 걸리는 키 컬럼 후보 (대소문자 무시)
+KEY_COLUMNS = ["eqp_id", "equipment_id", "chamber_id", "lot_id", "wafer_id", "recipe_id"]
+EQUIPMENT_COLUMNS = ["eqp_id", "equipment_id"]
+
+TABLE_LAYOUT = json.loads(os.getenv("LOADER_TABLE_LAYOUT", "{}"))
+# 월별 파티션을 적용할 시트 (쉼표 구분, 빈 값이면 사용 안 함)
+PARTITION_MONTHLY = [s.strip() for s in os.getenv("LOADER_PARTITION_MONTHLY", "FDC").split(",") if s.strip()]
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _match(candidates: list[str], columns: list[str]) -> list[str]:
+    lower = {c.lower(): c for c in columns}
+    return [lower[c.lower()] for c in candidates if c.lower() in lower]
+
+
+def resolve_layout(sheet: str, types: dict[str, str], mode: str = "replace",
+                   keys: list[str] | None = None) -> dict:
+    """
+    시트의 실제 컬럼에 맞춘 레이아웃
+
+    Returns:
+        {"btree": [컬럼], "brin": [컬럼], "composite": [(장비, 시간)], "partition": 컬럼 | None}
+    """
+    columns = list(types)
+    spec = TABLE_LAYOUT.get(sheet, {})
+    time_columns = [c for c, t in types.items() if t == "TIMESTAMP"]
+
+    btree = _match(spec.get("btree", KEY_COLUMNS), columns)
+    brin = _match(spec.get("brin", time_columns), columns)
+    equipment = _match(EQUIPMENT_COLUMNS, columns)
+    composite = [(equipment[0], brin[0])] if equipment and brin else []
+
+    partition = spec.get("partition", brin[0] if brin and sheet in PARTITION_MONTHLY else None)
+    if partition is not None:
+        partition = (_match([partition], columns) or [None])[0]
+    if partition is not None and types.get(partition) != "TIMESTAMP":
+        partition = None
+    # 파티션 테이블의 unique 인덱스는 파티션 키를 포함해야 함
+    if partition is not None and mode == "upsert" and partition not in (keys or []):
+        partition = None
+
+    return {"btree": btree, "brin": brin, "composite": composite, "partition": partition}
+
+
+def create_table_sql(table: str, columns_ddl: str, layout: dict, if_not_exists: bool = False) -> str:
+    exists = "IF NOT EXISTS " if if_not_exists else ""
+    sql = f"CREATE TABLE {exists}{_quote(table)} ({columns_ddl})"
+    if layout["partition"]:
+        sql += f" PARTITION BY RANGE ({_quote(layout['partition'])})"
+    return sql
+
+
+def is_partitioned(cur, table: str) -> bool:
+    cur.execute(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+        (table,),
+    )
+    return cur.fetchone() is not None
+
+
+def ensure_month_partitions(cur, table: str, column: str, values: pd.Series, created: set[str]) -> None:
+    """chunk에 있는 월의 파티션 + NULL 시간용 default 파티션 생성 (created: 이미 만든 파티션명)"""
+    default = f"{table}_pdefault"
+    if default not in created:
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {_quote(default)} PARTITION OF {_quote(table)} DEFAULT")
+        created.add(default)
+
+    months = pd.to_datetime(values).dropna().dt.to_period("M").unique()
+    for month in months:
+        name = f"{table}_p{month.strftime('%Y%m')}"
+        if name in created:
+            continue
+        start, end = month.start_time, (month + 1).start_time
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {_quote(name)} PARTITION OF {_quote(table)} "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        created.add(name)
+
+
+def _index_name(table: str, kind: str, columns: tuple[str, ...]) -> str:
+    return f"{kind}_{table}_{'_'.join(columns)}"[:63]
+
+
+def apply_layout(cur, table: str, layout: dict, index_prefix: str | None = None) -> list[str]:
+    """
+    인덱스 생성 후 ANALYZE
+
+    Args:
+        index_prefix: 인덱스 이름에 쓸 테이블명 (replace 모드에서 교체 후 이름 변경용)
+
+    Returns:
+        생성(또는 이미 존재)한 인덱스 이름
+    """
+    prefix = index_prefix or table
+    names = []
+    for col in layout["btree"]:
+        name = _index_name(prefix, "ix", (col,))
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} ({_quote(col)})")
+        names.append(name)
+    for col in layout["brin"]:
+        name = _index_name(prefix, "brin", (col,))
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} USING brin ({_quote(col)})")
+        names.append(name)
+    for cols in layout["composite"]:
+        name = _index_name(prefix, "ix", cols)
+        col_sql = ", ".join(_quote(c) for c in cols)
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} ({col_sql})")
+        names.append(name)
+    cur.execute(f"ANALYZE {_quote(table)}")
+    return names
+
+
+def rename_loaded(cur, loading: str, table: str, indexes: list[str], partitions: set[str]) -> None:
+    """replace 모드: 교체된 테이블의 인덱스/파티션 이름에서 '__loading' 접두어 제거"""
+    for name in indexes:
+        final = name.replace(loading, table, 1)
+        cur.execute(f"ALTER INDEX {_quote(name)} RENAME TO {_quote(final)}")
+    for name in partitions:
+        final = name.replace(loading, table, 1)
+        cur.execute(f"ALTER TABLE {_quote(name)} RENAME TO {_quote(final)}")
+
+
+# --- 벤치마크 ---
+
+def _filter_shapes(cur, table: str, layout: dict) -> list[tuple[str, str, tuple]]:
+    """text_to_sql이 주로 생성하는 필터 형태 (이름, WHERE 절, 파라미터)"""
+    shapes = []
+    t = _quote(table)
+    for col in layout["btree"]:
+        cur.execute(f"SELECT {_quote(col)} FROM {t} WHERE {_quote(col)} IS NOT NULL LIMIT 1")
+        row = cur.fetchone()
+        if row:
+            shapes.append((f"{col} =", f"{_quote(col)} = %s", (row[0],)))
+    if layout["brin"]:
+        ts = layout["brin"][0]
+        cur.execute(f"SELECT max({_quote(ts)}) FROM {t}")
+        latest = cur.fetchone()[0]
+        if latest is not None:
+            shapes.append((f"{ts} 최근 7일", f"{_quote(ts)} >= %s", (latest - pd.Timedelta(days=7),)))
+            for eqp, _ in layout["composite"]:
+                cur.execute(f"SELECT {_quote(eqp)} FROM {t} WHERE {_quote(eqp)} IS NOT NULL LIMIT 1")
+                row = cur.fetchone()
+                if row:
+                    shapes.append((f"{eqp} = + {ts} 최근 7일",
+                                   f"{_quote(eqp)} = %s AND {_quote(ts)} >= %s",
+                                   (row[0], latest - pd.Timedelta(days=7))))
+    return shapes
+
+
+def _time_query(cur, sql: str, params: tuple, repeat: int) -> tuple[float, str]:
+    """중앙값 실행 시간(ms)과 최상위 scan 노드 종류"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()[0][0]["Plan"]
+    while plan.get("Plans") and "Scan" not in plan["Node Type"]:
+        plan = plan["Plans"][0]
+    return round(statistics.median(timings), 2), plan["Node Type"]
+
+
+def benchmark_layout(sheet: str, table: str | None = None, repeat: int = 5) -> list[dict]:
+    """
+    레이아웃 적용 전/후 질의 지연 비교
+
+    적재된 테이블을 인덱스/파티션 없는 복사본({table}__bench_plain)과 비교합니다 (복사본은 삭제).
+    """
+    from src.db import get_engine
+
+    table = table or sheet
+    plain = f"{table}__bench_plain"
+    conn = get_engine().raw_connection()
+    report = []
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT a.attname, format_type(a.atttypid, a.atttypmod) FROM pg_attribute a "
+            "WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped",
+            (_quote(table),),
+        )
+        types = {name: ("TIMESTAMP" if pg.startswith("timestamp") else pg.upper()) for name, pg in cur.fetchall()}
+        layout = resolve_layout(sheet, types)
+
+        cur.execute(f"DROP TABLE IF EXISTS {_quote(plain)}")
+        cur.execute(f"CREATE TABLE {_quote(plain)} AS SELECT * FROM {_quote(table)}")
+        cur.execute(f"ANALYZE {_quote(plain)}")
+        conn.commit()
+
+        for name, where, params in _filter_shapes(cur, table, layout):
+            before_ms, before_plan = _time_query(cur, f"SELECT * FROM {_quote(plain)} WHERE {where} LIMIT 1000",
+                                                 params, repeat)
+            after_ms, after_plan = _time_query(cur, f"SELECT * FROM {_quote(table)} WHERE {where} LIMIT 1000",
+                                               params, repeat)
+            report.append({
+                "table": table, "filter": name,
+                "before_ms": before_ms, "before_plan": before_plan,
+                "after_ms": after_ms, "after_plan": after_plan,
+                "speedup": round(before_ms / after_ms, 2) if after_ms > 0 else None,
+            })
+        cur.execute(f"DROP TABLE IF EXISTS {_quote(plain)}")
+        conn.commit()
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    for row in report:
+        print(row)
+    return report
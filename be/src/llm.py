@@ -1,8 +1,23 @@
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable
 from dotenv import load_dotenv
 
+from src.llm_scheduler import llm_scheduler
+
 load_dotenv()
 
+# 동일 프롬프트 응답 캐시 (0이면 비활성화)
+LLM_CACHE_TTL_SEC = float(os.getenv("LLM_CACHE_TTL_SEC", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+# Ollama가 모델과 KV cache를 메모리에 유지하는 시간
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
 
 def get_llm():
     """
@@ -19,6 +34,7 @@ def get_llm():
         return ChatOllama(
             base_url=os.getenv("OLLAMA_BASE_URL", "http://host.docker.internal:11434"),
             model=os.getenv("OLLAMA_MODEL", "qwen3:8b"),
+            keep_alive=OLLAMA_KEEP_ALIVE,
         )
 
     elif provider == "openai":
@@ -39,3 +55,255 @@ def get_llm():
 
     else:
         raise ValueError(f"지원하지 않는 LLM_PROVIDER: {provider}")
+
+
+def get_model_id() -> str:
+    """현재 provider/모델 식별자 (캐시 키에 사용)"""
+    provider = os.getenv("LLM_PROVIDER", "ollama")
+    model = {
+        "ollama": os.getenv("OLLAMA_MODEL", "qwen3:8b"),
+        "openai": os.getenv("OPENAI_MODEL_ID", "gpt-4o"),
+        "bedrock": os.getenv("BEDROCK_MODEL_ID", "openai.gpt-oss-120b-1:0"),
+    }.get(provider, "")
+    return f"{provider}:{model}"
+
+
+# ==================== Prompt 조립 ====================
+# 노드별 정적 preamble(스키마, 도구 설명, 규칙)은 한 번만 조립하여 재사용합니다.
+# system 메시지가 매 호출 byte 단위로 동일해야 Ollama가 이전 요청의 KV cache를 재사용하므로,
+# 시각/ID 등 호출마다 바뀌는 값은 반드시 dynamic 부분(human 메시지)에만 넣습니다.
+
+_prefixes: dict[str, tuple[tuple[str, ...], str]] = {}
+
+
+def prompt_prefix(node: str, *sections: str) -> str:
+    """
+    노드의 정적 prompt prefix 조립
+
+    각 section의 줄 끝 공백을 정리하고 빈 줄 하나로 이어 붙여 항상 같은 문자열을 만듭니다.
+    section이 이전 호출과 같으면 조립해 둔 문자열을 그대로 반환합니다 (스키마 변경 시에만 재조립).
+    """
+    cached = _prefixes.get(node)
+    if cached is not None and cached[0] == sections:
+        return cached[1]
+    normalized = ["\n".join(line.rstrip() for line in s.strip().splitlines()) for s in sections if s]
+    prefix = "\n\n".join(normalized)
+    _prefixes[node] = (sections, prefix)
+    return prefix
+
+
+def build_messages(prefix: str, dynamic: str) -> list:
+    """[정적 prefix(system), 동적 입력(human)] 메시지 구성"""
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    return [SystemMessage(content=prefix), HumanMessage(content=dynamic)]
+
+
+# ==================== 응답 캐시 / 노드별 사용량 ====================
+
+def _estimate_tokens(text: str) -> int:
+    """usage 정보가 없을 때 대략적인 토큰 수 (4 chars ≈ 1 token)"""
+    return max(len(text) // 4, 1) if text else 0
+
+
+def _message_text(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "".join(str(getattr(m, "content", m)) for m in messages)
+
+
+class LLMResponseCache:
+    """(모델, 프롬프트 hash) 기준 exact-match 응답 캐시 (TTL + 개수 제한 LRU)"""
+
+    def __init__(self, ttl_sec: float = LLM_CACHE_TTL_SEC, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_id: str, messages) -> str:
+        if isinstance(messages, str):
+            payload = messages
+        else:
+            payload = [(getattr(m, "type", ""), getattr(m, "content", m)) for m in messages]
+        data = json.dumps([model_id, payload], ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get(self, key: str):
+        if self.ttl_sec <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_sec:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, response) -> None:
+        if self.ttl_sec <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+            hits, misses = self.hits, self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_sec": self.ttl_sec,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+
+class LLMUsage:
+    """노드별 호출 수, 전송 토큰(prefix/dynamic), 응답 토큰, 캐시 hit, 지연 시간"""
+
+    def __init__(self):
+        self._nodes: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, node: str, messages, response, elapsed: float, cache_hit: bool) -> None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        prefix = messages[0].content if not isinstance(messages, str) and len(messages) > 1 else ""
+        prompt_tokens = usage.get("input_tokens") or _estimate_tokens(_message_text(messages))
+        completion_tokens = usage.get("output_tokens") or _estimate_tokens(str(getattr(response, "content", "")))
+
+        with self._lock:
+            stats = self._nodes.setdefault(node, {
+                "calls": 0, "cache_hits": 0, "prompt_tokens": 0, "prefix_tokens": 0,
+                "completion_tokens": 0, "latency_sec": 0.0,
+            })
+            stats["calls"] += 1
+            if cache_hit:
+                stats["cache_hits"] += 1
+                return
+            stats["prompt_tokens"] += prompt_tokens
+            stats["prefix_tokens"] += _estimate_tokens(prefix)
+            stats["completion_tokens"] += completion_tokens
+            stats["latency_sec"] += elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for node, stats in self._nodes.items():
+                llm_calls = stats["calls"] - stats["cache_hits"]
+                result[node] = {
+                    **stats,
+                    "latency_sec": round(stats["latency_sec"], 3),
+                    "avg_latency_sec": round(stats["latency_sec"] / llm_calls, 3) if llm_calls else 0.0,
+                    "avg_prompt_tokens": round(stats["prompt_tokens"] / llm_calls) if llm_calls else 0,
+                }
+            return result
+
+
+llm_cache = LLMResponseCache()
+llm_usage = LLMUsage()
+_llm = None
+
+
+def _shared_llm():
+    global _llm
+    if _llm is None:
+        _llm = get_llm()
+    return _llm
+
+
+def invoke_cached(node: str, messages, llm=None, use_cache: bool = True):
+    """
+    캐시를 거쳐 LLM 호출 (노드별 사용량 기록)
+
+    Args:
+        node: 호출한 노드명 ("classify", "interpreter" 등, 사용량 집계 단위)
+        messages: build_messages() 결과 또는 문자열 프롬프트
+        use_cache: False면 항상 LLM 호출 (결과는 캐시에 저장)
+
+    스케줄러를 거치지 않으므로 워크플로우 노드에서는 ainvoke_cached / astream_cached를 사용합니다.
+    """
+    key = LLMResponseCache.make_key(get_model_id(), messages)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            llm_usage.record(node, messages, cached, 0.0, cache_hit=True)
+            return cached
+
+    start = time.perf_counter()
+    response = (llm or _shared_llm()).invoke(messages)
+    llm_usage.record(node, messages, response, time.perf_counter() - start, cache_hit=False)
+    llm_cache.put(key, response)
+    return response
+
+
+async def ainvoke_cached(node: str, messages, llm=None, use_cache: bool = True):
+    """
+    invoke_cached의 async 버전 (LLM 스케줄러 경유)
+
+    동시 호출 수는 LLM_MAX_CONCURRENCY(MCP 서버의 /llm/invoke 호출 포함)로 제한되고, 현재 작업의 우선순위(llm_priority)에 따라 대기합니다.
+    """
+    key = LLMResponseCache.make_key(get_model_id(), messages)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            llm_usage.record(node, messages, cached, 0.0, cache_hit=True)
+            return cached
+
+    async def call():
+        start = time.perf_counter()
+        response = await (llm or _shared_llm()).ainvoke(messages)
+        llm_usage.record(node, messages, response, time.perf_counter() - start, cache_hit=False)
+        llm_cache.put(key, response)
+        return response
+
+    # 동일 프롬프트가 이미 실행/대기 중이면 그 결과를 공유 (use_cache=False면 공유하지 않고 직접 호출)
+    return await llm_scheduler.run(key if use_cache else None, call)
+
+
+# 워크플로우 실행 중 노드가 스트리밍한 토큰을 받을 콜백 (JobManager가 작업별로 설정)
+token_sink: ContextVar[Callable[[str, str], None] | None] = ContextVar("token_sink", default=None)
+
+
+async def astream_cached(node: str, messages, llm=None, use_cache: bool = True) -> AsyncIterator[str]:
+    """
+    LLM 응답을 토큰 단위로 yield (캐시 hit이면 전체 응답을 한 번에 yield)
+
+    - token_sink가 설정되어 있으면 (노드, 토큰)을 함께 전달하여 작업 SSE로 중계
+    - 소비 측이 중단(클라이언트 연결 종료 등)하면 LLM 요청도 함께 취소되고 캐시에 저장하지 않음
+    """
+    sink = token_sink.get()
+    key = LLMResponseCache.make_key(get_model_id(), messages)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            llm_usage.record(node, messages, cached, 0.0, cache_hit=True)
+            if sink:
+                sink(node, cached.content)
+            yield cached.content
+            return
+
+    response = None
+    async with llm_scheduler.slot():
+        start = time.perf_counter()
+        async for chunk in (llm or _shared_llm()).astream(messages):
+            response = chunk if response is None else response + chunk
+            if chunk.content:
+                if sink:
+                    sink(node, chunk.content)
+                yield chunk.content
+
+    if response is not None:
+        llm_usage.record(node, messages, response, time.perf_counter() - start, cache_hit=False)
+        llm_cache.put(key, response)
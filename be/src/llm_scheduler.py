@@ -0,0 +1,172 @@
+"""
+로컬 LLM 요청 스케줄러
+
+모델 서버(Ollama)가 동시에 처리할 수 있는 요청 수에 맞춰 호출을 제한하고,
+- 동일 프롬프트가 이미 실행/대기 중이면 한 번만 호출하여 결과를 공유 (in-flight coalescing)
+- 대기열에서는 interactive 요청을 background(drift 분석 등) 요청보다 먼저 실행
+- 우선순위별 대기 시간을 기록합니다.
+
+모델 서버를 쓰는 유일한 스케줄러입니다. MCP 서버(text_to_sql)도 직접 모델을 호출하지 않고
+백엔드의 POST /llm/invoke를 거치므로, 동시 실행 한도·우선순위·요청 병합이 두 프로세스의 호출에 함께 적용됩니다.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 모델 서버가 동시에 처리할 수 있는 요청 수 (예: OLLAMA_NUM_PARALLEL)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+if LLM_MAX_CONCURRENCY < 1:
+    raise ValueError(f"LLM_MAX_CONCURRENCY는 1 이상이어야 합니다 (설정값: {LLM_MAX_CONCURRENCY}).")
+
+PRIORITIES = {"interactive": 0, "background": 1}
+
+# 현재 작업의 우선순위 (JobManager가 작업 종류에 따라 설정)
+llm_priority: ContextVar[str] = ContextVar("llm_priority", default="interactive")
+
+
+class _Waiter:
+    __slots__ = ("priority", "future", "enqueued_at")
+
+    def __init__(self, priority: str):
+        self.priority = priority
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.perf_counter()
+
+
+class _Inflight:
+    """같은 key로 실행 중인 호출 1개와 그 결과를 기다리는 요청 수"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.max_concurrency = max(max_concurrency, 1)
+        self._running = 0
+        self._heap: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._inflight: dict[str, _Inflight] = {}
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.coalesced = 0
+        self._wait_stats = {name: {"count": 0, "total_sec": 0.0, "max_sec": 0.0} for name in PRIORITIES}
+
+    @asynccontextmanager
+    async def slot(self, priority: str | None = None):
+        """우선순위 대기열을 거쳐 실행 슬롯 1개를 점유 (취소/실패는 completed에 세지 않음)"""
+        priority = priority if priority in PRIORITIES else llm_priority.get()
+        start = time.perf_counter()
+        if self._running < self.max_concurrency and not self._heap:
+            self._running += 1
+        else:
+            waiter = _Waiter(priority)
+            heapq.heappush(self._heap, (PRIORITIES[priority], next(self._seq), waiter))
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    self._release()  # 슬롯을 받은 직후 취소된 경우 반납
+                raise
+        self._record_wait(priority, time.perf_counter() - start)
+
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+        finally:
+            self._release()
+
+    async def run(self, key: str | None, call: Callable[[], Awaitable], priority: str | None = None):
+        """
+        슬롯을 받아 call()을 실행
+
+        key가 같은 요청이 이미 실행/대기 중이면 새로 호출하지 않고 그 결과를 기다립니다.
+        호출은 기다리는 요청들이 공유하는 task에서 실행되며, 기다리는 요청이 모두 취소되었을 때만 취소됩니다.
+        """
+        if key is None:
+            async with self.slot(priority):
+                return await call()
+
+        entry = self._inflight.get(key)
+        if entry is None:
+            priority = priority if priority in PRIORITIES else llm_priority.get()
+            entry = self._inflight[key] = _Inflight(asyncio.ensure_future(self._call(key, call, priority)))
+        else:
+            self.coalesced += 1
+
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.waiters == 1 and not entry.task.done():
+                entry.task.cancel()
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+            raise
+        finally:
+            entry.waiters -= 1
+
+    async def _call(self, key: str, call: Callable[[], Awaitable], priority: str):
+        try:
+            async with self.slot(priority):
+                return await call()
+        finally:
+            entry = self._inflight.get(key)
+            if entry is not None and entry.task is asyncio.current_task():
+                del self._inflight[key]
+
+    def _release(self):
+        while self._heap:
+            _, _, waiter = heapq.heappop(self._heap)
+            if not waiter.future.done():
+                waiter.future.set_result(None)  # 슬롯을 그대로 넘김 (_running 유지)
+                return
+        self._running -= 1
+
+    def _record_wait(self, priority: str, waited: float):
+        stats = self._wait_stats[priority]
+        stats["count"] += 1
+        stats["total_sec"] += waited
+        stats["max_sec"] = max(stats["max_sec"], waited)
+
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "queued": sum(1 for _, _, w in self._heap if not w.future.done()),
+            "inflight_keys": len(self._inflight),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "coalesced": self.coalesced,
+            "queue_wait": {
+                name: {
+                    "count": s["count"],
+                    "avg_sec": round(s["total_sec"] / s["count"], 4) if s["count"] else 0.0,
+                    "max_sec": round(s["max_sec"], 4),
+                }
+                for name, s in self._wait_stats.items()
+            },
+        }
+
+
+llm_scheduler = LLMScheduler()
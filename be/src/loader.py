@@ -1,70 +1,408 @@
-import pandas as pd
-from sqlalchemy import create_engine
+import argparse
+import csv
+import io
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+import pandas as pd
+
+from src.db import get_engine
+from src.layout import (resolve_layout, create_table_sql, is_partitioned, ensure_month_partitions,
+                        apply_layout, rename_loaded, benchmark_layout)
+from src.rollups import ROLLUP_SOURCES, refresh_all
+from src.analysis_table import WIDE_TABLE, WIDE_SOURCES, LOT_COLUMNS, refresh_wide_table
+from src.staging import LOADER_CHUNK_ROWS, stage_workbook, iter_staged_chunks
+
 # 1. 환경 변수 로드 (.env 파일에서 DB 정보 가져오기)
 load_dotenv()
 
-USER = os.getenv("POSTGRES_USER", "myuser")
-PASSWORD = os.getenv("POSTGRES_PASSWORD", "mypassword")
-HOST = os.getenv("POSTGRES_HOST", "localhost")
-PORT = os.getenv("POSTGRES_PORT", "5432")
-DB_NAME = os.getenv("POSTGRES_DB", "agent_db")
+SHEETS = ["MI", "FDC", "PM", "BOM"]
 
-# 2. DB 연결 엔진 생성
-db_url = f"postgresql://{USER}:{PASSWORD}@{HOST}:{PORT}/{DB_NAME}?sslmode=require"
+# 시트 병렬 적재 수
+LOADER_WORKERS = int(os.getenv("LOADER_WORKERS", "4"))
+# upsert 모드의 시트별 자연키, 예: {"MI": ["lot_id", "wafer_id"], "PM": ["eqp_id", "date"]}
+NATURAL_KEYS = json.loads(os.getenv("LOADER_NATURAL_KEYS", "{}"))
 
-engine = create_engine(db_url)
+NULL = "\\N"
 
-def load_data_to_db(excel_file_path):
-    print(f"엑셀 파일 로딩 중: {excel_file_path}")
-    
-    try:
-        # 엑셀 파일 전체 읽기
-        xls = pd.ExcelFile(excel_file_path)
-        
-        if 'MI' in xls.sheet_names:
-            df_mi = pd.read_excel(xls, 'MI')
-            # DB 적재 (replace: 기존 거 지우고 새로 씀 / append: 뒤에 추가)
-            df_mi.to_sql('MI', engine, if_exists='replace', index=False)
-            print(f"MI 적재 완료 ({len(df_mi)}건)")
-        else:
-            print("'MI' 시트가 없습니다.")
+# 워크북 버전(hash)별 적재 이력 — 변경 없는 워크북 재적재 방지
+LOAD_HISTORY_DDL = """
+CREATE TABLE IF NOT EXISTS load_history (
+    workbook_hash TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    rows BIGINT NOT NULL,
+    loaded_at TIMESTAMP NOT NULL
+)
+"""
 
-        if 'FDC' in xls.sheet_names:
-            df_fdc = pd.read_excel(xls, 'FDC')
-            df_fdc.to_sql('FDC', engine, if_exists='replace', index=False)
-            print(f"FDC 적재 완료 ({len(df_fdc)}건)")
-        else:
-            print("'FDC' 시트가 없습니다.")
-
-        if 'PM' in xls.sheet_names:
-            df_pm = pd.read_excel(xls, 'PM')
-            # 날짜 컬럼은 datetime 형식으로 변환해주는 게 안전함
-            if 'date' in df_pm.columns:
-                df_pm['date'] = pd.to_datetime(df_pm['date'])
-                
-            df_pm.to_sql('PM', engine, if_exists='replace', index=False)
-            print(f"PM 적재 완료 ({len(df_pm)}건)")
-        else:
-            print("'PM' 시트가 없습니다.")
 
-        if 'BOM' in xls.sheet_names:
-            df_bom = pd.read_excel(xls, 'BOM')
-            df_bom.to_sql('BOM', engine, if_exists='replace', index=False)
-            print(f"BOM 적재 완료 ({len(df_bom)}건)")
+# replace 모드에서 교체할 테이블을 참조하는 뷰/외래키 (CASCADE로 함께 지우지 않음)
+DEPENDENTS_SQL = """
+SELECT DISTINCT v.oid::regclass::text
+FROM pg_depend d
+JOIN pg_rewrite r ON r.oid = d.objid
+JOIN pg_class v ON v.oid = r.ev_class
+WHERE d.refobjid = to_regclass(%(table)s) AND v.oid <> d.refobjid
+UNION
+SELECT conrelid::regclass::text || ' (' || conname || ')'
+FROM pg_constraint
+WHERE confrelid = to_regclass(%(table)s) AND conrelid <> confrelid
+"""
+
+
+class DependentObjectsError(Exception):
+    """replace 적재로 교체할 테이블을 다른 뷰/테이블이 참조하고 있을 때 발생"""
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _pg_type(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return "BOOLEAN"
+    if pd.api.types.is_integer_dtype(series):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(series):
+        return "DOUBLE PRECISION"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def _coerce(df: pd.DataFrame, types: dict[str, str]) -> pd.DataFrame:
+    """뒤쪽 chunk의 dtype이 첫 chunk(테이블 스키마)와 달라도 COPY가 실패하지 않도록 맞춤"""
+    df = df.copy()
+    for col, pg_type in types.items():
+        if pg_type == "BIGINT":
+            df[col] = pd.to_numeric(df[col]).astype("Int64")
+        elif pg_type == "DOUBLE PRECISION":
+            df[col] = pd.to_numeric(df[col])
+        elif pg_type == "TIMESTAMP":
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def _widen(cursor, table: str, df: pd.DataFrame, types: dict[str, str], partition: str | None = None) -> None:
+    """
+    뒤쪽 chunk에 소수/문자가 섞여 있으면 컬럼 타입을 넓힘 (BIGINT → DOUBLE PRECISION → TEXT, TIMESTAMP → TEXT)
+
+    partition 컬럼은 타입을 바꿀 수 없으므로 넓혀야 하면 ValueError
+    """
+    for col, pg_type in list(types.items()):
+        if pg_type == "TIMESTAMP":
+            values = pd.to_datetime(df[col], errors="coerce")
+            if not (values.isna() & df[col].notna()).any():
+                continue
+            widened = "TEXT"
+        elif pg_type in ("BIGINT", "DOUBLE PRECISION"):
+            values = pd.to_numeric(df[col], errors="coerce")
+            if (values.isna() & df[col].notna()).any():
+                widened = "TEXT"
+            elif pg_type == "BIGINT" and (values.dropna() % 1 != 0).any():
+                widened = "DOUBLE PRECISION"
+            else:
+                continue
         else:
-            print("'BOM' 시트가 없습니다.")
-            
-        print("\n 모든 데이터 적재가 완료되었습니다!")
+            continue
+        if col == partition:
+            raise ValueError(f"'{table}.{col}'은 파티션 컬럼이라 {pg_type} → {widened}로 넓힐 수 없습니다.")
+        cursor.execute(f"ALTER TABLE {_quote(table)} ALTER COLUMN {_quote(col)} TYPE {widened}")
+        types[col] = widened
+
+
+def _track_changes(df: pd.DataFrame, types: dict[str, str], changed: dict) -> None:
+    """
+    append chunk가 건드린 범위를 누적 (파생 테이블 증분 갱신용)
+
+    - days: 시간 컬럼별 날짜 — 이전 시각으로 늦게 들어온 행도 해당 날짜 bucket을 다시 집계
+    - lots: Lot 값 — 분석 테이블은 시각과 무관하게 이 Lot만 다시 생성
+    """
+    for col, pg_type in types.items():
+        if pg_type == "TIMESTAMP":
+            days = pd.DatetimeIndex(df[col].dropna().dt.floor("D").unique())
+            changed["days"].setdefault(col, set()).update(days.to_pydatetime())
+        elif col.lower() in LOT_COLUMNS:
+            changed["lots"].update(df[col].dropna().astype(str).unique())
+
+
+def _copy_chunk(cursor, table: str, df: pd.DataFrame) -> None:
+    """DataFrame을 CSV로 직렬화하여 COPY FROM STDIN으로 적재"""
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep=NULL, quoting=csv.QUOTE_MINIMAL,
+              date_format="%Y-%m-%d %H:%M:%S.%f")
+    buf.seek(0)
+    cols = ", ".join(_quote(c) for c in df.columns)
+    cursor.copy_expert(f"COPY {_quote(table)} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", buf)
+
+
+def load_sheet(excel_file_path: str, sheet: str, mode: str = "replace", table: str | None = None,
+               keys: list[str] | None = None, chunk_rows: int = LOADER_CHUNK_ROWS, manifest: dict | None = None,
+               chunks=None) -> dict:
+    """
+    시트 1개를 chunk 단위 COPY로 적재 (Parquet staging에서 읽음)
+
+    Args:
+        mode: "replace" (새 테이블에 적재 후 한 트랜잭션에서 교체) |
+              "append" (기존 테이블에 추가) |
+              "upsert" (자연키 기준 insert/update)
+        keys: upsert 자연키 (없으면 LOADER_NATURAL_KEYS)
+        manifest: 이미 만든 staging manifest (없으면 stage_workbook으로 조회 — 워크북 전체 hash 계산)
+        chunks: 이미 읽은 DataFrame chunk들 (없으면 staging에서 chunk_rows 행씩 읽음)
+
+    Returns:
+        {"sheet", "table", "rows", "seconds", "rows_per_sec", "layout_seconds", "changed"}
+        (layout_seconds: seconds 중 인덱스 생성 + ANALYZE 시간)
+        (changed: append 모드에서 적재한 행의 범위 {"days": {시간 컬럼: 날짜}, "lots": Lot}, 그 외 None)
+    """
+    table = table or sheet
+    keys = keys or NATURAL_KEYS.get(sheet)
+    if mode == "upsert" and not keys:
+        raise ValueError(f"'{sheet}' upsert 자연키가 없습니다 (LOADER_NATURAL_KEYS 설정 필요).")
+
+    start = time.perf_counter()
+    manifest = manifest or stage_workbook(excel_file_path)
+    total = 0
+    layout_seconds = 0.0
+    conn = get_engine().raw_connection()
+    try:
+        cur = conn.cursor()
+        target = f"{table}__loading" if mode == "replace" else table
+        types, layout, partitions = None, None, set()
+        changed = {"days": {}, "lots": set()} if mode == "append" else None
+
+        for df in chunks if chunks is not None else iter_staged_chunks(manifest, sheet, chunk_rows):
+            if types is None:
+                types = {col: _pg_type(df[col]) for col in df.columns}
+                layout = resolve_layout(sheet, types, mode, keys)
+                columns_ddl = ", ".join(f"{_quote(c)} {t}" for c, t in types.items())
+                if mode == "replace":
+                    cur.execute(f"DROP TABLE IF EXISTS {_quote(target)}")
+                    cur.execute(create_table_sql(target, columns_ddl, layout))
+                else:
+                    cur.execute(create_table_sql(target, columns_ddl, layout, if_not_exists=True))
+                    if layout["partition"] and not is_partitioned(cur, target):
+                        layout["partition"] = None  # 파티션 없이 만들어진 기존 테이블
+                if mode == "upsert":
+                    key_cols = ", ".join(_quote(k) for k in keys)
+                    cur.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(f'ux_{table}_natural_key')} "
+                                f"ON {_quote(table)} ({key_cols})")
+
+            _widen(cur, target, df, types, layout["partition"])
+            df = _coerce(df, types)
+            if changed is not None:
+                _track_changes(df, types, changed)
+            if layout["partition"]:
+                ensure_month_partitions(cur, target, layout["partition"], df[layout["partition"]], partitions)
+            if mode == "upsert":
+                _upsert_chunk(cur, table, df, keys)
+            else:
+                _copy_chunk(cur, target, df)
+            total += len(df)
+            if mode != "replace":
+                conn.commit()  # append/upsert는 chunk 단위로 커밋
+
+        if types is not None:
+            # 인덱스 생성 + ANALYZE (replace 모드는 교체 전에 새 테이블에 적용)
+            layout_start = time.perf_counter()
+            indexes = apply_layout(cur, target, layout)
+            layout_seconds = time.perf_counter() - layout_start
+            if mode == "replace":
+                # 적재가 끝난 뒤 한 트랜잭션에서 교체 (적재 중에도 기존 테이블 조회 가능)
+                # 참조하는 뷰/외래키가 있으면 말없이 함께 지우지 않고 적재를 중단
+                cur.execute(DEPENDENTS_SQL, {"table": _quote(table)})
+                dependents = [row[0] for row in cur.fetchall()]
+                if dependents:
+                    raise DependentObjectsError(
+                        f"'{table}'를 참조하는 객체가 있어 replace 적재를 중단합니다: {', '.join(dependents)} "
+                        f"(해당 객체를 먼저 삭제하거나 append/upsert 모드를 사용하세요)")
+                cur.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                cur.execute(f"ALTER TABLE {_quote(target)} RENAME TO {_quote(table)}")
+                rename_loaded(cur, target, table, indexes, partitions)
+        cur.execute(LOAD_HISTORY_DDL)
+        cur.execute(
+            "INSERT INTO load_history (workbook_hash, sheet, table_name, mode, rows, loaded_at) "
+            "VALUES (%s, %s, %s, %s, %s, now())",
+            (manifest["workbook_hash"], sheet, table, mode, total),
+        )
+        conn.commit()
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - start
+    return {"sheet": sheet, "table": table, "rows": total, "seconds": round(seconds, 3),
+            "rows_per_sec": round(total / seconds) if seconds > 0 else 0,
+            "layout_seconds": round(layout_seconds, 3), "changed": changed}
+
+
+def _upsert_chunk(cur, table: str, df: pd.DataFrame, keys: list[str]) -> None:
+    """임시 테이블에 COPY한 뒤 자연키 기준 INSERT ... ON CONFLICT DO UPDATE"""
+    staging = f"{table}__staging"
+    # 컬럼 타입이 넓혀졌을 수 있으므로 chunk마다 대상 테이블 구조로 다시 생성
+    cur.execute(f"DROP TABLE IF EXISTS {_quote(staging)}")
+    cur.execute(f"CREATE TEMP TABLE {_quote(staging)} (LIKE {_quote(table)} INCLUDING DEFAULTS)")
+    _copy_chunk(cur, staging, df)
+
+    cols = ", ".join(_quote(c) for c in df.columns)
+    key_cols = ", ".join(_quote(k) for k in keys)
+    updates = ", ".join(f"{_quote(c)} = EXCLUDED.{_quote(c)}" for c in df.columns if c not in keys)
+    conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    # 같은 chunk 안에 중복 키가 있으면 한 행만 반영 (ON CONFLICT가 같은 행을 두 번 갱신할 수 없음)
+    cur.execute(
+        f"INSERT INTO {_quote(table)} ({cols}) "
+        f"SELECT DISTINCT ON ({key_cols}) {cols} FROM {_quote(staging)} "
+        f"ON CONFLICT ({key_cols}) {conflict}"
+    )
+
+
+def _loaded_sheets(workbook_hash: str) -> set[str]:
+    """
+    마지막 적재가 이 워크북 버전인 시트
+
+    과거에 한 번이라도 적재한 적이 있는지가 아니라 테이블별 최신 적재 기준으로 판단합니다
+    (A → B → A 순서로 적재하면 세 번째 A는 건너뛰지 않음).
+    """
+    from sqlalchemy import text
+
+    with get_engine().begin() as conn:
+        conn.execute(text(LOAD_HISTORY_DDL))
+        rows = conn.execute(text(
+            "SELECT sheet FROM ("
+            "  SELECT DISTINCT ON (table_name) sheet, table_name, workbook_hash FROM load_history"
+            "  ORDER BY table_name, loaded_at DESC"
+            ") latest WHERE workbook_hash = :h AND table_name = sheet"
+        ), {"h": workbook_hash}).fetchall()
+    return {r[0] for r in rows}
+
+
+def load_data_to_db(excel_file_path, mode: str = "replace", workers: int = LOADER_WORKERS,
+                    force: bool = False) -> list[dict]:
+    """
+    MI/FDC/PM/BOM 시트를 병렬로 적재하고 시트별 처리량을 반환
+
+    워크북을 Parquet로 한 번 staging한 뒤 적재하며, 같은 내용의 워크북으로 이미 적재된 시트는 건너뜁니다
+    (force=True면 다시 적재).
+    """
+    print(f"엑셀 파일 로딩 중: {excel_file_path}")
+    manifest = stage_workbook(excel_file_path)
+    sheet_names = list(manifest["sheets"])
+
+    sheets = [s for s in SHEETS if s in sheet_names]
+    for missing in (s for s in SHEETS if s not in sheet_names):
+        print(f"'{missing}' 시트가 없습니다.")
+
+    if not force:
+        loaded = _loaded_sheets(manifest["workbook_hash"])
+        for sheet in (s for s in sheets if s in loaded):
+            print(f"{sheet} 변경 없음 (워크북 hash 동일) — 건너뜀")
+        sheets = [s for s in sheets if s not in loaded]
+
+    results = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(sheets)), 1)) as pool:
+        futures = {s: pool.submit(load_sheet, excel_file_path, s, mode, manifest=manifest) for s in sheets}
+        for sheet, future in futures.items():
+            try:
+                result = future.result()
+                results.append(result)
+                print(f"{sheet} 적재 완료 ({result['rows']}건, {result['rows_per_sec']} rows/s)")
+            except Exception as e:
+                print(f"{sheet} 적재 중 오류 발생: {e}")
+
+    # 집계(rollup) 테이블 갱신: append는 적재한 행의 날짜만, replace/upsert는 기존 행이 바뀌므로 전체 재계산
+    loaded = [r["sheet"] for r in results if r["sheet"] in ROLLUP_SOURCES]
+    days = {r["sheet"]: r["changed"]["days"] for r in results if r["sheet"] in loaded and r["changed"]}
+    for rollup in refresh_all(full=mode != "append", sources=loaded, days=days) if loaded else []:
+        print(f"{rollup['source']} rollup 갱신: {rollup}")
+
+    # MI × FDC 분석 테이블 갱신: 적재한 행의 Lot만 증분, PM이 바뀌거나 append가 아니면 전체 재생성
+    if any(r["sheet"] in WIDE_SOURCES for r in results):
+        full = mode != "append" or any(r["sheet"] == "PM" for r in results)
+        lots = set().union(*(r["changed"]["lots"] for r in results if r["sheet"] in WIDE_SOURCES and r["changed"]))
+        try:
+            print(f"{WIDE_TABLE} 갱신: {refresh_wide_table(full=full, lots=None if full else lots)}")
+        except Exception as e:
+            print(f"{WIDE_TABLE} 갱신 중 오류 발생: {e}")
+
+    elapsed = time.perf_counter() - start
+    total = sum(r["rows"] for r in results)
+    print(f"\n 모든 데이터 적재가 완료되었습니다! ({total}건, {elapsed:.2f}s, "
+          f"{round(total / elapsed) if elapsed > 0 else 0} rows/s)")
+    return results
+
+
+def benchmark(excel_file_path: str) -> list[dict]:
+    """
+    기존 to_sql 적재와 COPY 적재의 시트별 rows/s 비교 (임시 테이블 사용 후 삭제)
+
+    두 방식 모두 staging에서 한 번 읽은 같은 DataFrame을 적재하며 읽기 시간은 제외합니다.
+    COPY 적재의 인덱스 생성 + ANALYZE 시간(to_sql에는 없음)은 layout_seconds로 따로 보고합니다.
+    """
+    from sqlalchemy import text
+
+    engine = get_engine()
+    manifest = stage_workbook(excel_file_path)
+    report = []
+    for sheet in SHEETS:
+        if sheet not in manifest["sheets"]:
+            continue
+        df = pd.concat(list(iter_staged_chunks(manifest, sheet, LOADER_CHUNK_ROWS)), ignore_index=True)
+        chunks = [df.iloc[i:i + LOADER_CHUNK_ROWS] for i in range(0, len(df), LOADER_CHUNK_ROWS)]
+
+        start = time.perf_counter()
+        df.to_sql(f"{sheet}__bench_to_sql", engine, if_exists="replace", index=False)
+        to_sql_sec = time.perf_counter() - start
+
+        copy = load_sheet(excel_file_path, sheet, mode="replace", table=f"{sheet}__bench_copy",
+                          manifest=manifest, chunks=chunks)
+        copy_sec = copy["seconds"] - copy["layout_seconds"]
+
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE IF EXISTS {_quote(sheet + "__bench_to_sql")}'))
+            conn.execute(text(f'DROP TABLE IF EXISTS {_quote(sheet + "__bench_copy")}'))
+
+        report.append({
+            "sheet": sheet,
+            "rows": len(df),
+            "to_sql_rows_per_sec": round(len(df) / to_sql_sec) if to_sql_sec > 0 else 0,
+            "copy_rows_per_sec": round(len(df) / copy_sec) if copy_sec > 0 else 0,
+            "speedup": round(to_sql_sec / copy_sec, 2) if copy_sec > 0 else None,
+            "layout_seconds": copy["layout_seconds"],
+        })
+    for row in report:
+        print(row)
+    return report
 
-    except Exception as e:
-        print(f"데이터 적재 중 오류 발생: {e}")
 
 if __name__ == "__main__":
-    file_path = "data/dummy_data/etch_process_data.xlsx" 
-    if os.path.exists(file_path):
-        load_data_to_db(file_path)
+    parser = argparse.ArgumentParser(description="Excel(MI/FDC/PM/BOM) → PostgreSQL 적재")
+    parser.add_argument("file_path", nargs="?", default="data/dummy_data/etch_process_data.xlsx")
+    parser.add_argument("--mode", choices=["replace", "append", "upsert"], default="replace")
+    parser.add_argument("--workers", type=int, default=LOADER_WORKERS)
+    parser.add_argument("--bench", action="store_true", help="to_sql 대비 COPY 처리량 비교")
+    parser.add_argument("--force", action="store_true", help="변경 없는 워크북도 다시 적재")
+    parser.add_argument("--bench-layout", action="store_true",
+                        help="적재된 테이블의 인덱스/파티션 적용 전후 질의 지연 비교")
+    args = parser.parse_args()
+
+    if args.bench_layout:
+        for sheet in SHEETS:
+            try:
+                benchmark_layout(sheet)
+            except Exception as e:
+                print(f"{sheet} 벤치마크 실패: {e}")
+    elif not os.path.exists(args.file_path):
+        print("파일 확인 필요")
+    elif args.bench:
+        benchmark(args.file_path)
     else:
-        print("파일 확인 필요")
\ No newline at end of file
+        load_data_to_db(args.file_path, mode=args.mode, workers=args.workers, force=args.force)
@@ -1,17 +1,60 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, aclosing
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 import os
-import psycopg2
 import importlib.metadata
-import urllib.request
-import json
 from dotenv import load_dotenv
 
 from src.routers.workflow import router as workflow_router
+from src.schemas import LLMInvokeRequest
+from src.mcp_client import close_mcp_pool
+from src.connections import get_connections
+from src.jobs import JobQueueFull, get_job_manager, format_sse
+from src.agents.monitor import MONITOR_INTERVAL_SEC, run_monitor_loop
+from src.rollups import ROLLUP_INTERVAL_SEC, run_rollup_loop
+from src.agents.workflow import initial_state
 
 load_dotenv()
 
-app = FastAPI(title="Q-STAT Agent API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 공용 연결(DB 풀, HTTP 클라이언트) 및 백그라운드 상태 점검 시작
+    connections = get_connections()
+    await connections.start()
+
+    # 분석 작업 워커 시작
+    manager = get_job_manager()
+    await manager.start()
+
+    # SPC 주기 감시: 감지된 위반마다 분석 워크플로우 실행
+    monitor_task = None
+    if MONITOR_INTERVAL_SEC > 0:
+        def launch(trigger: dict):
+            try:
+                manager.submit("spc_violation", initial_state(trigger=trigger))
+            except JobQueueFull as e:
+                print(f"[monitor] {trigger['parameter']} 분석 작업 등록 실패: {e}")
+
+        monitor_task = asyncio.create_task(run_monitor_loop(launch))
+
+    # 집계(rollup) 테이블 주기 갱신 (적재 직후 갱신과 별도)
+    rollup_task = asyncio.create_task(run_rollup_loop()) if ROLLUP_INTERVAL_SEC > 0 else None
+
+    yield
+    # 종료 시 감시/집계 루프, 작업 워커 및 MCP 장기 세션 정리
+    for task in (monitor_task, rollup_task):
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    await manager.stop()
+    await close_mcp_pool()
+    await connections.stop()
+
+
+app = FastAPI(title="Q-STAT Agent API", version="0.1.0", lifespan=lifespan)
 
 # CORS: Vue.js 프론트엔드에서의 API 호출 허용
 app.add_middleware(
@@ -52,80 +95,70 @@ def check_env():
 
 
 @app.get("/check/db")
-def check_db():
-    """Supabase PostgreSQL 연결 점검"""
-    try:
-        conn = psycopg2.connect(
-            host=os.getenv("POSTGRES_HOST"),
-            database=os.getenv("POSTGRES_DB"),
-            user=os.getenv("POSTGRES_USER"),
-            password=os.getenv("POSTGRES_PASSWORD"),
-            port=os.getenv("POSTGRES_PORT", "5432"),
-            sslmode="require",
-        )
-        cur = conn.cursor()
-        cur.execute("SELECT version();")
-        version = cur.fetchone()[0]
-        cur.close()
-        conn.close()
-        return {"status": "ok", "version": version}
-    except Exception as e:
-        return {"status": "error", "detail": str(e)}
+async def check_db(refresh: bool = False):
+    """Supabase PostgreSQL 연결 점검 (백그라운드 점검 결과 캐시, refresh=true면 즉시 점검)"""
+    return await get_connections().health("db", refresh)
 
 
 @app.get("/check/chromadb")
-def check_chromadb():
+async def check_chromadb(refresh: bool = False):
     """ChromaDB 연결 점검"""
-    try:
-        url = "http://chromadb:8000/api/v2/heartbeat"
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req, timeout=3) as res:
-            data = json.loads(res.read())
-        return {"status": "ok", "heartbeat": data}
-    except Exception as e:
-        return {"status": "error", "detail": str(e)}
+    return await get_connections().health("chromadb", refresh)
 
 
 @app.get("/check/llm")
-def check_llm():
+async def check_llm(refresh: bool = False):
     """LLM 연결 점검"""
-    provider = os.getenv("LLM_PROVIDER", "ollama")
+    return await get_connections().health("llm", refresh)
+
+
+@app.get("/llm/stats")
+def llm_stats():
+    """노드별 LLM 호출 수, 전송 토큰(정적 prefix 포함), 캐시 hit, 지연 시간"""
+    from src.llm import get_model_id, llm_usage, llm_cache
+    from src.llm_scheduler import llm_scheduler
+    return {
+        "model": get_model_id(),
+        "cache": llm_cache.stats(),
+        "scheduler": llm_scheduler.snapshot(),
+        "nodes": llm_usage.snapshot(),
+    }
+
+
+@app.post("/llm/invoke")
+async def llm_invoke(request: LLMInvokeRequest):
+    """
+    MCP 서버의 LLM 호출 (백엔드와 같은 스케줄러·응답 캐시 경유)
+
+    모델 서버 동시 실행 한도, 우선순위 대기열, 동일 프롬프트 병합이 백엔드 노드 호출과 함께 적용됩니다.
+    """
+    from src.llm import ainvoke_cached
+    from src.llm_scheduler import PRIORITIES, llm_priority
+
+    if request.priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 priority: {request.priority}")
+    token = llm_priority.set(request.priority)
     try:
-        if provider == "ollama":
-            base_url = os.getenv("OLLAMA_BASE_URL", "http://host.docker.internal:11434")
-            model = os.getenv("OLLAMA_MODEL", "qwen3:8b")
-            url = f"{base_url}/api/tags"
-            req = urllib.request.Request(url)
-            with urllib.request.urlopen(req, timeout=5) as res:
-                data = json.loads(res.read())
-            model_names = [m["name"] for m in data.get("models", [])]
-            if any(model in name for name in model_names):
-                return {"status": "ok", "provider": "ollama", "model": model}
-            else:
-                return {"status": "error", "provider": "ollama", "detail": f"'{model}' 모델 없음. 설치된 모델: {model_names}"}
-        else:
-            aws_key = os.getenv("AWS_ACCESS_KEY_ID", "")
-            aws_secret = os.getenv("AWS_SECRET_ACCESS_KEY", "")
-            if not aws_key or not aws_secret:
-                return {"status": "error", "provider": "bedrock", "detail": "AWS 자격증명 미설정"}
-            return {
-                "status": "ok",
-                "provider": "bedrock",
-                "model": os.getenv("BEDROCK_MODEL_ID", "openai.gpt-oss-120b-1:0"),
-                "region": os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
-            }
-    except Exception as e:
-        return {"status": "error", "provider": provider, "detail": str(e)}
+        response = await ainvoke_cached(request.node, request.prompt)
+    finally:
+        llm_priority.reset(token)
+    return {"content": response.content}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """MCP 도구 호출 시간, 단계별 시간, 입력 행 수, 응답 크기 histogram (Prometheus text format)"""
+    from src.metrics import CONTENT_TYPE, render
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
 
 
 @app.post("/test/llm")
-def test_llm(prompt: str = "안녕하세요, 간단히 자기소개 해주세요."):
-    """LLM에 프롬프트를 보내고 응답을 확인하는 테스트 엔드포인트"""
+async def test_llm(prompt: str = "안녕하세요, 간단히 자기소개 해주세요."):
+    """LLM에 프롬프트를 보내고 응답을 확인하는 테스트 엔드포인트 (응답 캐시를 거치지 않고 항상 모델 호출)"""
     provider = os.getenv("LLM_PROVIDER", "ollama")
     try:
-        from src.llm import get_llm
-        llm = get_llm()
-        response = llm.invoke(prompt)
+        from src.llm import ainvoke_cached
+        response = await ainvoke_cached("test", prompt, use_cache=False)
         return {
             "status": "ok",
             "provider": provider,
@@ -137,5 +170,25 @@ def test_llm(prompt: str = "안녕하세요, 간단히 자기소개 해주세요
         return {"status": "error", "provider": provider, "detail": str(e)}
 
 
+@app.post("/test/llm/stream")
+async def test_llm_stream(request: Request, prompt: str = "안녕하세요, 간단히 자기소개 해주세요."):
+    """LLM 응답을 토큰 단위 SSE로 전송 (token → done | error), 클라이언트 연결 종료 시 생성 중단"""
+    from src.llm import astream_cached
+
+    async def event_stream():
+        try:
+            async with aclosing(astream_cached("test", prompt)) as tokens:
+                async for text in tokens:
+                    if await request.is_disconnected():
+                        return
+                    yield format_sse({"event": "token", "data": {"text": text}})
+            yield format_sse({"event": "done", "data": {}})
+        except Exception as e:
+            yield format_sse({"event": "error", "data": {"detail": str(e)}})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # --- 라우터 등록 ---
 app.include_router(workflow_router)
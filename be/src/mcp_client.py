@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+from datetime import timedelta
+from dotenv import load_dotenv
+
+from src.metrics import observe_tool_call
+
+load_dotenv()
+
+
+class MCPToolError(Exception):
+    """MCP 도구 호출 실패 (연결 오류 또는 도구가 error를 반환한 경우)"""
+
+
+class _PooledSession:
+    """
+    SSE 연결 1개와 ClientSession을 보유하는 슬롯
+
+    sse_client / ClientSession 컨텍스트는 연 task 안에서 닫아야 하므로
+    전용 task가 세션을 열고 stop 신호가 올 때까지 유지합니다.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session = None
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.error: Exception | None = None
+        self.task = asyncio.create_task(self._hold())
+
+    async def _hold(self):
+        from mcp.client.sse import sse_client
+        from mcp.client.session import ClientSession
+
+        try:
+            async with sse_client(url=self.url) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self.ready.set()
+                    await self.stop.wait()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.session = None
+            self.ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and not self.task.done()
+
+    async def close(self):
+        self.stop.set()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+
+class MCPSessionPool:
+    """
+    MCP 서버와의 장기 SSE 세션 풀
+
+    ClientSession은 요청 ID로 다중화되므로 세션 하나에서도 여러 call_tool을 동시에 보낼 수 있고,
+    풀은 여러 연결에 요청을 round-robin으로 분산합니다. 끊어진 세션은 다음 사용 시 재연결합니다.
+    """
+
+    def __init__(self, url: str | None = None, size: int | None = None):
+        self.url = url or os.getenv("MCP_SERVER_URL", "http://mcp:8000/sse")
+        self.size = size or int(os.getenv("MCP_POOL_SIZE", "2"))
+        self._slots: list[_PooledSession] = []
+        self._rr = itertools.count()
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            if not self._slots:
+                self._slots = [_PooledSession(self.url) for _ in range(self.size)]
+        await asyncio.gather(*(slot.ready.wait() for slot in self._slots))
+
+    async def _get_session(self):
+        if not self._slots:
+            await self.start()
+
+        for _ in range(self.size):
+            index = next(self._rr) % self.size
+            slot = self._slots[index]
+            await slot.ready.wait()
+            if slot.alive:
+                return slot.session
+
+            # 끊어진 세션 교체
+            async with self._lock:
+                if self._slots[index] is slot:
+                    await slot.close()
+                    self._slots[index] = _PooledSession(self.url)
+            await self._slots[index].ready.wait()
+            if self._slots[index].alive:
+                return self._slots[index].session
+
+        raise MCPToolError(f"MCP 서버 연결 실패: {self.url}")
+
+    async def call_tool(self, name: str, arguments: dict, timeout: float | None = None) -> dict:
+        """도구를 호출하고 JSON 결과(dict)를 반환 (호출 시간, 응답 크기, 도구 단계별 시간을 /metrics에 기록)"""
+        start = time.perf_counter()
+        try:
+            session = await self._get_session()
+            result = await session.call_tool(
+                name,
+                arguments,
+                read_timeout_seconds=timedelta(seconds=timeout) if timeout else None,
+            )
+        except Exception:
+            observe_tool_call(name, "failed", time.perf_counter() - start)
+            raise
+
+        text = "".join(c.text for c in result.content if getattr(c, "type", None) == "text")
+        if result.isError:
+            observe_tool_call(name, "failed", time.perf_counter() - start, response_bytes=len(text))
+            raise MCPToolError(text or f"{name} 호출 실패")
+
+        try:
+            output = json.loads(text)
+        except json.JSONDecodeError:
+            output = {"text": text}
+
+        failed = isinstance(output, dict) and output.get("error")
+        observe_tool_call(name, "error" if failed else "ok", time.perf_counter() - start, output, len(text))
+        if failed:
+            raise MCPToolError(output["error"])
+        return output
+
+    async def list_tools(self) -> list:
+        session = await self._get_session()
+        result = await session.list_tools()
+        return result.tools
+
+    async def close(self):
+        slots, self._slots = self._slots, []
+        await asyncio.gather(*(slot.close() for slot in slots), return_exceptions=True)
+
+
+_pool: MCPSessionPool | None = None
+
+
+def get_mcp_pool() -> MCPSessionPool:
+    """프로세스 공용 MCP 세션 풀 (첫 호출 시 연결)"""
+    global _pool
+    if _pool is None:
+        _pool = MCPSessionPool()
+    return _pool
+
+
+async def close_mcp_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
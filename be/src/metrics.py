@@ -0,0 +1,43 @@
+"""
+Prometheus 메트릭 (prometheus_client)
+
+backend에서 본 MCP 도구 호출 왕복 시간, 응답 크기와 MCP 서버가 돌려준 단계별 시간을 /metrics로 노출합니다.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+
+# 초 단위 지연 시간
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# 바이트 (1KB ~ 1GB, 4배 간격)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(11))
+# 행 수 (10 ~ 1e8)
+ROWS_BUCKETS = tuple(10 ** i for i in range(1, 9))
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+tool_call = Histogram(
+    "qstat_tool_call_seconds", "MCP 도구 호출 왕복 시간 (backend 측)", ("tool", "status"),
+    buckets=SECONDS_BUCKETS)
+tool_phase = Histogram(
+    "qstat_tool_phase_seconds", "MCP 도구 단계별 시간 (도구 결과의 timing)", ("tool", "phase"),
+    buckets=SECONDS_BUCKETS)
+tool_rows_in = Histogram("qstat_tool_rows_in", "MCP 도구 입력 행 수", ("tool",), buckets=ROWS_BUCKETS)
+tool_bytes_out = Histogram("qstat_tool_bytes_out", "MCP 도구 응답 크기 (bytes)", ("tool",), buckets=BYTES_BUCKETS)
+
+
+def render() -> bytes:
+    """Prometheus text exposition format (프로세스 기본 메트릭 포함)"""
+    return generate_latest()
+
+
+def observe_tool_call(name: str, status: str, seconds: float, output=None, response_bytes: int | None = None) -> None:
+    """MCP 도구 호출 1회 기록 (output의 timing은 MCP 서버의 단계별 계측 결과)"""
+    tool_call.labels(tool=name, status=status).observe(seconds)
+    if response_bytes is not None:
+        tool_bytes_out.labels(tool=name).observe(response_bytes)
+    timing = output.get("timing") if isinstance(output, dict) else None
+    if not timing:
+        return
+    for phase, ms in (timing.get("phases_ms") or {}).items():
+        tool_phase.labels(tool=name, phase=phase).observe(ms / 1000)
+    if timing.get("rows_in") is not None:
+        tool_rows_in.labels(tool=name).observe(timing["rows_in"])
@@ -0,0 +1,257 @@
+"""
+장비 × 파라미터 × 시간 bucket 집계(rollup) 테이블
+
+MI/FDC 원본 테이블의 숫자 컬럼(파라미터)별로 n, sum, sumsq, min, max를 시간/일 단위로 유지합니다.
+- rollup_hourly: 원본 테이블에서 집계
+- rollup_daily: rollup_hourly에서 재집계 (원본을 다시 읽지 않음)
+- rollup_watermarks: 테이블별로 마지막으로 반영한 시각
+
+append 적재 후에는 적재한 행이 속한 날짜의 bucket만 다시 계산하고 (이전 시각으로 늦게 들어온 행 포함),
+replace/upsert 적재(기존 행이 바뀜) 후에는 해당 테이블을 전체 재계산합니다.
+적재 정보 없이 실행하는 주기 갱신은 watermark가 속한 날짜 이후 bucket만 다시 계산합니다.
+평균 = sum / n, 표준편차 = sqrt((sumsq - sum^2 / n) / (n - 1))
+
+실행 (be/ 디렉토리에서):
+    python -m src.rollups                # 증분 갱신
+    python -m src.rollups --full         # 전체 재계산
+    python -m src.rollups --limits       # rollup_daily로 spc_control_limits 갱신
+"""
+import argparse
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+
+from src.db import get_engine
+from src.layout import KEY_COLUMNS, resolve_layout
+
+load_dotenv()
+
+# 집계 대상 원본 테이블 (쉼표 구분)
+ROLLUP_SOURCES = [s.strip() for s in os.getenv("ROLLUP_SOURCES", "MI,FDC").split(",") if s.strip()]
+# 주기적 증분 갱신 간격 (0이면 적재 직후에만 갱신)
+ROLLUP_INTERVAL_SEC = float(os.getenv("ROLLUP_INTERVAL_SEC", "0"))
+# 관리 한계 계산에 사용할 최근 일수
+ROLLUP_LIMIT_DAYS = int(os.getenv("ROLLUP_LIMIT_DAYS", "30"))
+
+ROLLUP_DDL = """
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+    source_table TEXT NOT NULL,
+    eqp_id TEXT NOT NULL,
+    parameter TEXT NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    n BIGINT NOT NULL,
+    sum DOUBLE PRECISION NOT NULL,
+    sumsq DOUBLE PRECISION NOT NULL,
+    min DOUBLE PRECISION,
+    max DOUBLE PRECISION,
+    PRIMARY KEY (source_table, eqp_id, parameter, bucket)
+);
+CREATE TABLE IF NOT EXISTS rollup_daily (LIKE rollup_hourly INCLUDING ALL);
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    source_table TEXT PRIMARY KEY,
+    time_column TEXT NOT NULL,
+    last_ts TIMESTAMP,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT now()
+);
+"""
+
+NUMERIC_TYPES = {"double precision", "real", "numeric", "bigint", "integer", "smallint"}
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _source_columns(cur, table: str) -> dict | None:
+    """원본 테이블의 (장비 컬럼, 시간 컬럼, 파라미터 컬럼) — 집계할 수 없으면 None"""
+    cur.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = 'public' AND table_name = %s ORDER BY ordinal_position",
+        (table,),
+    )
+    columns = cur.fetchall()
+    if not columns:
+        return None
+    types = {name: ("TIMESTAMP" if dtype.startswith("timestamp") else dtype.upper()) for name, dtype in columns}
+    layout = resolve_layout(table, types)
+    if not layout["composite"]:
+        return None
+    equipment, time_column = layout["composite"][0]
+
+    keys = {c.lower() for c in KEY_COLUMNS}
+    parameters = [name for name, dtype in columns if dtype in NUMERIC_TYPES and name.lower() not in keys]
+    if not parameters:
+        return None
+    return {"equipment": equipment, "time": time_column, "parameters": parameters}
+
+
+def refresh(source: str, full: bool = False, days: dict[str, set] | None = None) -> dict:
+    """
+    원본 테이블 1개의 rollup 갱신
+
+    Args:
+        full: True면 전체 재계산 (replace/upsert 적재 후)
+        days: append 적재한 행의 시간 컬럼별 날짜 (loader) — 주어지면 해당 날짜 bucket만 다시 계산.
+              없으면 watermark가 속한 날짜 이후만 계산하므로 그 이전 시각으로 늦게 들어온 행은
+              다음 전체 재계산 때 반영됨
+
+    Returns:
+        {"source", "full", "since", "days", "hourly_rows", "seconds"} 또는 {"source", "skipped"}
+    """
+    start = time.perf_counter()
+    conn = get_engine().raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(ROLLUP_DDL)
+        # 적재 직후 갱신과 주기 갱신이 겹치지 않도록 테이블별 잠금
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"rollup:{source}",))
+
+        cols = _source_columns(cur, source)
+        if cols is None:
+            conn.rollback()
+            return {"source": source, "skipped": "장비/시간/숫자 컬럼이 없거나 테이블이 없습니다."}
+
+        ts, eqp = _quote(cols["time"]), _quote(cols["equipment"])
+        since, batch_days = None, None
+        if not full and days is not None:
+            batch_days = sorted(days.get(cols["time"], ()))
+        elif not full:
+            cur.execute("SELECT date_trunc('day', last_ts) FROM rollup_watermarks "
+                        "WHERE source_table = %s AND time_column = %s", (source, cols["time"]))
+            row = cur.fetchone()
+            since = row[0] if row else None
+        full = since is None and batch_days is None
+
+        # 다시 계산할 bucket 범위 (rollup 테이블 조건, 원본 테이블 조건, 원본 조건 파라미터)
+        if full:
+            bucket_filter, raw_filter, raw_params = "", "", ()
+        elif since is not None:
+            bucket_filter, raw_filter, raw_params = " AND bucket >= %s", f" AND {ts} >= %s", (since,)
+        else:
+            # 시간 컬럼 BRIN 인덱스로 범위를 좁힌 뒤 날짜로 거름
+            bucket_filter = " AND date_trunc('day', bucket) = ANY(%s)"
+            raw_filter = f" AND {ts} >= %s AND {ts} < %s + interval '1 day' AND date_trunc('day', {ts}) = ANY(%s)"
+            raw_params = (batch_days[0], batch_days[-1], batch_days) if batch_days else ()
+        params = (source,) if full else (source, since if since is not None else batch_days)
+
+        hourly_rows = 0
+        if full or since is not None or batch_days:
+            cur.execute(f"DELETE FROM rollup_hourly WHERE source_table = %s{bucket_filter}", params)
+            cur.execute(f"DELETE FROM rollup_daily WHERE source_table = %s{bucket_filter}", params)
+
+            # 넓은(컬럼 = 파라미터) 테이블을 LATERAL VALUES로 세로로 펼쳐 집계
+            values = ", ".join(f"(%s, {_quote(p)}::double precision)" for p in cols["parameters"])
+            cur.execute(
+                f"""
+                INSERT INTO rollup_hourly (source_table, eqp_id, parameter, bucket, n, sum, sumsq, min, max)
+                SELECT %s, COALESCE({eqp}::text, ''), v.parameter, date_trunc('hour', {ts}),
+                       count(*), sum(v.value), sum(v.value * v.value), min(v.value), max(v.value)
+                FROM {_quote(source)} CROSS JOIN LATERAL (VALUES {values}) AS v(parameter, value)
+                WHERE v.value IS NOT NULL AND {ts} IS NOT NULL{raw_filter}
+                GROUP BY 2, 3, 4
+                """,
+                (source, *cols["parameters"], *raw_params),
+            )
+            hourly_rows = cur.rowcount
+            cur.execute(
+                f"""
+                INSERT INTO rollup_daily (source_table, eqp_id, parameter, bucket, n, sum, sumsq, min, max)
+                SELECT source_table, eqp_id, parameter, date_trunc('day', bucket),
+                       sum(n), sum(sum), sum(sumsq), min(min), max(max)
+                FROM rollup_hourly WHERE source_table = %s{bucket_filter}
+                GROUP BY 1, 2, 3, 4
+                """,
+                params,
+            )
+
+        cur.execute(f"SELECT max({ts}) FROM {_quote(source)}")
+        last_ts = cur.fetchone()[0]
+        cur.execute(
+            "INSERT INTO rollup_watermarks (source_table, time_column, last_ts, refreshed_at) "
+            "VALUES (%s, %s, %s, now()) ON CONFLICT (source_table) DO UPDATE SET "
+            "time_column = EXCLUDED.time_column, last_ts = EXCLUDED.last_ts, refreshed_at = now()",
+            (source, cols["time"], last_ts),
+        )
+        conn.commit()
+        cur.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {"source": source, "full": full, "since": since.isoformat() if since else None,
+            "days": len(batch_days) if batch_days is not None else None,
+            "hourly_rows": hourly_rows, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def refresh_all(full: bool = False, sources: list[str] | None = None,
+                days: dict[str, dict[str, set]] | None = None) -> list[dict]:
+    """sources의 rollup 갱신 (days: 원본 테이블별 refresh()의 days)"""
+    results = []
+    for source in sources or ROLLUP_SOURCES:
+        try:
+            results.append(refresh(source, full=full, days=(days or {}).get(source)))
+        except Exception as e:
+            results.append({"source": source, "error": str(e)})
+    return results
+
+
+async def run_rollup_loop(interval: float = ROLLUP_INTERVAL_SEC):
+    """interval마다 증분 갱신"""
+    while True:
+        started = time.monotonic()
+        for result in await asyncio.to_thread(refresh_all):
+            if "error" in result:
+                print(f"[rollup] {result['source']} 갱신 실패: {result['error']}")
+        await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+
+
+def sync_control_limits(source: str, days: int = ROLLUP_LIMIT_DAYS, sigma: float = 3.0) -> int:
+    """
+    최근 days일 rollup_daily로 파라미터별 관리 한계를 계산하여 spc_control_limits에 반영
+
+    같은 source로 계산한 한계만 갱신합니다 (spc_control_limits.source).
+    직접 설정한 한계(source NULL)나 다른 원본 테이블에서 계산한 같은 이름의 파라미터 한계는 덮어쓰지 않습니다.
+
+    Returns:
+        추가/갱신한 파라미터 수
+    """
+    from sqlalchemy import text
+
+    with get_engine().begin() as conn:
+        # source 컬럼이 없던 기존 DB (init.sql은 DB 최초 생성 시에만 실행)
+        conn.execute(text("ALTER TABLE spc_control_limits ADD COLUMN IF NOT EXISTS source TEXT"))
+        rows = conn.execute(text(
+            """
+            WITH totals AS (
+                SELECT parameter, sum(n) AS n, sum(sum) AS s, sum(sumsq) AS ss
+                FROM rollup_daily
+                WHERE source_table = :source
+                  AND bucket >= (SELECT date_trunc('day', max(bucket)) FROM rollup_daily
+                                 WHERE source_table = :source) - make_interval(days => :days)
+                GROUP BY parameter HAVING sum(n) > 1
+            )
+            INSERT INTO spc_control_limits (parameter, ucl, lcl, center_line, source)
+            SELECT parameter, s / n + :sigma * sd, s / n - :sigma * sd, s / n, :source
+            FROM (SELECT parameter, n, s, sqrt(greatest((ss - s * s / n) / (n - 1), 0)) AS sd FROM totals) t
+            ON CONFLICT (parameter) DO UPDATE SET
+                ucl = EXCLUDED.ucl, lcl = EXCLUDED.lcl, center_line = EXCLUDED.center_line
+            WHERE spc_control_limits.source = EXCLUDED.source
+            """
+        ), {"source": source, "days": days, "sigma": sigma})
+        return rows.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rollup 테이블 갱신")
+    parser.add_argument("--full", action="store_true", help="전체 재계산")
+    parser.add_argument("--limits", action="store_true", help="rollup_daily로 spc_control_limits 갱신")
+    args = parser.parse_args()
+
+    for result in refresh_all(full=args.full):
+        print(result)
+    if args.limits:
+        for source in ROLLUP_SOURCES:
+            print(f"{source}: 관리 한계 {sync_control_limits(source)}개 갱신")
@@ -1,41 +1,142 @@
-from fastapi import APIRouter
 from datetime import datetime
-import uuid
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
-from src.schemas import TaskRequest, DriftAlert, TaskResponse
+from src.schemas import TaskRequest, DriftAlert, TaskResponse, ReanalysisRequest
+from src.jobs import Job, JobQueueFull, FINISHED, get_job_manager, format_sse
+from src.checkpoints import CheckpointNotFound, get_checkpoint_store
+from src.alerts import get_alert_coalescer
+from src.agents.workflow import initial_state
 
 router = APIRouter()
 
 
-@router.post("/run-workflow", response_model=TaskResponse)
-async def run_workflow(request: TaskRequest):
-    task_id = str(uuid.uuid4())
+def _to_response(job: Job) -> TaskResponse:
+    state = job.state
+    interpretation = state.get("interpretation") or {}
+    recommendation = state.get("recommendation") or {}
 
-    # TODO: Orchestrator 에이전트 호출
-    # result = orchestrator.invoke({"user_input": request.user_input, ...})
+    if job.status == "completed":
+        summary = state.get("report") or "분석이 완료되었습니다."
+    elif job.status == "failed":
+        summary = f"분석 실패: {job.error}"
+    else:
+        summary = "분석 작업이 등록되었습니다." if job.status == "queued" else "분석 진행 중입니다."
 
+    insights = interpretation.get("key_insights") or []
+    actions = recommendation.get("actions") or []
     return TaskResponse(
-        task_id=task_id,
-        status="completed",
-        summary=f"[더미 응답] 입력: {request.user_input}",
-        root_cause=None,
-        recommended_action=None,
-        created_at=datetime.now(),
+        task_id=job.task_id,
+        status=job.status,
+        summary=summary,
+        root_cause=insights[0] if insights else None,
+        recommended_action=actions[0].get("description") if actions else None,
+        created_at=job.created_at,
     )
 
 
-@router.post("/drift-alert", response_model=TaskResponse)
+def _submit(kind: str, state: dict) -> TaskResponse:
+    try:
+        job = get_job_manager().submit(kind, state)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _to_response(job)
+
+
+@router.post("/run-workflow", response_model=TaskResponse, status_code=202)
+async def run_workflow(request: TaskRequest):
+    """분석 작업을 등록하고 즉시 task_id를 반환 (진행 상황은 /tasks/{task_id}/events)"""
+    return _submit("user_request", initial_state(request=request))
+
+
+@router.post("/drift-alert", response_model=TaskResponse, status_code=202)
 async def handle_drift(alert: DriftAlert):
-    task_id = str(uuid.uuid4())
+    """
+    같은 (eqp_id, metric) 알람은 마지막 알람 이후 window 안이면 하나의 워크플로우로 병합합니다.
+    새로 실행하지 않고 기존 task_id를 반환하며 (분석이 이미 끝났어도 동일),
+    window가 지난 뒤의 알람은 새 워크플로우로 실행합니다.
+    """
+    manager = get_job_manager()
 
-    # TODO: Orchestrator 에이전트 호출
-    # result = orchestrator.invoke({"drift_summary": alert.summary, ...})
+    def launch(trigger: dict) -> str:
+        return manager.submit("drift_alert", initial_state(trigger=trigger)).task_id
 
-    return TaskResponse(
-        task_id=task_id,
-        status="completed",
-        summary=f"[더미 응답] Drift 감지: {alert.summary}",
-        root_cause=None,
-        recommended_action=None,
-        created_at=datetime.now(),
-    )
+    def exists(task_id: str) -> bool:
+        return manager.get(task_id) is not None
+
+    try:
+        entry, launched = get_alert_coalescer().submit(alert, launch, exists)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # 병합은 저장소에 남아 있는 작업에만 하므로 작업은 항상 있음
+    job = manager.get(entry.task_id)
+    if not launched:
+        # 끝난 작업이면 분석에는 반영되지 않고 병합된 알람 정보만 작업 기록에 남김
+        trigger = entry.to_trigger()
+        if job.state.get("trigger") is not None:
+            job.state["trigger"].update(trigger)
+        if job.status not in FINISHED:
+            job.publish("alert_merged", trigger)
+    return _to_response(job)
+
+
+@router.get("/tasks/{task_id}", response_model=TaskResponse)
+async def get_task(task_id: str):
+    job = get_job_manager().get(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"task '{task_id}'를 찾을 수 없습니다.")
+    return _to_response(job)
+
+
+@router.get("/tasks/{task_id}/checkpoints")
+async def list_checkpoints(task_id: str):
+    """노드별 체크포인트 목록 (변경된 필드, delta 크기)"""
+    return {"task_id": task_id, "checkpoints": get_checkpoint_store().list(task_id)}
+
+
+@router.post("/tasks/{task_id}/reanalyze", response_model=TaskResponse, status_code=202)
+async def reanalyze(task_id: str, request: ReanalysisRequest):
+    """
+    체크포인트에서 분기하여 entry_node부터 다시 실행합니다.
+    이전 노드 출력은 복원하고, 이미 성공한 동일 도구 호출은 Executor에서 재사용합니다.
+    """
+    store = get_checkpoint_store()
+    try:
+        step = request.step if request.step is not None else store.latest_step(task_id)
+        state = store.restore_for(task_id, step, request.entry_node)
+    except CheckpointNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 이력에는 전체 snapshot 대신 체크포인트 참조만 남김
+    state["history"] = (state.get("history") or []) + [{
+        "task_id": task_id, "step": step, "entry_node": request.entry_node,
+        "created_at": datetime.now().isoformat(),
+    }]
+    if request.user_input:
+        state["interactions"] = (state.get("interactions") or []) + [{"role": "user", "content": request.user_input}]
+
+    try:
+        job = get_job_manager().submit("reanalysis", state, parent=(task_id, step), entry_node=request.entry_node)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _to_response(job)
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: str, request: Request):
+    """노드 완료 시마다 진행 상황과 부분 결과를 SSE로 전송"""
+    manager = get_job_manager()
+    if manager.get(task_id) is None:
+        raise HTTPException(status_code=404, detail=f"task '{task_id}'를 찾을 수 없습니다.")
+
+    async def event_stream():
+        async for item in manager.subscribe(task_id):
+            if await request.is_disconnected():
+                break
+            yield format_sse(item)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -7,6 +7,7 @@ class TaskRequest(BaseModel):
     user_input: str                    # "가스랑 PM 둘 다 p-value 구해봐"
     eqp_id: str | None = None         # 특정 장비 지정 (선택)
     lot_id: str | None = None         # 특정 Lot 지정 (선택)
+    sampling: dict | None = None      # 탐색용 표본 조회 (선택) {"method": "stratified", "strata": "eqp_id", "target_rows": 1000}
 
 
 # --- 스케줄러가 drift 감지했을 때 ---
@@ -22,8 +23,22 @@ class DriftAlert(BaseModel):
 # --- 최종 결과를 프론트에 반환할 때 ---
 class TaskResponse(BaseModel):
     task_id: str                       # 추적용 ID
-    status: str                        # "completed" / "failed"
+    status: str                        # "queued" / "running" / "completed" / "failed"
     summary: str                       # 분석 요약
     root_cause: str | None = None      # 추정 원인
     recommended_action: str | None = None  # 권장 조치
     created_at: datetime
+
+
+# --- 완료/실패한 분석을 체크포인트에서 재분석할 때 ---
+class ReanalysisRequest(BaseModel):
+    entry_node: str = "tool_selection"  # 다시 실행할 첫 노드 ("column_selector" | "tool_selection" | "executor" ...)
+    step: int | None = None             # 분기할 체크포인트 (None이면 마지막)
+    user_input: str | None = None       # 재분석 요청 내용 (선택)
+
+
+# --- MCP 서버(text_to_sql)가 백엔드 LLM 스케줄러를 거쳐 모델을 호출할 때 ---
+class LLMInvokeRequest(BaseModel):
+    prompt: str
+    node: str = "mcp"                  # 사용량 집계 단위 ("text_to_sql" 등)
+    priority: str = "interactive"      # "interactive" | "background"
@@ -0,0 +1,203 @@
+"""
+원본 엑셀 → Parquet staging 캐시
+
+- 워크북 내용 hash(sha256) + 시트명 기준으로 시트를 Parquet로 한 번만 변환
+- 이후 적재/분석은 Parquet에서 읽음 (memory-map, 필요한 컬럼만 로드)
+- 워크북이 바뀌지 않았으면 openpyxl 파싱을 다시 하지 않음
+
+디렉터리 구조:
+    {STAGING_DIR}/{hash}/manifest.json
+    {STAGING_DIR}/{hash}/{sheet}/part-00000.parquet ...
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+import pandas as pd
+
+load_dotenv()
+
+STAGING_DIR = os.getenv("STAGING_DIR", "data/staging")
+# 시트를 나눠 읽는 행 수 (엑셀 → Parquet 변환, COPY 적재 chunk)
+LOADER_CHUNK_ROWS = int(os.getenv("LOADER_CHUNK_ROWS", "50000"))
+# 날짜 컬럼은 datetime 형식으로 변환해주는 게 안전함
+DATE_COLUMNS = {"PM": ["date"]}
+# 최근 워크북 버전 몇 개의 staging을 유지할지
+STAGING_KEEP_VERSIONS = int(os.getenv("STAGING_KEEP_VERSIONS", "3"))
+
+
+def workbook_hash(path: str) -> str:
+    """워크북 파일 내용 sha256 (1MB씩 스트리밍)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _version_dir(digest: str) -> str:
+    return os.path.join(STAGING_DIR, digest[:32])
+
+
+def load_manifest(path: str, digest: str | None = None) -> dict | None:
+    """워크북에 해당하는 staging manifest (없으면 None)"""
+    digest = digest or workbook_hash(path)
+    manifest_path = os.path.join(_version_dir(digest), "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stage_workbook(path: str, chunk_rows: int | None = None) -> dict:
+    """
+    워크북의 모든 시트를 Parquet로 변환 (같은 내용의 워크북이 이미 staging 되어 있으면 재사용)
+
+    Returns:
+        manifest: {"workbook_hash", "source", "created_at", "sheets": {시트명: {"rows", "columns", "parts"}}}
+    """
+    digest = workbook_hash(path)
+    manifest = load_manifest(path, digest)
+    if manifest is not None:
+        return manifest
+
+    import pyarrow.parquet as pq
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    available = wb.sheetnames
+    wb.close()
+
+    version_dir = _version_dir(digest)
+    tmp_dir = version_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    start = time.perf_counter()
+    staged = {}
+    for sheet in available:
+        os.makedirs(os.path.join(tmp_dir, sheet))
+        parts, rows, columns = [], 0, []
+        for i, df in enumerate(iter_sheet_chunks(path, sheet, chunk_rows or LOADER_CHUNK_ROWS)):
+            part = os.path.join(sheet, f"part-{i:05d}.parquet")
+            pq.write_table(_to_arrow(df), os.path.join(tmp_dir, part))
+            parts.append(part)
+            rows += len(df)
+            columns = list(df.columns)
+        staged[sheet] = {"rows": rows, "columns": columns, "parts": parts}
+
+    manifest = {
+        "workbook_hash": digest,
+        "source": os.path.abspath(path),
+        "created_at": datetime.now().isoformat(),
+        "convert_seconds": round(time.perf_counter() - start, 3),
+        "sheets": staged,
+    }
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(tmp_dir, version_dir)
+    _prune_versions()
+    return manifest
+
+
+def iter_sheet_chunks(excel_file_path: str, sheet: str, chunk_rows: int = LOADER_CHUNK_ROWS):
+    """
+    시트를 chunk_rows 행씩 DataFrame으로 yield (openpyxl read-only 스트리밍, 시트 전체를 메모리에 올리지 않음)
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(excel_file_path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) for c in header]
+
+        buffer = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            buffer.append(row)
+            if len(buffer) >= chunk_rows:
+                yield _to_frame(sheet, buffer, columns)
+                buffer = []
+        if buffer:
+            yield _to_frame(sheet, buffer, columns)
+    finally:
+        wb.close()
+
+
+def _to_frame(sheet: str, rows: list, columns: list[str]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    df = df.infer_objects()
+    for col in DATE_COLUMNS.get(sheet, []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    return df
+
+
+def _to_arrow(df: pd.DataFrame):
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # 숫자/문자가 섞인 object 컬럼은 문자열로 저장
+        df = df.copy()
+        for col in df.select_dtypes(include="object").columns:
+            df[col] = df[col].map(lambda v: None if v is None else str(v))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _prune_versions():
+    """오래된 워크북 버전의 staging 삭제"""
+    versions = []
+    for entry in os.scandir(STAGING_DIR):
+        manifest_path = os.path.join(entry.path, "manifest.json")
+        if entry.is_dir() and os.path.exists(manifest_path):
+            versions.append((os.path.getmtime(manifest_path), entry.path))
+    for _, path in sorted(versions, reverse=True)[STAGING_KEEP_VERSIONS:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def iter_staged_chunks(manifest: dict, sheet: str, chunk_rows: int, columns: list[str] | None = None):
+    """staging된 시트를 chunk_rows 행씩 DataFrame으로 yield"""
+    import pyarrow.parquet as pq
+
+    version_dir = _version_dir(manifest["workbook_hash"])
+    for part in manifest["sheets"][sheet]["parts"]:
+        pf = pq.ParquetFile(os.path.join(version_dir, part), memory_map=True)
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+
+
+def read_sheet(path: str, sheet: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    분석용 시트 읽기 (필요 시 staging 후 Parquet에서 memory-map + 컬럼 pruning)
+
+    Args:
+        columns: 읽을 컬럼 (None이면 전체)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifest = stage_workbook(path)
+    if sheet not in manifest["sheets"]:
+        raise ValueError(f"'{sheet}' 시트가 없습니다.")
+
+    version_dir = _version_dir(manifest["workbook_hash"])
+    tables = [
+        pq.read_table(os.path.join(version_dir, part), columns=columns, memory_map=True)
+        for part in manifest["sheets"][sheet]["parts"]
+    ]
+    if not tables:
+        return pd.DataFrame(columns=columns or manifest["sheets"][sheet]["columns"])
+    # chunk마다 추론된 타입이 다를 수 있으므로 (int → double 등) 넓은 타입으로 통합
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
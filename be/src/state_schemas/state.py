@@ -22,6 +22,7 @@ class AnalysisState(TypedDict):
     execution: Optional[ExecutionResults]                 # Executor
     interpretation: Optional[InterpretationResults]       # Interpreter
     recommendation: Optional[ActionRecommendation]        # Action Advisor
+    sampling: Optional[Dict]                              # 탐색용 표본 조회 옵션 (없으면 전체 조회)
     
     # === 관리 ===
     history: List[Dict]         # 재분석 이력 (iteration별 snapshot)
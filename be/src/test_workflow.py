@@ -0,0 +1,108 @@
+"""
+백엔드 워크플로우 보조 모듈 점검 (DB/LLM 없이 실행 가능한 부분)
+
+실행 (be/ 디렉토리에서):
+    python -m src.test_workflow
+"""
+import time
+from datetime import datetime, timedelta
+
+from src.alerts import AlertCoalescer
+from src.checkpoints import CheckpointStore
+from src.schemas import DriftAlert
+
+
+def _alert(drift_pct: float, start_min: int, end_min: int) -> DriftAlert:
+    base = datetime(2024, 1, 1, 9, 0)
+    return DriftAlert(metric="cd_value", eqp_id="ETCHER_01", drift_pct=drift_pct,
+                      time_from=base + timedelta(minutes=start_min), time_to=base + timedelta(minutes=end_min),
+                      summary=f"drift {drift_pct}")
+
+
+def run_alert_checks():
+    print("\n[Test 1] AlertCoalescer")
+    jobs = {}
+    launched = []
+
+    def launch(trigger: dict) -> str:
+        task_id = f"task-{len(launched) + 1}"
+        launched.append(trigger)
+        jobs[task_id] = "running"
+        return task_id
+
+    def exists(task_id: str) -> bool:
+        return task_id in jobs
+
+    coalescer = AlertCoalescer(window_sec=0.2)
+    entry, new = coalescer.submit(_alert(0.2, 0, 10), launch, exists)
+    assert new and entry.task_id == "task-1"
+
+    # 실행 중 병합: 구간 병합 + 최대 drift 유지
+    entry, new = coalescer.submit(_alert(0.5, 5, 20), launch, exists)
+    assert not new and entry.count == 2 and entry.drift_pct == 0.5, entry.to_trigger()
+    assert entry.ranges == [(_alert(0, 0, 20).time_from, _alert(0, 0, 20).time_to)], entry.ranges
+
+    # 작업이 끝났어도 window 안이면 새로 실행하지 않고 같은 작업 반환
+    jobs["task-1"] = "completed"
+    entry, new = coalescer.submit(_alert(0.3, 30, 40), launch, exists)
+    assert not new and entry.task_id == "task-1" and len(launched) == 1, entry.to_trigger()
+
+    # sliding window: 마지막 알람 기준이므로 첫 알람 이후 window가 지나도 연속 알람은 병합
+    for i in range(3):
+        time.sleep(0.1)
+        entry, new = coalescer.submit(_alert(0.1, 40 + i, 41 + i), launch, exists)
+        assert not new and entry.task_id == "task-1", i
+    assert time.monotonic() - entry.first_seen > coalescer.window_sec
+
+    # 마지막 알람 이후 window가 지나면 새 워크플로우
+    time.sleep(0.25)
+    entry, new = coalescer.submit(_alert(0.4, 60, 70), launch, exists)
+    assert new and entry.task_id == "task-2" and entry.count == 1, entry.to_trigger()
+
+    # 작업 기록이 저장소에서 사라졌으면 window 안이어도 새로 실행
+    del jobs["task-2"]
+    entry, new = coalescer.submit(_alert(0.4, 70, 75), launch, exists)
+    assert new and entry.task_id == "task-3"
+    assert coalescer.stats()["launched_total"] == 3, coalescer.stats()
+    print("AlertCoalescer OK")
+
+
+def run_checkpoint_checks():
+    print("\n[Test 2] 표본 조회 실행의 재분석 복원")
+    store = CheckpointStore(":memory:", blob_min_bytes=64)
+    sampling = {"method": "stratified", "strata": "eqp_id", "target_rows": 1000}
+    state = {"trigger": None, "problem": None, "columns": None, "tools": None, "execution": None,
+             "interpretation": None, "recommendation": None, "report": None,
+             "history": [], "interactions": [], "sampling": sampling}
+    store.save("task-1", state)
+    updates = [
+        ("classify", {"problem": {"affected_parameter": "cd_value"}}),
+        ("column_selector", {"columns": {"columns": [{"column_name": "gas_flow"}]}}),
+        ("tool_selection", {"tools": {"assignments": []}}),
+        ("executor", {"execution": {"results": [{"status": "success", "assignment_key": "k",
+                                                 "sampling": {"n_effective": 900}}]}}),
+        ("interpreter", {"interpretation": {"key_insights": ["CI 보정"]}}),
+    ]
+    for node, update in updates:
+        state = {**state, **update}
+        step = store.save("task-1", state, node)
+
+    restored = store.restore_for("task-1", step, "executor")
+    assert restored["sampling"] == sampling, restored
+    assert restored["tools"] == {"assignments": []} and restored["execution"]["results"][0]["assignment_key"] == "k"
+    assert restored["interpretation"] is None, restored
+
+    # 재분석 작업에서 다시 재분석해도 sampling 유지
+    store.branch("task-1", step, "task-2", restored, None)
+    again = store.restore_for("task-2", 0, "interpreter")
+    assert again["sampling"] == sampling and again["execution"] == restored["execution"], again
+
+    # sampling 기록이 없는 이전 체크포인트는 전체 조회(None)로 복원
+    store.save("task-3", {"problem": {"affected_parameter": "cd_value"}, "history": [], "interactions": []})
+    assert store.restore_for("task-3", 0, "executor")["sampling"] is None
+    print("CheckpointStore OK")
+
+
+if __name__ == "__main__":
+    run_alert_checks()
+    run_checkpoint_checks()
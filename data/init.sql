@@ -1,2 +1,59 @@
 -- DB가 처음 켜질 때 실행되는 SQL
-CREATE TABLE IF NOT EXISTS connection_test (id SERIAL PRIMARY KEY);
\ No newline at end of file
+CREATE TABLE IF NOT EXISTS connection_test (id SERIAL PRIMARY KEY);
+
+-- Monitor: 측정 데이터 / SPC 관리 기준 / 파라미터별 감시 watermark
+CREATE TABLE IF NOT EXISTS metrology_data (
+    parameter TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    value DOUBLE PRECISION
+);
+-- 파라미터별 watermark 이후 구간만 index range scan
+CREATE INDEX IF NOT EXISTS idx_metrology_data_parameter_ts ON metrology_data (parameter, timestamp);
+
+CREATE TABLE IF NOT EXISTS spc_control_limits (
+    parameter TEXT PRIMARY KEY,
+    ucl DOUBLE PRECISION NOT NULL,
+    lcl DOUBLE PRECISION NOT NULL,
+    center_line DOUBLE PRECISION NOT NULL,
+    source TEXT  -- rollup으로 계산한 한계의 원본 테이블 (NULL이면 직접 설정한 한계)
+);
+
+CREATE TABLE IF NOT EXISTS monitor_watermarks (
+    parameter TEXT PRIMARY KEY,
+    last_ts TIMESTAMP NOT NULL,
+    rule_state JSONB,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- 워크북 버전(hash)별 적재 이력 (변경 없는 워크북 재적재 방지)
+CREATE TABLE IF NOT EXISTS load_history (
+    workbook_hash TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    rows BIGINT NOT NULL,
+    loaded_at TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_load_history_hash ON load_history (workbook_hash);
+CREATE INDEX IF NOT EXISTS idx_load_history_latest ON load_history (table_name, loaded_at DESC);
+
+-- 장비 × 파라미터 × 시간/일 bucket 집계 (be/src/rollups.py가 적재 후 증분 갱신)
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+    source_table TEXT NOT NULL,
+    eqp_id TEXT NOT NULL,
+    parameter TEXT NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    n BIGINT NOT NULL,
+    sum DOUBLE PRECISION NOT NULL,
+    sumsq DOUBLE PRECISION NOT NULL,
+    min DOUBLE PRECISION,
+    max DOUBLE PRECISION,
+    PRIMARY KEY (source_table, eqp_id, parameter, bucket)
+);
+CREATE TABLE IF NOT EXISTS rollup_daily (LIKE rollup_hourly INCLUDING ALL);
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    source_table TEXT PRIMARY KEY,
+    time_column TEXT NOT NULL,
+    last_ts TIMESTAMP,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT now()
+);
@@ -0,0 +1,106 @@
+"""
+MCP 서버 콜드 스타트 벤치마크
+
+`python -X importtime`으로 `src.server` import 비용을 측정하고
+startup_budget.json 의 예산과 비교합니다.
+
+실행 (mcp/ 디렉토리에서):
+    python -m src.bench_startup            # 측정 + 예산 검사 (초과 시 exit 1)
+    python -m src.bench_startup --top 20   # 가장 무거운 모듈 20개 출력
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+
+
+def measure_import(module: str = "src.server") -> dict:
+    """서브프로세스에서 module을 import하며 -X importtime 출력을 수집"""
+    cmd = [
+        sys.executable, "-X", "importtime", "-c",
+        f"import asyncio, {module} as m; asyncio.run(m.mcp.list_tools())",
+    ]
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"import 실패:\n{proc.stderr[-2000:]}")
+
+    modules = _parse_importtime(proc.stderr)
+    top_level = [m for m in modules if m["depth"] == 0]
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(m["cumulative_us"] for m in top_level) / 1000, 1),
+        "modules": modules,
+    }
+
+
+def check_budget(result: dict, budget: dict) -> list[str]:
+    """예산 위반 항목 목록 반환 (비어 있으면 통과)"""
+    problems = []
+    if result["import_ms"] > budget["import_ms"]:
+        problems.append(f"import 시간 {result['import_ms']}ms > 예산 {budget['import_ms']}ms")
+
+    loaded = {m["name"].split(".")[0] for m in result["modules"]}
+    for name in budget.get("forbidden_modules", []):
+        if name in loaded:
+            problems.append(f"기동 시 '{name}' 모듈이 import 되었습니다 (지연 로딩 대상)")
+
+    return problems
+
+
+def _parse_importtime(stderr: str) -> list[dict]:
+    """'import time:   self |  cumulative | name' 형식 파싱"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, raw_name = parts
+        modules.append({
+            "name": raw_name.strip(),
+            "depth": (len(raw_name) - len(raw_name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 서버 import-time 벤치마크")
+    parser.add_argument("--top", type=int, default=10, help="누적 시간 기준 상위 모듈 출력 개수")
+    parser.add_argument("--budget", default=BUDGET_PATH, help="예산 JSON 경로")
+    args = parser.parse_args()
+
+    with open(args.budget, encoding="utf-8") as f:
+        budget = json.load(f)
+
+    result = measure_import()
+    print(f"wall: {result['wall_ms']}ms / import: {result['import_ms']}ms (budget {budget['import_ms']}ms)")
+
+    print(f"\n[Top {args.top} cumulative]")
+    heaviest = sorted(result["modules"], key=lambda m: m["cumulative_us"], reverse=True)[:args.top]
+    for m in heaviest:
+        print(f"  {m['cumulative_us'] / 1000:8.1f}ms  {m['name']}")
+
+    problems = check_budget(result, budget)
+    if problems:
+        print("\n[Budget exceeded]")
+        for p in problems:
+            print(f"  - {p}")
+        sys.exit(1)
+
+    print("\n[OK] startup budget 통과")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+MCP 도구 확장성 벤치마크
+
+합성 데이터(행 수 × feature 수 × 그룹 cardinality)를 sweep하며 모든 도구를 직접 호출하고
+wall time, peak RSS, 입력/출력 payload 크기를 측정합니다.
+
+- 데이터: 수치 feature f0..f{k-1}, target y (feature와 선형 관계), 그룹 group (cardinality 지정),
+  2수준 pair, 5수준 cat, 1분 간격 ts → Executor와 같은 columnar(typed-array) payload로 전달
+- text_to_sql: LLM과 DB를 stub으로 대체 (스키마 pruning/검사/표본/직렬화 비용만 측정)
+- 측정 조합마다 서브프로세스에서 실행 (peak RSS가 이전 조합의 영향을 받지 않도록)
+- --save로 JSON baseline 저장, --compare로 baseline 대비 threshold 초과 악화 항목 검출 (exit 1)
+
+실행 (mcp/ 디렉토리에서):
+    python -m src.bench_tools                                   # quick 프로필 출력
+    python -m src.bench_tools --profile full --save             # 1e3~1e7행, 1~1000 feature baseline 저장
+    python -m src.bench_tools --compare --threshold 0.2         # baseline 대비 20% 이상 악화 시 exit 1
+    python -m src.bench_tools --tools correlation_analysis pca_analysis --rows 1000 100000 --features 10
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from src.tools.registry import TOOL_MODULES
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+
+PROFILES = {
+    "quick": {"rows": [1_000, 10_000], "features": [1, 10], "groups": [3]},
+    "full": {
+        "rows": [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+        "features": [1, 10, 100, 1000],
+        "groups": [2, 10, 100],
+    },
+}
+
+# 한 조합의 최대 값 개수 (행 × feature), 초과 조합은 skipped로 기록 (1e8 float64 ≈ 800MB)
+BENCH_MAX_CELLS = int(os.getenv("BENCH_MAX_CELLS", "100000000"))
+# 조합 1개 실행 제한 시간 (초)
+BENCH_CELL_TIMEOUT = float(os.getenv("BENCH_CELL_TIMEOUT_SEC", "900"))
+# 이보다 작은 시간/메모리 차이는 측정 잡음으로 보고 악화로 판단하지 않음
+NOISE_FLOOR = {"wall_ms": 5.0, "peak_rss_mb": 5.0, "payload_out_bytes": 1024}
+
+
+def generate(rows: int, features: int, groups: int, seed: int = 42):
+    """합성 데이터 DataFrame 생성"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    columns = {f"f{i}": rng.normal(100, 10, rows) for i in range(features)}
+    weights = rng.uniform(-1, 1, features)
+    y = sum(w * columns[f"f{i}"] for i, w in enumerate(weights[:10])) + rng.normal(0, 5, rows)
+    group_codes = rng.integers(0, groups, rows)
+    y = y + group_codes * 0.5  # 그룹 간 평균 차이
+
+    df = pd.DataFrame(columns)
+    df["y"] = y
+    df["group"] = pd.Categorical.from_codes(group_codes, [f"G{i:04d}" for i in range(groups)]).astype(str)
+    df["pair"] = np.where(rng.random(rows) < 0.5, "A", "B")
+    df["cat"] = pd.Categorical.from_codes(rng.integers(0, 5, rows), list("PQRST")).astype(str)
+    df["ts"] = pd.date_range("2024-01-01", periods=rows, freq="min")
+    return df
+
+
+def tool_arguments(tool: str, features: int) -> dict:
+    """도구별 호출 인자 (data 제외)"""
+    numeric = [f"f{i}" for i in range(features)]
+    return {
+        "correlation_analysis": {"target": "y", "features": numeric},
+        "regression_analysis": {"target": "y", "features": numeric},
+        "anova_test": {"target": "y", "features": ["group"]},
+        "t_test": {"target": "y", "features": ["pair"]},
+        "chi_square_test": {"target": "cat", "features": ["group"]},
+        "pca_analysis": {"target": "", "features": numeric, "options": {"n_components": min(2, features)}},
+        "time_series_analysis": {"target": "y", "features": ["ts"], "options": {"period": 60}},
+        "control_chart_analysis": {"target": "y", "features": [], "options": {"usl": 130, "lsl": 70}},
+        "generate_plot": {"chart_type": "scatter", "x_column": "f0", "y_column": "y", "group_column": "pair"},
+        "text_to_sql": {"natural_query": "ETCHER_01 장비의 최근 7일 y, f0 조회"},
+    }[tool]
+
+
+def _stub_text_to_sql(df) -> None:
+    """text_to_sql의 LLM/DB 호출을 합성 데이터로 대체"""
+    import types
+    import src.tools.text_to_sql as module
+    import src.utils.sql_guard as sql_guard
+
+    columns = list(df.columns)
+    catalog = {"FDC": [{"column": c, "type": "double precision" if c.startswith("f") or c == "y" else "text"}
+                       for c in columns]}
+    records = df.astype({"ts": str}).to_dict(orient="records")
+    sql = 'SELECT * FROM "FDC" WHERE "group" = \'G0000\' LIMIT 1000'
+
+    class StubLLM:
+        async def ainvoke(self, prompt, priority="interactive"):
+            return types.SimpleNamespace(content=f"```sql\n{sql}\n```")
+
+    def execute_query(query, timeout_ms=None):
+        return {"success": True, "data": records, "columns": columns, "row_count": len(records)}
+
+    module._get_llm = lambda: StubLLM()
+    module.get_table_schemas = lambda refresh=False: catalog
+    module.execute_query = execute_query
+    sql_guard.estimate = lambda query: {"total_cost": 1.0, "startup_cost": 0.0, "plan_rows": len(records),
+                                        "max_join_rows": 0, "node_type": "Seq Scan"}
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+
+
+def run_cell(tool: str, rows: int, features: int, groups: int, repeat: int = 1) -> dict:
+    """현재 프로세스에서 조합 1개 측정"""
+    from src.tools.registry import load_tool
+    from src.utils.columnar import encode_columns
+
+    df = generate(rows, features, groups)
+    fn = load_tool(tool)
+    arguments = tool_arguments(tool, features)
+    if tool == "text_to_sql":
+        _stub_text_to_sql(df)
+        payload_in = 0
+    else:
+        arguments["data"] = encode_columns(df)
+        payload_in = len(json.dumps(arguments["data"]))
+    del df
+
+    rss_before = _rss_mb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = asyncio.run(fn(**arguments))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "status": "error" if "error" in result else "ok",
+        "error": result.get("error"),
+        "wall_ms": round(min(timings), 2),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "rss_growth_mb": round(_rss_mb() - rss_before, 1),
+        "payload_in_bytes": payload_in,
+        "payload_out_bytes": len(json.dumps(result, default=str)),
+    }
+
+
+def measure(tool: str, rows: int, features: int, groups: int, repeat: int = 1) -> dict:
+    """서브프로세스에서 조합 1개 측정"""
+    cell = {"tool": tool, "rows": rows, "features": features, "groups": groups}
+    if rows * features > BENCH_MAX_CELLS:
+        return {**cell, "status": "skipped", "error": f"rows × features > BENCH_MAX_CELLS ({BENCH_MAX_CELLS:,})"}
+
+    cmd = [sys.executable, "-m", "src.bench_tools", "--cell", json.dumps({**cell, "repeat": repeat})]
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=BENCH_CELL_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {**cell, "status": "timeout", "error": f"{BENCH_CELL_TIMEOUT:.0f}초 초과"}
+    if proc.returncode != 0:
+        return {**cell, "status": "crashed", "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip()
+                else f"exit {proc.returncode}"}
+    return {**cell, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def cell_key(result: dict) -> str:
+    return f"{result['tool']}|rows={result['rows']}|features={result['features']}|groups={result['groups']}"
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """baseline 대비 threshold(비율) 초과로 악화된 항목 목록 (비어 있으면 통과)"""
+    previous = {cell_key(r): r for r in baseline.get("results", [])}
+    problems = []
+    for result in results:
+        base = previous.get(cell_key(result))
+        if base is None:
+            continue
+        if base.get("status") == "ok" and result.get("status") != "ok":
+            problems.append(f"{cell_key(result)}: {base['status']} → {result['status']} ({result.get('error')})")
+            continue
+        if result.get("status") != "ok":
+            continue
+        for metric, floor in NOISE_FLOOR.items():
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > floor:
+                problems.append(f"{cell_key(result)}: {metric} {old} → {new} (+{(new / old - 1) * 100 if old else 0:.0f}%)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 도구 확장성 벤치마크")
+    parser.add_argument("--profile", choices=list(PROFILES), default="quick")
+    parser.add_argument("--tools", nargs="+", choices=list(TOOL_MODULES), default=list(TOOL_MODULES))
+    parser.add_argument("--rows", nargs="+", type=int, help="행 수 목록 (프로필 대신)")
+    parser.add_argument("--features", nargs="+", type=int, help="feature 수 목록 (프로필 대신)")
+    parser.add_argument("--groups", nargs="+", type=int, help="그룹 cardinality 목록 (프로필 대신)")
+    parser.add_argument("--repeat", type=int, default=1, help="조합별 반복 횟수 (최소 시간 기록)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON 경로")
+    parser.add_argument("--save", action="store_true", help="결과를 baseline으로 저장")
+    parser.add_argument("--compare", action="store_true", help="baseline 대비 악화 검사 (초과 시 exit 1)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="악화 판단 비율 (0.2 = 20%%)")
+    parser.add_argument("--cell", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cell:
+        cell = json.loads(args.cell)
+        print(json.dumps(run_cell(cell["tool"], cell["rows"], cell["features"], cell["groups"], cell["repeat"])))
+        return
+
+    profile = PROFILES[args.profile]
+    grid = list(itertools.product(args.tools, args.rows or profile["rows"],
+                                  args.features or profile["features"], args.groups or profile["groups"]))
+    print(f"{len(grid)}개 조합 측정")
+    print(f"{'tool':<24}{'rows':>10}{'feat':>6}{'grp':>6}{'wall_ms':>12}{'rss_mb':>9}{'in_kb':>11}{'out_kb':>10}  status")
+
+    results = []
+    for tool, rows, features, groups in grid:
+        r = measure(tool, rows, features, groups, args.repeat)
+        results.append(r)
+        if r["status"] in ("ok", "error"):
+            print(f"{tool:<24}{rows:>10}{features:>6}{groups:>6}{r['wall_ms']:>12.1f}{r['peak_rss_mb']:>9.1f}"
+                  f"{r['payload_in_bytes'] / 1024:>11.1f}{r['payload_out_bytes'] / 1024:>10.1f}  {r['status']}"
+                  + (f" ({r['error']})" if r["error"] else ""))
+        else:
+            print(f"{tool:<24}{rows:>10}{features:>6}{groups:>6}{'-':>12}{'-':>9}{'-':>11}{'-':>10}  "
+                  f"{r['status']} ({r['error']})")
+
+    problems = []
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"\nbaseline 없음: {args.baseline} (--save로 먼저 저장)")
+            sys.exit(1)
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(results, json.load(f), args.threshold)
+
+    if args.save:
+        # 이번에 측정하지 않은 조합의 기존 baseline은 유지
+        baseline = {"results": []}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        merged = {cell_key(r): r for r in baseline["results"]}
+        merged.update({cell_key(r): r for r in results})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "results": list(merged.values())}, f, ensure_ascii=False, indent=2)
+        print(f"\nbaseline 저장: {args.baseline} ({len(merged)}개 조합)")
+
+    if problems:
+        print(f"\n[Regression > {args.threshold * 100:.0f}%]")
+        for p in problems:
+            print(f"  - {p}")
+        sys.exit(1)
+    if args.compare:
+        print("\n[OK] baseline 대비 악화 없음")
+
+
+if __name__ == "__main__":
+    main()
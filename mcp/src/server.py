@@ -1,8 +1,17 @@
-# mcp/src/server.py
+import asyncio
 from mcp.server.fastmcp import FastMCP
+from mcp.types import TextContent
 import os
+import time
+import pydantic_core
 from dotenv import load_dotenv
 
+from src.tools.registry import TOOL_MODULES, read_tool_spec, load_tool
+from src.utils.admission import admission, AdmissionError
+from src.utils.worker_pool import worker_pool
+from src.utils.memo import memo
+from src.utils.metrics import CONTENT_TYPE, observe_encoding, observe_tool, render
+
 load_dotenv()
 
 # MCP 서버 인스턴스 생성
@@ -11,32 +20,100 @@ mcp = FastMCP(
 )
 
 # --- 도구 등록 ---
-# 각 도구 모듈에서 함수를 import하여 MCP 도구로 등록합니다.
-# 아래는 등록 패턴 예시이며, 각 도구 구현 후 하나씩 추가합니다.
-
-from src.tools.text_to_sql import text_to_sql
-from src.tools.correlation import correlation_analysis
-from src.tools.regression import regression_analysis
-from src.tools.anova import anova_test
-from src.tools.t_test import t_test
-from src.tools.chi_square import chi_square_test
-from src.tools.pca import pca_analysis
-from src.tools.time_series import time_series_analysis
-from src.tools.control_chart import control_chart_analysis
-from src.tools.plot_generator import generate_plot
+# 도구 스키마(시그니처, docstring)는 소스에서 바로 읽어 등록하고,
+# 무거운 도구 모듈 import는 해당 도구가 처음 호출될 때 수행합니다.
+# 모든 호출은 admission 계층(동시 실행 제한, 대기열, 입력 크기 제한)을 거치며,
+# CPU 연산 도구는 입력이 크면 워커 프로세스 풀에서 실행하여 이벤트 루프를 막지 않습니다.
+# 같은 도구/인자/입력 데이터의 호출은 admission 전에 메모이제이션 캐시에서 바로 반환합니다
+# (cached: true, 조회 시간은 /metrics에 status="cached"로 기록).
+# 실행된 호출은 도구별 전체/단계별 시간, 입력 행 수, 결과 크기를 /metrics histogram에 기록합니다.
+# 결과는 여기서 FastMCP와 같은 방식으로 한 번만 JSON 인코딩하므로 직렬화 시간/크기는 실제 응답 기준입니다.
+
+
+def _make_lazy_tool(name: str):
+    spec = read_tool_spec(name)
+
+    async def run(kwargs: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            admission.check_payload(name, kwargs)
+            async with admission.admit(name):
+                if worker_pool.should_dispatch(name, kwargs):
+                    result = await worker_pool.run(name, TOOL_MODULES[name], kwargs)
+                else:
+                    fn = load_tool(name)
+                    result = await fn(**kwargs)
+            if isinstance(kwargs.get("data"), dict) and kwargs["data"].get("sampling"):
+                # 표본 데이터로 계산한 결과: 유효 표본 수와 보정된 신뢰구간 첨부
+                from src.utils.sampling import attach_report
+                result = await asyncio.to_thread(attach_report, result, kwargs)
+        except AdmissionError as e:
+            result = {"tool_name": name, "error": str(e), "rejected": e.reason}
+
+        elapsed = time.perf_counter() - start
+        if isinstance(result, dict) and not result.get("execution_time_ms"):
+            # 거절/워커 비정상 종료 등 도구가 실행되지 않은 경로도 실제 소요 시간 기록
+            result["execution_time_ms"] = int(elapsed * 1000)
+        observe_tool(name, result, elapsed)
+        return result
+
+    async def tool(**kwargs) -> dict:
+        start = time.perf_counter()
+        result = await memo.get_or_run(await memo.make_key(name, kwargs), lambda: run(kwargs))
+        if isinstance(result, dict) and result.get("cached"):
+            # 캐시/공유 결과는 run()을 거치지 않으므로 여기서 기록 (입력 fingerprint 시간 포함)
+            observe_tool(name, result, time.perf_counter() - start)
+        return _encode(name, result)
+
+    tool.__name__ = spec.name
+    tool.__qualname__ = spec.name
+    tool.__doc__ = spec.doc
+    tool.__signature__ = spec.signature
+    tool.__annotations__ = {
+        p.name: p.annotation
+        for p in spec.signature.parameters.values()
+        if p.annotation is not p.empty
+    }
+    tool.__annotations__["return"] = spec.signature.return_annotation
+    return tool
+
+
+def _encode(name: str, result) -> TextContent:
+    """FastMCP의 기본 변환(pydantic_core.to_json, indent=2)과 같은 텍스트로 인코딩하며 시간/크기 기록"""
+    start = time.perf_counter()
+    text = pydantic_core.to_json(result, fallback=str, indent=2).decode()
+    observe_encoding(name, time.perf_counter() - start, len(text.encode()))
+    return TextContent(type="text", text=text)
+
 
 # MCP 도구 등록
-mcp.tool()(text_to_sql)
-mcp.tool()(correlation_analysis)
-mcp.tool()(regression_analysis)
-mcp.tool()(anova_test)
-mcp.tool()(t_test)
-mcp.tool()(chi_square_test)
-mcp.tool()(pca_analysis)
-mcp.tool()(time_series_analysis)
-mcp.tool()(control_chart_analysis)
-mcp.tool()(generate_plot)
+for _name in TOOL_MODULES:
+    mcp.tool()(_make_lazy_tool(_name))
+
+
+@mcp.custom_route("/admission", methods=["GET"])
+async def admission_stats(request):
+    """동시 실행 수, 대기열 깊이, 대기 시간 등 admission 메트릭"""
+    from starlette.responses import JSONResponse
+    return JSONResponse(admission.snapshot())
+
+
+@mcp.custom_route("/memo", methods=["GET"])
+async def memo_stats(request):
+    """도구 결과 캐시 크기, hit rate"""
+    from starlette.responses import JSONResponse
+    return JSONResponse(memo.snapshot())
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request):
+    """도구별 전체/단계별 시간, 입력 행 수, 결과 크기 histogram (Prometheus text format)"""
+    from starlette.responses import Response
+    return Response(render(), media_type=CONTENT_TYPE)
 
 
 if __name__ == "__main__":
-    mcp.run(transport="sse")
\ No newline at end of file
+    if os.getenv("MCP_PRELOAD_TOOLS", "false").lower() == "true":
+        from src.tools.registry import preload_tools
+        preload_tools()
+    mcp.run(transport="sse")
@@ -10,6 +10,7 @@ from src.tools.chi_square import chi_square_test
 from src.tools.pca import pca_analysis
 from src.tools.time_series import time_series_analysis
 from src.tools.control_chart import control_chart_analysis
+from src.utils.columnar import encode_columns
 
 def create_dummy_data():
     """테스트용 더미 데이터 생성"""
@@ -116,5 +117,112 @@ async def run_tests():
     )
     print(res)
 
+    # 9. Columnar 입력 (행 단위 결과와 동일해야 함)
+    print("\n[Test 9] Columnar Input (typed-array)")
+    columnar = encode_columns(pd.DataFrame(data))
+    res_rows = await correlation_analysis(target="value1", features=["value2", "value3"], data=data)
+    res_cols = await correlation_analysis(target="value1", features=["value2", "value3"], data=columnar)
+    print(res_cols)
+    print("rows == columns:", res_rows["results"] == res_cols["results"])
+
+
+def run_sql_checks():
+    """text_to_sql 실행 전 검사 (DB/LLM 없이 실행 가능한 부분)"""
+    import src.utils.sql_guard as sql_guard
+    from src.utils.sql_validator import validate_sql
+    from src.utils.sampling import finalize, summarize
+
+    schemas = {
+        "MI": [{"column": "lot_id", "type": "text"}, {"column": "cd_value", "type": "double precision"}],
+        "FDC": [{"column": "lot_id", "type": "text"}, {"column": "Temp", "type": "double precision"}],
+    }
+
+    # 10. validate_sql
+    print("\n[Test 10] validate_sql")
+    # 서브쿼리 컬럼은 서브쿼리의 테이블 기준으로 검사
+    res = validate_sql('SELECT lot_id FROM "MI" WHERE lot_id IN (SELECT lot_id FROM "FDC" WHERE "Temp" > 1)', schemas)
+    assert res["errors"] == [], res
+    # 상관 서브쿼리: 안쪽 컬럼은 안쪽 테이블, 바깥 alias 참조는 바깥 테이블
+    res = validate_sql('SELECT lot_id, (SELECT avg("Temp") FROM "FDC" f WHERE f.lot_id = m.lot_id) FROM "MI" m', schemas)
+    assert res["errors"] == [], res
+    # 대소문자 자동 수정 시 원래 이름을 alias로 유지 (mi.lot_id 한정자 유지)
+    res = validate_sql("SELECT mi.lot_id FROM mi JOIN fdc ON fdc.lot_id = mi.lot_id WHERE temp > 1", schemas)
+    assert res["errors"] == [], res
+    assert 'FROM "MI" AS mi' in res["sql"] and 'JOIN "FDC" AS fdc' in res["sql"] and '"Temp"' in res["sql"], res
+    # 없는 컬럼은 후보와 함께 보고
+    res = validate_sql('SELECT cd_valu FROM "MI"', schemas)
+    assert len(res["errors"]) == 1 and "cd_value" in res["errors"][0], res
+    # 서브쿼리/CTE가 내보내는 컬럼을 고치면 원래 이름을 별칭으로 유지 (바깥 t.lot_id 참조 유지)
+    mixed = {"MI": [{"column": "Lot_ID", "type": "text"}], "FDC": [{"column": "Lot_ID", "type": "text"}]}
+    res = validate_sql('SELECT * FROM (SELECT lot_id FROM "MI") t WHERE t.lot_id = 1', mixed)
+    assert res["errors"] == [] and '(SELECT "Lot_ID" AS lot_id FROM "MI")' in res["sql"], res
+    assert "t.lot_id = 1" in res["sql"], res
+    res = validate_sql("WITH c AS (SELECT lot_id FROM mi) SELECT c.lot_id FROM c", mixed)
+    assert res["errors"] == [] and 'SELECT "Lot_ID" AS lot_id FROM "MI"' in res["sql"], res
+    # JOIN ... USING 컬럼도 대소문자 수정, 없는 이름은 오류
+    res = validate_sql("SELECT lot_id FROM mi JOIN fdc USING (lot_id)", mixed)
+    assert res["errors"] == [] and 'USING ("Lot_ID")' in res["sql"], res
+    res = validate_sql("SELECT 1 FROM mi JOIN fdc USING (lotid)", mixed)
+    assert len(res["errors"]) == 1 and "Lot_ID" in res["errors"][0], res
+    print("validate_sql OK")
+
+    # 11. guard / rewrite
+    print("\n[Test 11] guard / rewrite")
+    assert sql_guard.rewrite('SELECT * FROM "MI" LIMIT 10') == ('SELECT * FROM "MI" LIMIT 10', 10)
+    sql, limit = sql_guard.rewrite('SELECT * FROM "MI"')
+    assert limit == sql_guard.SQL_GUARD_MAX_ROWS and sql.endswith(f"LIMIT {limit}"), sql
+    for bad, reason in [('DELETE FROM "MI"', "not_select"), ("SELECT 1; SELECT 2", "not_select"),
+                        ("SELECT pg_sleep(10)", "denied_function"), ('SELECT * INTO t FROM "MI"', "not_select"),
+                        ("SELEC * FROM", "parse_error")]:
+        try:
+            sql_guard.rewrite(bad)
+        except sql_guard.SQLGuardError as e:
+            assert e.reason == reason, (bad, e.reason)
+        else:
+            raise AssertionError(f"거절되지 않음: {bad}")
+
+    # EXPLAIN 대신 고정 plan으로 비용 기반 downgrade/거절 확인
+    estimate = sql_guard.estimate
+    try:
+        plans = iter([{"total_cost": sql_guard.SQL_GUARD_MAX_COST * 2, "startup_cost": 0, "plan_rows": 10,
+                       "max_join_rows": 0, "node_type": "Seq Scan"},
+                      {"total_cost": 1.0, "startup_cost": 0, "plan_rows": 10, "max_join_rows": 0, "node_type": "Limit"}])
+        sql_guard.estimate = lambda sql: next(plans)
+        sql, plan = sql_guard.guard('SELECT * FROM "FDC"')
+        assert plan["downgraded"] and plan["limit"] == sql_guard.SQL_GUARD_DOWNGRADE_ROWS, plan
+
+        sql_guard.estimate = lambda sql: {"total_cost": 1.0, "startup_cost": 0, "plan_rows": 10,
+                                          "max_join_rows": sql_guard.SQL_GUARD_MAX_JOIN_ROWS * 2, "node_type": "Limit"}
+        try:
+            sql_guard.guard('SELECT * FROM "FDC", "MI"')
+        except sql_guard.SQLGuardError as e:
+            assert e.reason == "too_many_rows", e.reason
+        else:
+            raise AssertionError("cross join이 거절되지 않음")
+    finally:
+        sql_guard.estimate = estimate
+    print("guard / rewrite OK")
+
+    # 12. sampling.summarize
+    print("\n[Test 12] sampling.summarize")
+    info = summarize({"method": "bernoulli", "design_effect": 1.0, "fraction": 0.01, "population_rows": 100000}, 1000)
+    assert info["n_effective"] == 1000 and info["se_multiplier"] == 1.0, info
+    assert abs(info["se_inflation_vs_full"] - 10.0) < 1e-6, info
+    assert abs(info["finite_population_correction"] - 0.99 ** 0.5) < 1e-4, info
+    info = summarize({"method": "system", "design_effect": 2.0, "fraction": 0.01, "population_rows": 100000}, 1000)
+    assert info["n_effective"] == 500 and abs(info["se_multiplier"] - 2 ** 0.5) < 1e-4, info
+    # stratified: stratum 수가 표본보다 많아 잘린 경우에도 전체 stratum 수와 pre-sample 보정 모집단을 보고
+    rows = [{"eqp_id": f"E{i}", "_sample_rn": 1, "_stratum_rows": 10, "_total_rows": 5000, "_strata_total": 300}
+            for i in range(100)]
+    result = {"data": rows, "columns": ["eqp_id", "_sample_rn", "_stratum_rows", "_total_rows", "_strata_total"]}
+    info = finalize(result, {"method": "stratified", "strata": "eqp_id", "design_effect": 1.0,
+                             "presample_fraction": 0.01})
+    assert result["columns"] == ["eqp_id"] and info["population_rows"] == 500000, info
+    assert info["strata_count"] == 300 and info["strata_sampled"] == 100 and "warning" in info, info
+    assert abs(info["fraction"] - 100 / 500000) < 1e-12, info
+    print("sampling.summarize OK")
+
+
 if __name__ == "__main__":
+    run_sql_checks()
     asyncio.run(run_tests())
@@ -2,11 +2,13 @@ import time
 import pandas as pd
 from scipy import stats
 from src.utils.validators import validate_data
+from src.utils.instrument import instrumented
 
+@instrumented
 async def anova_test(
     target: str,
     features: list[str],
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
@@ -16,7 +18,7 @@ async def anova_test(
     Args:
         target: 종속변수 (수치형)
         features: 그룹 변수 목록 (범주형)
-        data: 분석할 데이터 리스트
+        data: 분석할 데이터 (행 단위 list[dict] 또는 {"columns": {컬럼명: [값]}})
         options: 예비 (현재 사용 안함)
     """
     start = time.time()
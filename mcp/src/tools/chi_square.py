@@ -4,11 +4,13 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 from src.utils.validators import validate_data
+from src.utils.instrument import instrumented
 
+@instrumented
 async def chi_square_test(
     target: str,
     features: list[str],
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
@@ -17,7 +19,7 @@ async def chi_square_test(
     Args:
         target: 첫 번째 범주형 변수
         features: [두 번째 범주형 변수]
-        data: 데이터 리스트
+        data: 데이터 (행 단위 list[dict] 또는 {"columns": {컬럼명: [값]}})
     """
     start = time.time()
     
@@ -3,11 +3,13 @@ import time
 import pandas as pd
 import numpy as np
 from src.utils.validators import validate_data
+from src.utils.instrument import instrumented
 
+@instrumented
 async def control_chart_analysis(
     target: str,
     features: list[str], # 선택사항 (그룹핑 변수 등)
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
@@ -16,7 +18,8 @@ async def control_chart_analysis(
     
     Args:
         target: 측정값 컬럼
-        options: {"usl": float, "lsl": float, "sigma": int (default 3)}
+        options: {"usl": float, "lsl": float, "sigma": int (default 3),
+                  "rollup": rollup_hourly/rollup_daily 행 (n, sum, sumsq) — 주면 관리한계를 이 집계로 계산}
     """
     start = time.time()
     options = options or {}
@@ -36,8 +39,12 @@ async def control_chart_analysis(
             return {"tool_name": "control_chart_analysis", "error": "Not enough data points", "execution_time_ms": 0}
 
         # 관리한계 계산 (CL: Mean, UCL, LCL)
-        mean_val = np.mean(values)
-        std_val = np.std(values, ddof=1) # Sample Std Dev
+        if options.get("rollup"):
+            # 집계 테이블 기준 기간의 한계 (raw 데이터를 다시 조회하지 않음)
+            mean_val, std_val = _rollup_stats(options["rollup"])
+        else:
+            mean_val = np.mean(values)
+            std_val = np.std(values, ddof=1) # Sample Std Dev
         
         ucl = mean_val + sigma_lvl * std_val
         lcl = mean_val - sigma_lvl * std_val
@@ -82,3 +89,17 @@ async def control_chart_analysis(
         "results": results,
         "execution_time_ms": int((time.time() - start) * 1000)
     }
+
+
+def _rollup_stats(rollup: list[dict] | dict) -> tuple[float, float]:
+    """bucket별 (n, sum, sumsq)를 합산하여 평균과 표본 표준편차 계산"""
+    is_valid, error, df = validate_data(rollup, ["n", "sum", "sumsq"])
+    if not is_valid:
+        raise ValueError(f"rollup: {error}")
+    n = float(pd.to_numeric(df["n"]).sum())
+    total = float(pd.to_numeric(df["sum"]).sum())
+    total_sq = float(pd.to_numeric(df["sumsq"]).sum())
+    if n < 2:
+        raise ValueError("rollup: 데이터가 2건 미만입니다.")
+    variance = max((total_sq - total * total / n) / (n - 1), 0.0)
+    return total / n, float(np.sqrt(variance))
@@ -3,12 +3,14 @@ import time
 import numpy as np
 from scipy import stats
 from src.utils.validators import validate_data, validate_numeric_columns, clean_numeric_data
+from src.utils.instrument import instrumented
 
 
+@instrumented
 async def correlation_analysis(
     target: str,
     features: list[str],
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
@@ -17,7 +19,7 @@ async def correlation_analysis(
     Args:
         target: 종속변수 컬럼명 (ex. "cd_value")
         features: 독립변수 컬럼명 목록 (ex. ["pressure", "temp_chuck", "gas_flow_total"])
-        data: 분석 대상 데이터
+        data: 분석 대상 데이터 (행 단위 list[dict] 또는 {"columns": {컬럼명: [값]}})
         options: {"method": "pearson" | "spearman" | "kendall"}
 
     Returns:
@@ -5,11 +5,13 @@ import numpy as np
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 from src.utils.validators import validate_data, validate_numeric_columns, clean_numeric_data
+from src.utils.instrument import instrumented
 
+@instrumented
 async def pca_analysis(
     target: str, # PCA에서는 Target이 필수가 아니지만, 인터페이스 통레를 위해 받음 (무시 가능)
     features: list[str],
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
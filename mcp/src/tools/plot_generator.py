@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 from src.utils.validators import validate_data
+from src.utils.instrument import instrumented
 
 
 CHART_TYPES = [
@@ -13,9 +14,10 @@ CHART_TYPES = [
 ]
 
 
+@instrumented
 async def generate_plot(
     chart_type: str,
-    data: list[dict],
+    data: list[dict] | dict,
     x_column: str,
     y_column: str | None = None,
     group_column: str | None = None,
@@ -28,7 +30,7 @@ async def generate_plot(
     Args:
         chart_type: 차트 유형 ("scatter" | "line" | "bar" | "histogram" |
                     "box" | "heatmap" | "control_chart")
-        data: 차트에 사용할 데이터
+        data: 차트에 사용할 데이터 (행 단위 list[dict] 또는 {"columns": {컬럼명: [값]}})
         x_column: X축 컬럼명
         y_column: Y축 컬럼명 (histogram은 불필요)
         group_column: 그룹핑 컬럼 (선택)
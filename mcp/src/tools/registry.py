@@ -0,0 +1,96 @@
+# mcp/src/tools/registry.py
+import ast
+import builtins
+import importlib
+import importlib.util
+import inspect
+from dataclasses import dataclass
+
+
+# 도구 이름 → 구현 모듈
+# 도구 모듈은 statsmodels, scikit-learn, plotly, langchain 등을 import하므로
+# 서버 기동 시에는 소스만 읽어 스키마를 만들고, 실제 import는 첫 호출 때 수행합니다.
+TOOL_MODULES = {
+    "text_to_sql": "src.tools.text_to_sql",
+    "correlation_analysis": "src.tools.correlation",
+    "regression_analysis": "src.tools.regression",
+    "anova_test": "src.tools.anova",
+    "t_test": "src.tools.t_test",
+    "chi_square_test": "src.tools.chi_square",
+    "pca_analysis": "src.tools.pca",
+    "time_series_analysis": "src.tools.time_series",
+    "control_chart_analysis": "src.tools.control_chart",
+    "generate_plot": "src.tools.plot_generator",
+}
+
+
+@dataclass
+class ToolSpec:
+    """import 없이 소스에서 추출한 도구 스키마"""
+    name: str
+    module: str
+    doc: str | None
+    signature: inspect.Signature
+
+
+def read_tool_spec(name: str) -> ToolSpec:
+    """도구 모듈 소스를 AST로 파싱하여 함수 시그니처와 docstring을 추출"""
+    module_path = TOOL_MODULES[name]
+    origin = importlib.util.find_spec(module_path).origin
+    with open(origin, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=origin)
+
+    for node in tree.body:
+        if isinstance(node, (ast.AsyncFunctionDef, ast.FunctionDef)) and node.name == name:
+            return ToolSpec(
+                name=name,
+                module=module_path,
+                doc=ast.get_docstring(node),
+                signature=_build_signature(node),
+            )
+
+    raise LookupError(f"'{module_path}'에서 도구 함수 '{name}'을(를) 찾을 수 없습니다.")
+
+
+def load_tool(name: str):
+    """실제 도구 함수를 import하여 반환 (첫 호출 시점)"""
+    module = importlib.import_module(TOOL_MODULES[name])
+    return getattr(module, name)
+
+
+def preload_tools() -> None:
+    """모든 도구 모듈을 미리 import (워커 예열 등 필요 시)"""
+    for name in TOOL_MODULES:
+        load_tool(name)
+
+
+def _build_signature(node: ast.AsyncFunctionDef | ast.FunctionDef) -> inspect.Signature:
+    args = node.args
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+
+    params = []
+    for arg, default in zip(positional, defaults):
+        params.append(inspect.Parameter(
+            arg.arg,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            default=inspect.Parameter.empty if default is None else ast.literal_eval(default),
+            annotation=_eval_annotation(arg.annotation),
+        ))
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        params.append(inspect.Parameter(
+            arg.arg,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=inspect.Parameter.empty if default is None else ast.literal_eval(default),
+            annotation=_eval_annotation(arg.annotation),
+        ))
+
+    return inspect.Signature(params, return_annotation=_eval_annotation(node.returns))
+
+
+def _eval_annotation(node: ast.expr | None):
+    """builtin 타입만 사용하는 어노테이션 (str, list[dict] | dict, dict | None 등) 평가"""
+    if node is None:
+        return inspect.Parameter.empty
+    code = compile(ast.Expression(node), "<annotation>", "eval")
+    return eval(code, {"__builtins__": builtins})
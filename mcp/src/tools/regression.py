@@ -4,12 +4,14 @@ import numpy as np
 from scipy import stats
 from sklearn.linear_model import LinearRegression
 from src.utils.validators import validate_data, validate_numeric_columns, clean_numeric_data
+from src.utils.instrument import instrumented
 
 
+@instrumented
 async def regression_analysis(
     target: str,
     features: list[str],
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 from src.utils.validators import validate_data
+from src.utils.instrument import instrumented
 
 def calculate_cohens_d(group1, group2):
     """Calculate Cohen's d for effect size."""
@@ -15,10 +16,11 @@ def calculate_cohens_d(group1, group2):
     
     return (np.mean(group1) - np.mean(group2)) / pooled_std if pooled_std != 0 else 0
 
+@instrumented
 async def t_test(
     target: str,
     features: list[str],
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
@@ -29,7 +31,7 @@ async def t_test(
         features: 
             - Independent: [그룹변수] (2개의 고유값 필요)
             - Paired: [두번째 수치변수] (target vs feature[0])
-        data: 데이터 리스트
+        data: 데이터 (행 단위 list[dict] 또는 {"columns": {컬럼명: [값]}})
         options: {"paired": bool, "equal_var": bool}
     """
     start = time.time()
@@ -1,33 +1,53 @@
 # mcp/src/tools/text_to_sql.py
+import asyncio
 import json
 import os
 import re
 from dotenv import load_dotenv
 from src.utils.db import execute_query, get_table_schemas
+from src.utils.llm_client import BackendLLM
+from src.utils.sql_guard import SQL_GUARD_MAX_ROWS, SQLGuardError, guard
+from src.utils.sampling import SamplingError, apply_sampling, check_options, finalize
+from src.utils.sql_validator import validate_sql
+from src.utils.schema_index import SCHEMA_TOP_K, estimate_tokens, get_schema_index
+from src.utils.instrument import instrumented, phase, set_rows_in
 
 load_dotenv()
 
 MAX_RETRIES = 2
 
+# be/src/rollups.py가 유지하는 장비 × 파라미터 × 시간/일 집계 테이블
+ROLLUP_TABLES = ("rollup_hourly", "rollup_daily")
+ROLLUP_GUIDE = """[집계 테이블 사용 규칙]
+- rollup_hourly / rollup_daily: 원본 테이블(source_table)의 숫자 컬럼(parameter)별 장비(eqp_id) × 시간/일(bucket) 집계
+- 장비/파라미터별 시간·일 단위 평균, 표준편차, 최소/최대, 건수 질의는 원본 대신 이 테이블을 사용하세요.
+- 평균 = sum / n, 표준편차 = sqrt((sumsq - sum * sum / n) / (n - 1))
+- 여러 bucket을 합칠 때는 SUM(n), SUM(sum), SUM(sumsq), MIN(min), MAX(max)로 다시 집계하세요.
+- 개별 측정값(raw)이나 Lot/Wafer 단위 조회는 원본 테이블을 사용하세요.
+"""
+
+# be/src/analysis_table.py가 적재 시 만드는 MI × FDC (× PM) 조인 결과
+WIDE_TABLE = "mi_fdc_wide"
+WIDE_GUIDE = """[분석 테이블 사용 규칙]
+- mi_fdc_wide: MI 행마다 같은 Lot/Wafer의 FDC 센서 평균(fdc_<컬럼>, fdc_rows)과 같은 장비의 직전 PM(pm_<컬럼>)을 붙인 테이블
+- MI와 FDC(또는 PM)를 함께 보는 질의는 직접 JOIN하지 말고 이 테이블을 조회하세요.
+"""
+
+
+_llm = None
+
 
 def _get_llm():
-    """LLM 인스턴스 반환 (be/src/llm.py와 동일한 패턴)"""
-    provider = os.getenv("LLM_PROVIDER", "ollama")
-
-    if provider == "ollama":
-        from langchain_ollama import ChatOllama
-        return ChatOllama(
-            base_url=os.getenv("OLLAMA_BASE_URL", "http://host.docker.internal:11434"),
-            model=os.getenv("OLLAMA_MODEL", "qwen3:8b"),
-        )
-    elif provider == "bedrock":
-        from langchain_aws import ChatBedrockConverse
-        return ChatBedrockConverse(
-            model=os.getenv("BEDROCK_MODEL_ID", "openai.gpt-oss-120b-1:0"),
-            region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"),
-        )
-    else:
-        raise ValueError(f"지원하지 않는 LLM_PROVIDER: {provider}")
+    """
+    LLM 클라이언트 반환 (프로세스에서 1회 생성)
+
+    모델을 직접 호출하지 않고 백엔드 LLM 스케줄러(POST /llm/invoke)를 거치므로
+    동시 실행 한도·우선순위·동일 프롬프트 병합이 백엔드 워크플로우 호출과 함께 적용됩니다.
+    """
+    global _llm
+    if _llm is None:
+        _llm = BackendLLM(node="text_to_sql")
+    return _llm
 
 
 def _extract_sql(response: str) -> str:
@@ -45,10 +65,13 @@ def _extract_sql(response: str) -> str:
     return response.strip()
 
 
+@instrumented
 async def text_to_sql(
     natural_query: str,
     target_db: str = "all",
     filters: dict | None = None,
+    priority: str = "interactive",
+    sampling: dict | None = None,
 ) -> dict:
     """
     자연어 질의를 SQL로 변환하여 실행합니다.
@@ -57,45 +80,120 @@ async def text_to_sql(
         natural_query: 자연어 질의 (ex. "ETCHER_01의 최근 7일 gas_flow_total 조회")
         target_db: 대상 테이블 ("MI" | "FDC" | "PM" | "BOM" | "all")
         filters: 추가 필터 조건 (선택)
+        priority: LLM 요청 우선순위 ("interactive" | "background", drift 분석 등은 background)
+        sampling: 탐색용 무작위 표본 조회 (선택, 없으면 전체/LIMIT 조회)
+            {"method": "bernoulli" | "system" | "stratified", "target_rows": int,
+             "percent": float (선택), "strata": "eqp_id" 등 (stratified 필수)}
+            bernoulli/system은 행 조회 쿼리에만 적용되며, 생성된 SQL이 집계/GROUP BY이면 에러를 반환합니다.
 
     Returns:
         성공: {"sql": str, "data": list, "columns": list, "column_types": dict,
-               "row_count": int, "execution_time_ms": int}
+               "row_count": int, "execution_time_ms": int, "plan_estimate": dict, "sql_fixes": list,
+               "schema_pruning": dict, "sampling": dict (sampling 지정 시),
+               "timing": {"phases_ms": {"schema", "llm", "validate", "plan", "execute", "compute"}, "rows_in"}}
         실패: {"error": str, "failed_sql": str, "retry_count": int}
-    """
-    import time
 
-    # 1. DB 스키마 정보 조회
-    schemas = get_table_schemas()
-    if not schemas:
+        execution_time_ms는 LLM 호출(재시도 포함)까지 포함한 도구 호출 전체 시간입니다.
+        DB 실행 시간만 보려면 timing.phases_ms["execute"]를 사용하세요.
+    """
+    # 1. DB 스키마 정보 조회 (캐시)
+    # DB 호출(psycopg)은 모두 동기이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+    with phase("schema"):
+        catalog = await asyncio.to_thread(get_table_schemas)
+    if not catalog:
         return {"error": "DB 스키마 조회 실패", "failed_sql": "", "retry_count": 0}
+    schemas = catalog
 
     # 대상 테이블 필터링
     if target_db != "all":
         target_upper = target_db.upper()
-        schemas = {k: v for k, v in schemas.items() if k.upper() == target_upper}
-        if not schemas:
+        matched = {k: v for k, v in schemas.items() if k.upper() == target_upper}
+        if not matched:
             return {"error": f"테이블 '{target_db}'를 찾을 수 없습니다.", "failed_sql": "", "retry_count": 0}
-
+        # 집계/조인 질의를 위해 rollup, 분석 테이블은 유지
+        derived = ROLLUP_TABLES + (WIDE_TABLE,)
+        schemas = {**matched, **{k: v for k, v in schemas.items() if k in derived}}
+
+    # 질의와 관련된 컬럼 top-k + 키 컬럼만 프롬프트에 포함
+    full_schema_text = _format_schema(schemas)
+    if SCHEMA_TOP_K > 0:
+        query_text = natural_query + (" " + " ".join(map(str, filters)) if filters else "")
+        # 임베딩 사용 시 동기 HTTP 호출이 있으므로 이벤트 루프 밖에서 실행
+        schemas = await asyncio.to_thread(get_schema_index(catalog).prune, query_text, schemas)
     schema_text = _format_schema(schemas)
+    full_tokens, pruned_tokens = estimate_tokens(full_schema_text), estimate_tokens(schema_text)
+    schema_pruning = {
+        "columns_total": sum(len(cols) for cols in catalog.values() if cols),
+        "columns_in_prompt": sum(len(cols) for cols in schemas.values()),
+        "schema_tokens_full": full_tokens,
+        "schema_tokens_pruned": pruned_tokens,
+        "tokens_saved": full_tokens - pruned_tokens,
+    }
+
+    if sampling is not None:
+        try:
+            check_options(sampling)
+        except SamplingError as e:
+            return {"error": str(e), "failed_sql": "", "retry_count": 0}
 
     # 2. LLM으로 SQL 생성
     llm = _get_llm()
     last_error = ""
     generated_sql = ""
+    sql_fixes = []
+    catalog_refreshed = False
 
     for attempt in range(MAX_RETRIES + 1):
-        prompt = _build_prompt(natural_query, schema_text, filters, last_error, attempt)
+        prompt = _build_prompt(natural_query, schema_text, filters, last_error, attempt, generated_sql,
+                               strata=(sampling or {}).get("strata"))
 
-        response = llm.invoke(prompt)
+        # 동시 LLM 호출 제한 + 동일 프롬프트 요청 병합은 백엔드 스케줄러에서 적용
+        with phase("llm"):
+            response = await llm.ainvoke(prompt, priority=priority)
         generated_sql = _extract_sql(response.content)
 
-        # 3. SQL 실행
-        start_time = time.time()
-        result = execute_query(generated_sql)
-        elapsed_ms = int((time.time() - start_time) * 1000)
+        # 스키마 캐시로 이름 검사 (DB 왕복 없음) — 대소문자/따옴표는 자동 수정, 나머지는 다음 시도에 전달
+        with phase("validate"):
+            check = validate_sql(generated_sql, catalog)
+            if check["errors"] and not catalog_refreshed:
+                # 캐시 이후 적재로 테이블/컬럼이 추가되었을 수 있으므로 1회 다시 조회
+                refreshed = await asyncio.to_thread(get_table_schemas, refresh=True)
+                catalog, catalog_refreshed = refreshed or catalog, True
+                check = validate_sql(generated_sql, catalog)
+        if check["errors"]:
+            last_error = "\n".join(check["errors"])
+            continue
+        generated_sql = check["sql"]
+        sql_fixes = check["fixes"]
+
+        # 표본 조회: LIMIT 대신 무작위 표본 (비율은 EXPLAIN 예상 행 수로 target_rows에 맞춤)
+        sample_meta = None
+        if sampling:
+            try:
+                with phase("plan"):
+                    generated_sql, sample_meta = await asyncio.to_thread(
+                        apply_sampling, generated_sql, sampling, SQL_GUARD_MAX_ROWS)
+            except SamplingError as e:
+                return {"error": str(e), "failed_sql": generated_sql, "retry_count": attempt}
+            except SQLGuardError as e:
+                last_error = f"[{e.reason}] {e}"
+                continue
+
+        # 3. 실행 전 검사 (SELECT 여부, LIMIT, EXPLAIN 비용) — 거절 사유는 다음 시도에 전달
+        try:
+            with phase("plan"):
+                generated_sql, plan_estimate = await asyncio.to_thread(guard, generated_sql)
+        except SQLGuardError as e:
+            last_error = f"[{e.reason}] {e}"
+            continue
+
+        # 4. SQL 실행 (쿼리별 statement_timeout)
+        with phase("execute"):
+            result = await asyncio.to_thread(execute_query, generated_sql,
+                                             timeout_ms=plan_estimate["statement_timeout_ms"])
 
         if result["success"]:
+            set_rows_in(result["row_count"])
             # 컬럼 타입 추출
             column_types = {}
             if result.get("data") and len(result["data"]) > 0:
@@ -103,14 +201,24 @@ async def text_to_sql(
                     sample = result["data"][0].get(col)
                     column_types[col] = type(sample).__name__ if sample is not None else "unknown"
 
-            return {
+            output = {
                 "sql": generated_sql,
                 "data": result["data"],
                 "columns": result["columns"],
                 "column_types": column_types,
                 "row_count": result["row_count"],
-                "execution_time_ms": elapsed_ms,
+                "plan_estimate": plan_estimate,
+                "sql_fixes": sql_fixes,
+                "schema_pruning": schema_pruning,
             }
+            if sample_meta is not None:
+                output["sampling"] = finalize(result, sample_meta)
+                output["columns"] = result["columns"]
+                output["row_count"] = len(result["data"])
+                for col in list(column_types):
+                    if col not in result["columns"]:
+                        column_types.pop(col)
+            return output
         else:
             last_error = result["error"]
 
@@ -126,12 +234,20 @@ def _format_schema(schemas: dict) -> str:
     """스키마를 LLM 프롬프트용 텍스트로 변환"""
     lines = []
     for table, columns in schemas.items():
-        cols = ", ".join([f"{c['column']} ({c['type']})" for c in columns])
+        cols = ", ".join([
+            f"{c['column']} ({c['type']}{': ' + c['description'] if c.get('description') else ''})"
+            for c in columns
+        ])
         lines.append(f"- {table}: {cols}")
+    if any(table in ROLLUP_TABLES for table in schemas):
+        lines.append("\n" + ROLLUP_GUIDE.rstrip())
+    if WIDE_TABLE in schemas:
+        lines.append("\n" + WIDE_GUIDE.rstrip())
     return "\n".join(lines)
 
 
-def _build_prompt(query: str, schema: str, filters: dict | None, last_error: str, attempt: int) -> str:
+def _build_prompt(query: str, schema: str, filters: dict | None, last_error: str, attempt: int,
+                  failed_sql: str = "", strata: str | None = None) -> str:
     """SQL 생성 프롬프트 구성"""
     prompt = f"""당신은 PostgreSQL 전문가입니다. 자연어 질의를 SQL로 변환하세요.
 
@@ -148,15 +264,18 @@ def _build_prompt(query: str, schema: str, filters: dict | None, last_error: str
     if attempt > 0 and last_error:
         prompt += f"""
 [이전 시도 실패]
+SQL: {failed_sql}
 에러: {last_error}
 위 에러를 수정하여 올바른 SQL을 다시 작성하세요.
 """
 
     prompt += """
 규칙:
-- SELECT 문만 허용 (INSERT, UPDATE, DELETE 금지)
+- SELECT 문만 허용 (INSERT, UPDATE, DELETE 금지, 실행 전 검사에서 거절됨)
 - SQL만 출력하세요. 설명 없이 SQL 코드블록만 반환하세요.
 - 테이블명과 컬럼명은 큰따옴표로 감싸세요 (PostgreSQL 대소문자 구분).
 - LIMIT 1000을 기본으로 추가하세요 (대량 조회 방지).
 """
+    if strata:
+        prompt += f"- 층화 표본 추출에 사용하므로 SELECT 결과에 \"{strata}\" 컬럼을 반드시 포함하세요.\n"
     return prompt
\ No newline at end of file
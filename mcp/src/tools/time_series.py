@@ -5,11 +5,13 @@ import numpy as np
 from statsmodels.tsa.seasonal import seasonal_decompose
 from statsmodels.tsa.stattools import acf
 from src.utils.validators import validate_data
+from src.utils.instrument import instrumented
 
+@instrumented
 async def time_series_analysis(
     target: str,
     features: list[str], # [timestamp_column]
-    data: list[dict],
+    data: list[dict] | dict,
     options: dict | None = None,
 ) -> dict:
     """
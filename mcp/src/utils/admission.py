@@ -0,0 +1,208 @@
+# mcp/src/utils/admission.py
+import asyncio
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# 우선순위 클래스 (값이 작을수록 먼저 실행)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+class AdmissionError(Exception):
+    """동시 실행/대기열/요청 크기 제한으로 실행을 거절할 때 발생"""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _parse_limits(raw: str) -> dict[str, int]:
+    """"pca_analysis=2,time_series_analysis=1" → {"pca_analysis": 2, ...}"""
+    limits = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class _Waiter:
+    __slots__ = ("tool", "priority", "seq", "future", "enqueued_at")
+
+    def __init__(self, tool: str, priority: int, seq: int):
+        self.tool = tool
+        self.priority = priority
+        self.seq = seq
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    도구 실행 승인 계층
+
+    - 전체 동시 실행 수 (MCP_MAX_CONCURRENT) 및 도구별 동시 실행 수 (MCP_TOOL_CONCURRENCY)
+    - 제한 초과 시 bounded 대기열 (MCP_MAX_QUEUE), 대기 시한 (MCP_QUEUE_TIMEOUT_SEC)
+    - 입력 크기 제한 (MCP_MAX_PAYLOAD_CELLS = 행 수 × 컬럼 수)
+    - 대화형 도구 (MCP_INTERACTIVE_TOOLS, 기본 text_to_sql) 우선 실행
+    """
+
+    def __init__(self):
+        self.max_concurrent = int(os.getenv("MCP_MAX_CONCURRENT", "8"))
+        self.default_tool_limit = int(os.getenv("MCP_TOOL_CONCURRENCY_DEFAULT", str(self.max_concurrent)))
+        self.tool_limits = _parse_limits(os.getenv("MCP_TOOL_CONCURRENCY", ""))
+        self.max_queue = int(os.getenv("MCP_MAX_QUEUE", "64"))
+        self.queue_timeout = float(os.getenv("MCP_QUEUE_TIMEOUT_SEC", "30"))
+        self.max_payload_cells = int(os.getenv("MCP_MAX_PAYLOAD_CELLS", "5000000"))
+        self.interactive_tools = set(os.getenv("MCP_INTERACTIVE_TOOLS", "text_to_sql").split(","))
+
+        self._running_total = 0
+        self._running: dict[str, int] = {}
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+
+        # 메트릭
+        self._admitted_total: dict[str, int] = {}
+        self._rejected_total: dict[str, int] = {}
+        self._wait_seconds_sum = 0.0
+        self._wait_seconds_max = 0.0
+        self._wait_count = 0
+
+    def priority_of(self, tool: str) -> int:
+        return PRIORITY_INTERACTIVE if tool in self.interactive_tools else PRIORITY_BATCH
+
+    def check_payload(self, tool: str, kwargs: dict) -> None:
+        """data 인자 크기 검사 (초과 시 AdmissionError)"""
+        if "data" not in kwargs:
+            return
+
+        from src.utils.columnar import payload_shape
+        rows, cols = payload_shape(kwargs["data"])
+        if rows * cols > self.max_payload_cells:
+            self._reject("payload_too_large")
+            raise AdmissionError(
+                "payload_too_large",
+                f"입력 데이터가 너무 큽니다: {rows}행 × {cols}컬럼 = {rows * cols}셀 "
+                f"(최대 {self.max_payload_cells}셀). 컬럼을 줄이거나 기간/샘플을 나눠 요청하세요.",
+            )
+
+    @asynccontextmanager
+    async def admit(self, tool: str):
+        """실행 슬롯을 확보한 동안 블록을 실행 (대기열 초과/시한 초과 시 AdmissionError)"""
+        priority = self.priority_of(tool)
+
+        if not self._waiters and self._has_capacity(tool):
+            self._acquire(tool)
+            self._record_wait(0.0)
+        else:
+            await self._wait(tool, priority)
+
+        try:
+            yield
+        finally:
+            self._release(tool)
+
+    def snapshot(self) -> dict:
+        """현재 상태 및 누적 메트릭"""
+        depth_by_priority = {"interactive": 0, "batch": 0}
+        for w in self._waiters:
+            key = "interactive" if w.priority == PRIORITY_INTERACTIVE else "batch"
+            depth_by_priority[key] += 1
+
+        return {
+            "running_total": self._running_total,
+            "running": dict(self._running),
+            "queue_depth": len(self._waiters),
+            "queue_depth_by_priority": depth_by_priority,
+            "admitted_total": dict(self._admitted_total),
+            "rejected_total": dict(self._rejected_total),
+            "wait_seconds_sum": round(self._wait_seconds_sum, 6),
+            "wait_seconds_max": round(self._wait_seconds_max, 6),
+            "wait_count": self._wait_count,
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout_sec": self.queue_timeout,
+                "max_payload_cells": self.max_payload_cells,
+                "tool_limits": dict(self.tool_limits),
+            },
+        }
+
+    def _has_capacity(self, tool: str) -> bool:
+        return (
+            self._running_total < self.max_concurrent
+            and self._running.get(tool, 0) < self.tool_limits.get(tool, self.default_tool_limit)
+        )
+
+    async def _wait(self, tool: str, priority: int) -> None:
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+            raise AdmissionError(
+                "queue_full",
+                f"서버 대기열이 가득 찼습니다 (대기 {len(self._waiters)}건 / 최대 {self.max_queue}건). 잠시 후 다시 시도하세요.",
+            )
+
+        waiter = _Waiter(tool, priority, next(self._seq))
+        self._waiters.append(waiter)
+        self._waiters.sort(key=lambda w: (w.priority, w.seq))
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                # 슬롯이 배정된 직후 취소 → 슬롯 반납
+                self._release(tool)
+            else:
+                waiter.future.cancel()
+                self._waiters.remove(waiter)
+            raise
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self._waiters.remove(waiter)
+                self._reject("queue_timeout")
+                raise AdmissionError(
+                    "queue_timeout",
+                    f"대기 시한 초과 ({self.queue_timeout:.0f}초). 서버가 혼잡합니다.",
+                )
+            # 시한과 동시에 슬롯이 배정된 경우 그대로 실행
+
+        self._record_wait(time.monotonic() - waiter.enqueued_at)
+
+    def _acquire(self, tool: str) -> None:
+        self._running_total += 1
+        self._running[tool] = self._running.get(tool, 0) + 1
+        self._admitted_total[tool] = self._admitted_total.get(tool, 0) + 1
+
+    def _release(self, tool: str) -> None:
+        self._running_total -= 1
+        self._running[tool] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """우선순위 순으로 실행 가능한 대기자에게 슬롯 배정 (도구별 제한에 막힌 대기자는 건너뜀)"""
+        for waiter in list(self._waiters):
+            if self._running_total >= self.max_concurrent:
+                break
+            if self._has_capacity(waiter.tool):
+                self._waiters.remove(waiter)
+                self._acquire(waiter.tool)
+                waiter.future.set_result(None)
+
+    def _record_wait(self, seconds: float) -> None:
+        self._wait_seconds_sum += seconds
+        self._wait_seconds_max = max(self._wait_seconds_max, seconds)
+        self._wait_count += 1
+
+    def _reject(self, reason: str) -> None:
+        self._rejected_total[reason] = self._rejected_total.get(reason, 0) + 1
+
+
+admission = AdmissionController()
@@ -0,0 +1,134 @@
+# mcp/src/utils/columnar.py
+import base64
+import numpy as np
+import pandas as pd
+
+
+# typed-array 인코딩으로 주고받을 수 있는 dtype (little-endian 고정)
+TYPED_DTYPES = {
+    "float64", "float32",
+    "int64", "int32", "int16", "int8",
+    "uint8", "bool",
+    "datetime64[ns]",
+}
+
+
+def is_columnar(data) -> bool:
+    """{"columns": {...}} 형태의 컬럼 지향 payload인지 확인"""
+    return isinstance(data, dict) and isinstance(data.get("columns"), dict)
+
+
+def decode_columns(data: dict) -> dict:
+    """
+    컬럼 지향 payload를 {컬럼명: 1차원 배열} 로 변환
+
+    지원 형식:
+        {"columns": {"cd_value": [1.2, 1.3], "eqp_id": ["A", "B"]}}
+        {"columns": {"cd_value": {"dtype": "float64", "data": "<base64>"}}}
+    두 형식은 컬럼 단위로 섞어 쓸 수 있습니다.
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 컬럼 길이가 서로 다를 때
+    """
+    columns = {}
+    for name, values in data["columns"].items():
+        if isinstance(values, dict):
+            columns[name] = _decode_typed(name, values)
+        elif isinstance(values, (list, tuple, np.ndarray, pd.Series)):
+            columns[name] = values
+        else:
+            raise ValueError(f"'{name}' 컬럼 형식이 올바르지 않습니다 (list 또는 typed-array 필요).")
+
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) > 1:
+        detail = {name: len(v) for name, v in columns.items()}
+        raise ValueError(f"컬럼 길이가 서로 다릅니다: {detail}")
+
+    return columns
+
+
+def columnar_to_dataframe(data: dict) -> pd.DataFrame:
+    """컬럼 지향 payload를 DataFrame으로 변환 (행 단위 dict 변환 없음)"""
+    return pd.DataFrame(decode_columns(data), copy=False)
+
+
+def encode_columns(df: pd.DataFrame, typed: bool = True) -> dict:
+    """
+    DataFrame을 컬럼 지향 payload로 변환 (Executor 등 호출 측에서 사용)
+
+    Args:
+        df: 변환할 DataFrame
+        typed: True면 수치/불리언/datetime 컬럼을 base64 typed-array로 인코딩
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        dtype_name = str(series.dtype)
+        if typed and dtype_name in TYPED_DTYPES and not series.isna().any():
+            array = np.ascontiguousarray(series.to_numpy(), dtype=np.dtype(dtype_name).newbyteorder("<"))
+            columns[str(name)] = {
+                "dtype": dtype_name,
+                "data": base64.b64encode(array.tobytes()).decode("ascii"),
+            }
+        elif typed and pd.api.types.is_float_dtype(series):
+            # NaN은 float 배열에 그대로 담을 수 있음
+            array = np.ascontiguousarray(series.to_numpy(dtype="float64"), dtype="<f8")
+            columns[str(name)] = {
+                "dtype": "float64",
+                "data": base64.b64encode(array.tobytes()).decode("ascii"),
+            }
+        else:
+            columns[str(name)] = [_to_json_value(v) for v in series.tolist()]
+
+    return {"columns": columns}
+
+
+def payload_shape(data) -> tuple[int, int]:
+    """
+    payload를 디코딩하지 않고 (행 수, 컬럼 수)를 추정
+
+    typed-array 컬럼은 base64 길이로 행 수를 계산합니다.
+    """
+    if is_columnar(data):
+        columns = data["columns"]
+        if not columns:
+            return 0, 0
+        first = next(iter(columns.values()))
+        if isinstance(first, dict):
+            itemsize = np.dtype(first.get("dtype", "float64")).itemsize if first.get("dtype") in TYPED_DTYPES else 8
+            rows = len(first.get("data", "")) * 3 // 4 // itemsize
+        else:
+            rows = len(first)
+        return rows, len(columns)
+
+    if isinstance(data, list):
+        return len(data), len(data[0]) if data and isinstance(data[0], dict) else 0
+
+    return 0, 0
+
+
+def _decode_typed(name: str, spec: dict) -> np.ndarray:
+    dtype_name = spec.get("dtype")
+    if dtype_name not in TYPED_DTYPES:
+        raise ValueError(f"'{name}' 컬럼의 dtype '{dtype_name}'은(는) 지원하지 않습니다. 가능: {sorted(TYPED_DTYPES)}")
+
+    try:
+        raw = base64.b64decode(spec.get("data", ""), validate=True)
+    except Exception:
+        raise ValueError(f"'{name}' 컬럼의 base64 데이터가 올바르지 않습니다.")
+
+    dtype = np.dtype(dtype_name).newbyteorder("<")
+    if len(raw) % dtype.itemsize != 0:
+        raise ValueError(f"'{name}' 컬럼의 바이트 길이가 dtype '{dtype_name}'과 맞지 않습니다.")
+
+    return np.frombuffer(raw, dtype=dtype).astype(dtype_name, copy=False)
+
+
+def _to_json_value(value):
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
@@ -1,6 +1,7 @@
 # mcp/src/utils/db.py
 import os
-from sqlalchemy import create_engine, text
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,14 +12,48 @@ HOST = os.getenv("POSTGRES_HOST")
 PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB")
 
-db_url = f"postgresql://{USER}:{PASSWORD}@{HOST}:{PORT}/{DB_NAME}?sslmode=require"
-engine = create_engine(db_url)
+db_url = f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DB_NAME}?sslmode=require"
 
+# 커넥션 풀 (be/src/db.py와 동일한 설정, TLS 연결 재사용)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_RECYCLE_SEC = int(os.getenv("DB_POOL_RECYCLE_SEC", "1800"))
+
+# 엔진은 첫 쿼리 시점에 생성 (import 시 SQLAlchemy 로딩/커넥션 풀 생성 방지)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """SQLAlchemy 엔진 반환 (최초 호출 시 생성)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from sqlalchemy import create_engine
+                _engine = create_engine(
+                    db_url,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_recycle=DB_POOL_RECYCLE_SEC,
+                    pool_pre_ping=True,
+                )
+    return _engine
+
+
+def execute_query(sql: str, timeout_ms: int | None = None) -> dict:
+    """
+    SQL을 실행하고 결과를 반환
+
+    Args:
+        timeout_ms: 이 쿼리에만 적용할 statement_timeout (트랜잭션 종료 시 해제)
+    """
+    from sqlalchemy import text
 
-def execute_query(sql: str) -> dict:
-    """SQL을 실행하고 결과를 반환"""
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
+            if timeout_ms:
+                conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
             result = conn.execute(text(sql))
 
             # SELECT 문인 경우
@@ -38,13 +73,36 @@ def execute_query(sql: str) -> dict:
         return {"success": False, "error": str(e)}
 
 
-def get_table_schemas() -> dict:
-    """DB의 테이블/컬럼 정보를 조회 (text_to_sql에서 사용)"""
+# 스키마 카탈로그 캐시 (text_to_sql 호출마다 information_schema를 조회하지 않음)
+SCHEMA_CACHE_TTL_SEC = float(os.getenv("SCHEMA_CACHE_TTL_SEC", "300"))
+_schema_cache: tuple[float, dict] | None = None
+
+
+def get_table_schemas(refresh: bool = False) -> dict:
+    """
+    DB의 테이블/컬럼 정보 (text_to_sql에서 사용, SCHEMA_CACHE_TTL_SEC 동안 캐시)
+
+    Args:
+        refresh: True면 캐시를 무시하고 다시 조회
+    """
+    global _schema_cache
+    if not refresh and _schema_cache is not None and time.monotonic() - _schema_cache[0] < SCHEMA_CACHE_TTL_SEC:
+        return _schema_cache[1]
+    schemas = _query_table_schemas()
+    if schemas:
+        _schema_cache = (time.monotonic(), schemas)
+    return schemas
+
+
+def _query_table_schemas() -> dict:
+    # 월별 파티션(FDC_p202501 등)은 부모 테이블로만 노출
     sql = """
-    SELECT table_name, column_name, data_type
-    FROM information_schema.columns
-    WHERE table_schema = 'public'
-    ORDER BY table_name, ordinal_position;
+    SELECT c.table_name, c.column_name, c.data_type,
+           col_description(r.oid, c.ordinal_position) AS description
+    FROM information_schema.columns c
+    JOIN pg_class r ON r.relname = c.table_name AND r.relnamespace = 'public'::regnamespace
+    WHERE c.table_schema = 'public' AND NOT r.relispartition
+    ORDER BY c.table_name, c.ordinal_position;
     """
     result = execute_query(sql)
     if not result["success"]:
@@ -58,6 +116,7 @@ def get_table_schemas() -> dict:
         schemas[table].append({
             "column": row["column_name"],
             "type": row["data_type"],
+            "description": row["description"],
         })
 
     return schemas
\ No newline at end of file
@@ -0,0 +1,83 @@
+# mcp/src/utils/instrument.py
+"""
+도구 실행 단계별 계측
+
+@instrumented를 붙인 도구는 결과에 다음을 포함합니다.
+- execution_time_ms: 에러 경로를 포함한 실제 실행 시간 (도구 내부 값을 덮어씀)
+- timing: {"phases_ms": {"parse", "validate", "compute", ...}, "rows_in"}
+
+parse/validate는 validate_data 등 공용 유틸이 phase()로 기록하고,
+compute는 전체 시간에서 다른 단계를 뺀 나머지입니다.
+워커 프로세스에서 실행된 결과도 timing을 그대로 돌려주므로 서버가 histogram에 기록합니다 (metrics.observe_tool).
+응답 직렬화 시간과 크기(bytes_out)는 결과를 한 번만 인코딩하도록 서버가 MCP 응답을 만들 때 기록합니다
+(server.py, metrics.observe_encoding).
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class _Run:
+    __slots__ = ("phases", "rows_in", "active")
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.rows_in: int | None = None
+        self.active = False
+
+
+_current: ContextVar[_Run | None] = ContextVar("instrument_run", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """현재 도구 실행의 단계 시간 기록 (계측 중이 아니거나 이미 다른 단계 안이면 기록하지 않음)"""
+    run = _current.get()
+    if run is None or run.active:
+        yield
+        return
+    run.active = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.phases[name] = run.phases.get(name, 0.0) + (time.perf_counter() - start)
+        run.active = False
+
+
+def set_rows_in(rows: int) -> None:
+    """입력 행 수 기록 (처음 기록한 값 유지)"""
+    run = _current.get()
+    if run is not None and run.rows_in is None:
+        run.rows_in = int(rows)
+
+
+def instrumented(fn):
+    """도구 함수에 단계별 계측 추가"""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        run = _Run()
+        token = _current.set(run)
+        start = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - start
+        if not isinstance(result, dict):
+            return result
+
+        phases = {name: seconds * 1000 for name, seconds in run.phases.items()}
+        phases["compute"] = phases.get("compute", 0.0) + max(elapsed * 1000 - sum(phases.values()), 0.0)
+        return {
+            **result,
+            "execution_time_ms": int(elapsed * 1000),
+            "timing": {
+                "phases_ms": {name: round(ms, 3) for name, ms in phases.items()},
+                "rows_in": run.rows_in,
+            },
+        }
+
+    return wrapper
@@ -0,0 +1,38 @@
+# mcp/src/utils/llm_client.py
+"""
+백엔드 LLM 스케줄러를 거친 모델 호출 (text_to_sql)
+
+모델 서버의 동시 실행 한도(LLM_MAX_CONCURRENCY), 우선순위 대기열, 동일 프롬프트 병합은
+백엔드 스케줄러(be/src/llm_scheduler.py) 한 곳에서 관리합니다.
+이 서버는 모델을 직접 호출하지 않고 백엔드의 POST /llm/invoke로 요청합니다.
+"""
+import os
+from types import SimpleNamespace
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 백엔드 주소 (docker-compose 서비스명 기준)
+LLM_BACKEND_URL = os.getenv("LLM_BACKEND_URL", "http://be:8000")
+# 스케줄러 대기 시간을 포함한 요청 제한 시간
+LLM_REQUEST_TIMEOUT_SEC = float(os.getenv("LLM_REQUEST_TIMEOUT_SEC", "300"))
+
+
+class BackendLLM:
+    """ainvoke(prompt) → .content를 가진 응답 (langchain chat model과 같은 사용 방식)"""
+
+    def __init__(self, node: str, base_url: str = LLM_BACKEND_URL, timeout: float = LLM_REQUEST_TIMEOUT_SEC):
+        self.node = node
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client = None
+
+    async def ainvoke(self, prompt: str, priority: str = "interactive") -> SimpleNamespace:
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        response = await self._client.post(
+            "/llm/invoke", json={"prompt": prompt, "node": self.node, "priority": priority})
+        response.raise_for_status()
+        return SimpleNamespace(content=response.json()["content"])
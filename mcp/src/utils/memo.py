@@ -0,0 +1,306 @@
+# mcp/src/utils/memo.py
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 메모리 캐시 최대 크기 (결과 JSON 기준 bytes, 0이면 비활성화)
+MEMO_MAX_BYTES = int(os.getenv("MEMO_MAX_BYTES", str(256 * 1024 * 1024)))
+# 디스크 영속화 경로 (비우면 메모리만 사용)
+MEMO_DISK_DIR = os.getenv("MEMO_DISK_DIR", "")
+MEMO_DISK_MAX_BYTES = int(os.getenv("MEMO_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# DB 상태에 따라 결과가 달라지는 도구는 캐시하지 않음
+NON_CACHEABLE_TOOLS = {"text_to_sql"}
+
+
+def fingerprint_data(data) -> str:
+    """
+    입력 데이터 fingerprint
+
+    행 단위(list[dict])와 컬럼 지향 payload(일반 배열/typed-array)는 같은 데이터면 같은 값이 되도록
+    컬럼별 배열로 정규화하여 해싱합니다. 수치/불리언 컬럼은 little-endian 원시 bytes로,
+    그 외 컬럼은 JSON으로 해싱합니다. 입력 크기에 비례하므로 이벤트 루프 밖에서 호출합니다.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(data, dict) and isinstance(data.get("columns"), dict):
+        columns = data["columns"].items()
+    elif isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        names = list(dict.fromkeys(name for row in data for name in row))
+        columns = ((name, [row.get(name) for row in data]) for name in names)
+    else:
+        h.update(json.dumps(data, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    for name, values in columns:
+        h.update(str(name).encode())
+        h.update(b"\0")
+        _hash_column(h, values)
+        h.update(b"\1")
+    return h.hexdigest()
+
+
+def _hash_column(h, values) -> None:
+    import numpy as np
+
+    if isinstance(values, dict):
+        # typed-array: base64를 풀어 원시 bytes 해싱 (일반 배열을 변환한 결과와 같은 bytes)
+        try:
+            raw = base64.b64decode(values.get("data") or "", validate=True)
+        except (binascii.Error, TypeError):
+            raw = str(values.get("data")).encode()
+        h.update(str(values.get("dtype")).encode())
+        h.update(b"\0")
+        h.update(raw)
+        return
+
+    array = _numeric_array(np, values)
+    if array is None:
+        h.update(json.dumps(values, default=str).encode())
+        return
+    h.update(array.dtype.name.encode())
+    h.update(b"\0")
+    h.update(np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")).tobytes())
+
+
+def _numeric_array(np, values):
+    """수치/불리언 값(None은 NaN) 배열이면 numpy 배열, 아니면 None"""
+    if not isinstance(values, list) or not values:
+        return None
+    array = np.asarray(values)
+    if array.dtype.kind in "biuf":
+        return array
+    if array.dtype.kind == "O" and all(
+            v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values):
+        return np.asarray(values, dtype="float64")
+    return None
+
+
+class _Inflight:
+    """같은 키로 실행 중인 호출 1개와 그 결과를 기다리는 호출 수"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class ResultCache:
+    """
+    도구 실행 결과 메모이제이션 (content-addressed)
+
+    - 키: 도구명 + data 이외 인자 + 입력 데이터 fingerprint
+    - 메모리: 결과 크기 합계 기준 LRU (max_bytes 초과 시 오래된 것부터 삭제)
+    - 디스크(선택): 메모리에서 밀려난 결과도 재사용, 서버 재시작 후에도 유지
+    - 같은 키의 호출이 동시에 들어오면 한 번만 실행하고 성공 결과를 공유
+      (실행은 별도 task라 먼저 온 호출이 취소되어도 기다리는 호출이 있으면 계속 실행,
+       error 결과나 예외는 공유하지 않고 기다리던 호출이 각자 다시 실행)
+    - 캐시/공유 결과는 cached: true로 표시하고 execution_time_ms, timing은 이 호출의 조회(대기) 시간으로 바꿈
+    """
+
+    def __init__(self, max_bytes: int = MEMO_MAX_BYTES, disk_dir: str = MEMO_DISK_DIR,
+                 disk_max_bytes: int = MEMO_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: dict[str, _Inflight] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._disk_bytes: int | None = None
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    async def make_key(self, tool_name: str, kwargs: dict) -> str | None:
+        """도구명 + 인자 + 입력 데이터 fingerprint (입력 해싱은 이벤트 루프 밖에서 실행)"""
+        if not self.enabled or tool_name in NON_CACHEABLE_TOOLS:
+            return None
+        spec = {k: v for k, v in kwargs.items() if k != "data"}
+        h = hashlib.blake2b(digest_size=20)
+        h.update(tool_name.encode())
+        h.update(json.dumps(spec, sort_keys=True, default=str).encode())
+        if "data" in kwargs:
+            h.update((await asyncio.to_thread(fingerprint_data, kwargs["data"])).encode())
+        return h.hexdigest()
+
+    async def get_or_run(self, key: str | None, run) -> dict:
+        """캐시된 결과가 있으면 반환하고, 없으면 run()을 실행하여 성공 결과를 저장"""
+        if key is None:
+            return await run()
+
+        start = time.perf_counter()
+        cached = await self.get(key)
+        if cached is not None:
+            return _mark_cached(cached, start)
+
+        entry = self._inflight.get(key)
+        leader = entry is None
+        if leader:
+            entry = self._inflight[key] = _Inflight(asyncio.ensure_future(self._run_and_store(key, run)))
+        else:
+            self.shared += 1
+
+        entry.waiters += 1
+        try:
+            result = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            # 기다리는 호출이 모두 취소되었을 때만 실행도 취소
+            if entry.waiters == 1 and not entry.task.done():
+                entry.task.cancel()
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+            raise
+        except Exception:
+            if leader:
+                raise
+            return await self.get_or_run(key, run)  # 다른 호출의 예외는 공유하지 않음
+        finally:
+            entry.waiters -= 1
+
+        if leader:
+            return result
+        if isinstance(result, dict) and result.get("error"):
+            return await self.get_or_run(key, run)  # 다른 호출의 error/거절 결과는 공유하지 않음
+        return _mark_cached(result, start, "inflight_wait")
+
+    async def _run_and_store(self, key: str, run) -> dict:
+        try:
+            result = await run()
+            # error / 거절 결과는 저장하지 않음
+            if isinstance(result, dict) and not result.get("error"):
+                await asyncio.to_thread(self.put, key, result)
+            return result
+        finally:
+            if self._inflight.get(key) is not None and self._inflight[key].task is asyncio.current_task():
+                del self._inflight[key]
+
+    async def get(self, key: str) -> dict | None:
+        """캐시된 결과 (디스크 읽기와 JSON 디코딩은 결과 크기에 비례하므로 이벤트 루프 밖에서 실행)"""
+        return await asyncio.to_thread(self._lookup, key)
+
+    def _lookup(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                text = entry[0]
+        if entry is not None:
+            return json.loads(text)
+
+        text = self._read_disk(key)
+        if text is not None:
+            self.disk_hits += 1
+            self._put_memory(key, text)
+            return json.loads(text)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: dict) -> None:
+        text = json.dumps(result, ensure_ascii=False, default=str)
+        self._put_memory(key, text)
+        self._write_disk(key, text)
+
+    def _put_memory(self, key: str, text: str) -> None:
+        size = len(text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (text, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> str | None:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, text: str) -> None:
+        if not self.disk_dir:
+            return
+        try:
+            tmp = self._disk_path(key) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self._disk_path(key))
+            if self._disk_bytes is None:
+                self._disk_bytes = self._prune_disk()
+            else:
+                self._disk_bytes += len(text.encode())
+            if self._disk_bytes > self.disk_max_bytes:
+                self._disk_bytes = self._prune_disk()
+        except OSError as e:
+            print(f"[memo] 디스크 저장 실패: {e}")
+
+    def _prune_disk(self) -> int:
+        """디스크 사용량이 한도를 넘으면 오래된 파일부터 삭제하고 남은 사용량 반환"""
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            os.remove(path)
+            total -= size
+        return total
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "shared_inflight": self.shared,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk_dir": self.disk_dir or None,
+        }
+
+
+def _mark_cached(result: dict, start: float, phase: str = "cache_lookup") -> dict:
+    """저장된 결과의 실행 시간 대신 이 호출의 실제 조회 시간(공유 결과는 실행 중인 호출 대기 시간)을 보고"""
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return {
+        **result,
+        "cached": True,
+        "execution_time_ms": int(elapsed_ms),
+        "timing": {"phases_ms": {phase: round(elapsed_ms, 3)}, "rows_in": None},
+    }
+
+
+memo = ResultCache()
@@ -0,0 +1,51 @@
+# mcp/src/utils/metrics.py
+"""
+Prometheus 메트릭 (prometheus_client)
+
+도구별 전체/단계별 시간, 입력 행 수, 응답 크기 histogram을 /metrics로 노출합니다.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+
+# 초 단위 지연 시간
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# 바이트 (1KB ~ 1GB, 4배 간격)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(11))
+# 행 수 (10 ~ 1e8)
+ROWS_BUCKETS = tuple(10 ** i for i in range(1, 9))
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+tool_duration = Histogram(
+    "mcp_tool_duration_seconds", "도구 호출 전체 시간 (admission 대기 포함)", ("tool", "status"),
+    buckets=SECONDS_BUCKETS)
+tool_phase = Histogram(
+    "mcp_tool_phase_seconds", "도구 단계별 시간 (parse, validate, compute, serialize 등)", ("tool", "phase"),
+    buckets=SECONDS_BUCKETS)
+tool_rows_in = Histogram("mcp_tool_rows_in", "도구 입력 행 수", ("tool",), buckets=ROWS_BUCKETS)
+tool_bytes_out = Histogram("mcp_tool_bytes_out", "도구 응답 JSON 크기 (bytes)", ("tool",), buckets=BYTES_BUCKETS)
+
+
+def render() -> bytes:
+    """Prometheus text exposition format (프로세스 기본 메트릭 포함)"""
+    return generate_latest()
+
+
+def observe_tool(name: str, result: dict, seconds: float) -> None:
+    """도구 결과의 timing(instrument.instrumented가 채움)과 전체 시간을 histogram에 기록"""
+    if not isinstance(result, dict):
+        return
+    status = ("rejected" if result.get("rejected") else "error" if result.get("error")
+              else "cached" if result.get("cached") else "ok")
+    tool_duration.labels(tool=name, status=status).observe(seconds)
+
+    timing = result.get("timing") or {}
+    for phase, ms in (timing.get("phases_ms") or {}).items():
+        tool_phase.labels(tool=name, phase=phase).observe(ms / 1000)
+    if timing.get("rows_in") is not None:
+        tool_rows_in.labels(tool=name).observe(timing["rows_in"])
+
+
+def observe_encoding(name: str, seconds: float, size: int) -> None:
+    """MCP 응답으로 보낸 결과의 직렬화 시간(serialize 단계)과 크기 기록"""
+    tool_phase.labels(tool=name, phase="serialize").observe(seconds)
+    tool_bytes_out.labels(tool=name).observe(size)
@@ -0,0 +1,265 @@
+# mcp/src/utils/sampling.py
+"""
+탐색용 표본 조회 (text_to_sql sampling 모드)
+
+대형 FDC 테이블에서 앞쪽 LIMIT 1000행 대신 무작위 표본을 가져옵니다.
+
+- bernoulli: 쿼리의 가장 큰 테이블에 TABLESAMPLE BERNOULLI (행 단위, 설계효과 1)
+- system:    TABLESAMPLE SYSTEM (블록 단위, 빠르지만 같은 블록의 행이 함께 뽑혀 설계효과 > 1)
+  bernoulli/system은 행 조회 쿼리에만 적용 — 집계/GROUP BY/DISTINCT/window 쿼리는 표본을 넣으면 값 자체가 바뀌므로 거절
+- stratified: 장비/Lot 등 strata 컬럼별 비례 배분 무작위 추출 (각 stratum 최소 1행, 전체 target_rows 이하)
+  결과가 target_rows보다 훨씬 크면 가장 큰 테이블을 BERNOULLI로 먼저 줄인 뒤(pre-sample) window 함수를 적용
+
+표본 비율은 EXPLAIN의 결과 행 수 추정으로 target_rows에 맞춰 계산하고,
+결과에는 유효 표본 수(n / 설계효과)와 전체 데이터 대비 표준오차 배율을 함께 보고합니다.
+"""
+import math
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SAMPLING_METHODS = ("bernoulli", "system", "stratified")
+# SYSTEM 샘플링의 설계효과 가정값 (블록 내 상관, 보수적으로 2)
+SAMPLING_SYSTEM_DEFF = float(os.getenv("SAMPLING_SYSTEM_DEFF", "2.0"))
+SAMPLING_SEED = int(os.getenv("SAMPLING_SEED", "42"))
+# stratified pre-sample 크기 (target_rows의 배수, 작은 stratum이 빠지지 않도록 여유를 둠, 0이면 pre-sample 안 함)
+SAMPLING_PRESAMPLE_FACTOR = float(os.getenv("SAMPLING_PRESAMPLE_FACTOR", "20"))
+
+HELPER_COLUMNS = ("_sample_rn", "_stratum_rows", "_total_rows", "_strata_total")
+
+
+class SamplingError(Exception):
+    """sampling 옵션이 잘못되었거나 적용할 수 없을 때 발생"""
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _table_rows(names: list[str]) -> dict[str, float]:
+    """pg_class 통계로 테이블 행 수 추정 (파티션 테이블은 파티션 합)"""
+    from src.utils.db import execute_query
+
+    literals = ", ".join("'" + n.replace("'", "''") + "'" for n in names)
+    result = execute_query(f"""
+        SELECT c.relname AS name,
+               GREATEST(c.reltuples, 0) + COALESCE((
+                   SELECT sum(GREATEST(k.reltuples, 0)) FROM pg_inherits i
+                   JOIN pg_class k ON k.oid = i.inhrelid WHERE i.inhparent = c.oid), 0) AS rows
+        FROM pg_class c
+        WHERE c.relnamespace = 'public'::regnamespace AND c.relname IN ({literals})
+    """)
+    if not result["success"]:
+        raise SamplingError(f"테이블 통계 조회 실패: {result['error']}")
+    return {row["name"]: float(row["rows"]) for row in result["data"]}
+
+
+def _largest_table(tree):
+    """쿼리에서 행 수가 가장 많은 테이블 노드 (조인 시 이 테이블 1개만 샘플링, 모두 샘플링하면 결과가 곱으로 줄어듦)"""
+    from sqlglot import exp
+
+    tables = {t.name: t for t in tree.find_all(exp.Table) if t.name}
+    rows = _table_rows(list(tables))
+    if not rows:
+        raise SamplingError("표본을 추출할 테이블을 찾을 수 없습니다.")
+    largest = max(rows, key=rows.get)
+    return largest, tables[largest]
+
+
+def _aggregates(tree) -> bool:
+    """집계/GROUP BY/DISTINCT/window가 있으면 True (테이블 표본이 결과 값을 바꾸는 쿼리)"""
+    from sqlglot import exp
+
+    return tree.find(exp.AggFunc, exp.Group, exp.Distinct, exp.Window) is not None
+
+
+def _tablesample(method: str, percent: float):
+    from sqlglot import exp
+
+    return exp.TableSample(
+        method=exp.var(method.upper()),
+        percent=exp.Literal.number(percent),
+        seed=exp.Literal.number(SAMPLING_SEED),
+    )
+
+
+def check_options(sampling) -> str:
+    """sampling 옵션 검사 (LLM 호출 전에 잘못된 옵션을 거절), 정규화된 method 반환"""
+    if not isinstance(sampling, dict):
+        raise SamplingError("sampling은 dict여야 합니다.")
+    method = str(sampling.get("method", "bernoulli")).lower()
+    if method not in SAMPLING_METHODS:
+        raise SamplingError(f"지원하지 않는 sampling method: {method} (가능: {', '.join(SAMPLING_METHODS)})")
+    if method == "stratified" and not sampling.get("strata"):
+        raise SamplingError("stratified sampling에는 strata 컬럼이 필요합니다.")
+    return method
+
+
+def apply_sampling(sql: str, sampling: dict, target_rows: int) -> tuple[str, dict]:
+    """
+    SQL에 표본 추출 적용
+
+    Args:
+        sampling: {"method": "bernoulli" | "system" | "stratified",
+                   "target_rows": int (선택), "percent": float (선택, 지정 시 target_rows 대신 사용),
+                   "strata": str (stratified의 strata 컬럼)}
+        target_rows: 기본 표본 크기 (LIMIT 상한)
+
+    Returns:
+        (표본 SQL, 메타데이터)
+    """
+    import sqlglot
+    from src.utils.sql_guard import estimate
+
+    method = check_options(sampling)
+    target = min(int(sampling.get("target_rows") or target_rows), target_rows)
+
+    tree = sqlglot.parse_one(sql, read="postgres")
+    tree.set("limit", None)
+    population = estimate(tree.sql(dialect="postgres"))["plan_rows"]
+    meta = {"method": method, "target_rows": target, "population_rows_estimate": int(population),
+            "seed": SAMPLING_SEED}
+
+    if method == "stratified":
+        strata = sampling["strata"]
+        # window 함수가 전체 결과를 정렬하지 않도록 먼저 BERNOULLI로 줄임 (집계 쿼리는 값이 바뀌므로 제외)
+        presample = 100.0
+        if SAMPLING_PRESAMPLE_FACTOR > 0 and population > target * SAMPLING_PRESAMPLE_FACTOR and not _aggregates(tree):
+            presample = round(max(100.0 * target * SAMPLING_PRESAMPLE_FACTOR / population, 0.0001), 4)
+            name, table = _largest_table(tree)
+            table.set("sample", _tablesample("bernoulli", presample))
+            meta.update({"presample_table": name, "presample_fraction": presample / 100})
+        inner = tree.sql(dialect="postgres")
+        s = _quote(strata)
+        # stratum별 할당은 비례 배분(최소 1행)이지만, stratum 수가 많아 합이 target을 넘으면
+        # 각 stratum의 1번째 행부터 순서대로 채워 target에서 자름 (뒤쪽 stratum이 통째로 빠지지 않음)
+        sampled = (
+            f"SELECT * FROM (SELECT r.*, count(*) FILTER (WHERE r._sample_rn = 1) OVER () AS _strata_total "
+            f"FROM (SELECT q.*, "
+            f"row_number() OVER (PARTITION BY q.{s} ORDER BY random()) AS _sample_rn, "
+            f"count(*) OVER (PARTITION BY q.{s}) AS _stratum_rows, count(*) OVER () AS _total_rows "
+            f"FROM ({inner}) q) r) s "
+            f"WHERE _sample_rn <= LEAST({target}, GREATEST(1, CEIL(_stratum_rows * {target}::float / _total_rows))) "
+            f"ORDER BY _sample_rn, random() LIMIT {target}"
+        )
+        meta.update({"strata": strata, "design_effect": 1.0})
+        return sampled, meta
+
+    # 테이블 표본 비율을 결과 행 수(plan_rows) 기준으로 정하므로 결과 행이 원본 행에 비례하는 쿼리만 허용
+    if _aggregates(tree):
+        raise SamplingError(f"{method} sampling은 집계/GROUP BY/DISTINCT/window 쿼리에 적용할 수 없습니다 "
+                            f"(집계 값이 표본 비율만큼 달라짐). 행 단위 조회로 요청하거나 stratified를 사용하세요.")
+    largest, table = _largest_table(tree)
+    if sampling.get("percent") is not None:
+        percent = float(sampling["percent"])
+    else:
+        percent = 100.0 * target / population if population > 0 else 100.0
+    percent = round(min(max(percent, 0.0001), 100.0), 4)
+
+    table.set("sample", _tablesample(method, percent))
+    meta.update({
+        "table": largest,
+        "fraction": percent / 100,
+        "design_effect": SAMPLING_SYSTEM_DEFF if method == "system" else 1.0,
+    })
+    return tree.sql(dialect="postgres"), meta
+
+
+def finalize(result: dict, meta: dict) -> dict:
+    """
+    실행 결과에서 stratified helper 컬럼을 제거하고 표본 크기/유효 표본 수 계산
+
+    Returns:
+        meta에 sample_rows, n_effective, fraction, se_inflation_vs_full 등을 채운 dict
+    """
+    rows = result.get("data") or []
+    if meta["method"] == "stratified":
+        sampled_strata = {row.get(meta["strata"]) for row in rows}
+        total = rows[0].get("_total_rows") or 0 if rows else 0
+        strata_total = rows[0].get("_strata_total") or 0 if rows else 0
+        for row in rows:
+            for col in HELPER_COLUMNS:
+                row.pop(col, None)
+        result["columns"] = [c for c in result.get("columns", []) if c not in HELPER_COLUMNS]
+        # pre-sample을 거쳤으면 모집단 크기는 pre-sample 행 수 / pre-sample 비율로 추정
+        population = total / meta.get("presample_fraction", 1.0)
+        meta["population_rows"] = int(round(population))
+        meta["strata_count"] = int(strata_total)
+        meta["strata_sampled"] = len(sampled_strata)
+        meta["fraction"] = len(rows) / population if population else 1.0
+        if strata_total > len(sampled_strata):
+            meta["warning"] = (f"stratum 수({strata_total})가 표본 크기보다 많아 "
+                               f"{len(sampled_strata)}개 stratum만 포함되었습니다.")
+
+    return summarize(meta, len(rows))
+
+
+def summarize(meta: dict, sample_rows: int) -> dict:
+    """유효 표본 수와 표준오차 배율 (전체 데이터를 썼을 때 대비)"""
+    deff = meta.get("design_effect", 1.0)
+    fraction = min(meta.get("fraction") or 1.0, 1.0)
+    n_eff = sample_rows / deff if deff > 0 else sample_rows
+    population = meta.get("population_rows") or meta.get("population_rows_estimate") or sample_rows
+    return {
+        **meta,
+        "sample_rows": sample_rows,
+        "n_effective": round(n_eff, 1),
+        # SRS 대비 표준오차 배율 (설계효과)
+        "se_multiplier": round(math.sqrt(deff), 4),
+        # 전체 모집단을 모두 사용했을 때 대비 표준오차 배율
+        "se_inflation_vs_full": round(math.sqrt(population / n_eff), 4) if n_eff > 0 and population else None,
+        "finite_population_correction": round(math.sqrt(max(1 - fraction, 0.0)), 4),
+    }
+
+
+def mean_interval(values, meta: dict, confidence: float = 0.95) -> dict | None:
+    """표본 평균과 설계효과/유한모집단 보정을 반영한 신뢰구간"""
+    import numpy as np
+    from scipy import stats
+
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) < 2:
+        return None
+    info = summarize(meta, len(values))
+    se = values.std(ddof=1) / math.sqrt(info["n_effective"]) * info["finite_population_correction"]
+    t = stats.t.ppf(0.5 + confidence / 2, max(info["n_effective"] - 1, 1))
+    mean = float(values.mean())
+    return {
+        "mean": mean,
+        "std_error": float(se),
+        "ci": [float(mean - t * se), float(mean + t * se)],
+        "confidence": confidence,
+        "n": len(values),
+        "n_effective": info["n_effective"],
+    }
+
+
+def attach_report(result: dict, kwargs: dict) -> dict:
+    """
+    입력 data에 sampling 메타데이터가 있으면 도구 결과에 표본 정보와 target 평균의 보정 신뢰구간을 추가
+
+    target 컬럼 디코딩과 계산은 입력 크기에 비례하므로 이벤트 루프 밖에서 호출합니다.
+    """
+    data = kwargs.get("data")
+    meta = data.get("sampling") if isinstance(data, dict) else None
+    if not meta or not isinstance(result, dict) or "error" in result:
+        return result
+
+    report = {**meta}
+    target = kwargs.get("target")
+    if isinstance(target, str):
+        try:
+            from src.utils.columnar import decode_columns
+            import pandas as pd
+
+            # target 컬럼만 디코딩
+            column = decode_columns({"columns": {target: data["columns"][target]}})[target]
+            values = pd.to_numeric(pd.Series(column), errors="coerce")
+            interval = mean_interval(values.to_numpy(dtype=float), meta)
+            if interval is not None:
+                report.update({"n_effective": interval["n_effective"], "target_mean": interval})
+        except (KeyError, ValueError):
+            pass
+    return {**result, "sampling": report}
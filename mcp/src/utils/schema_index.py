@@ -0,0 +1,163 @@
+# mcp/src/utils/schema_index.py
+"""
+text_to_sql 프롬프트용 스키마 pruning
+
+FDC처럼 센서 컬럼이 수백 개인 테이블을 전부 프롬프트에 넣지 않고,
+질의와 관련도가 높은 컬럼 top-k + 키 컬럼(장비/Lot/Wafer/시간)만 포함합니다.
+
+- 색인: 컬럼명 + 컬럼 설명(COMMENT)의 문자 3-gram TF-IDF (추가 의존성 없음)
+  테이블명은 넣지 않음 — 넣으면 "FDC ..." 질의에서 FDC의 모든 컬럼이 같은 점수를 받아 순위가 무의미해짐
+- SCHEMA_EMBED_MODEL을 지정하면 Ollama 임베딩 유사도를 함께 사용 (한국어 질의 ↔ 영문 컬럼명 보완)
+- 색인은 스키마 카탈로그가 바뀔 때만 다시 생성
+- 임베딩 호출은 동기 HTTP이므로 prune은 이벤트 루프 밖(asyncio.to_thread)에서 호출
+"""
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 테이블별로 남길 관련 컬럼 수 (0이면 pruning 안 함)
+SCHEMA_TOP_K = int(os.getenv("SCHEMA_TOP_K", "15"))
+# 선택: Ollama 임베딩 모델 (예: "nomic-embed-text"), 비어 있으면 3-gram 유사도만 사용
+SCHEMA_EMBED_MODEL = os.getenv("SCHEMA_EMBED_MODEL", "")
+
+KEY_COLUMNS = {"eqp_id", "equipment_id", "chamber_id", "lot_id", "wafer_id", "recipe_id",
+               "source_table", "parameter", "bucket"}
+
+
+def _words(text: str) -> list[str]:
+    """snake_case / camelCase / 공백 분리 후 소문자"""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text)
+    return [w.lower() for w in re.split(r"[\W_]+", text) if w]
+
+
+def _grams(text: str) -> Counter:
+    grams = Counter()
+    for word in _words(text):
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(max(len(padded) - 2, 1)))
+    return grams
+
+
+def estimate_tokens(text: str) -> int:
+    """프롬프트 토큰 수 근사 (영문 약 4자/토큰, 한글 등은 1자/토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def _is_key(column: dict) -> bool:
+    return column["column"].lower() in KEY_COLUMNS or str(column.get("type", "")).startswith(("timestamp", "date"))
+
+
+class SchemaIndex:
+    def __init__(self, schemas: dict):
+        self.entries = []  # (table, column dict, 문서)
+        for table, columns in schemas.items():
+            for col in columns:
+                doc = f"{col['column']} {col.get('description') or ''}"
+                self.entries.append((table, col, doc))
+
+        grams = [_grams(doc) for _, _, doc in self.entries]
+        df = Counter(g for counts in grams for g in counts)
+        n = max(len(grams), 1)
+        self.idf = {g: math.log((n + 1) / (c + 1)) + 1 for g, c in df.items()}
+        self.vectors = [self._weigh(counts) for counts in grams]
+        self._embed_model = None
+        self._embeddings = None
+        self._embed_lock = threading.Lock()
+
+    def _weigh(self, counts: Counter) -> dict:
+        vec = {g: c * self.idf.get(g, 0.0) for g, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {g: v / norm for g, v in vec.items()}
+
+    def _embedding_scores(self, query: str) -> list[float] | None:
+        if not SCHEMA_EMBED_MODEL:
+            return None
+        try:
+            with self._embed_lock:
+                if self._embed_model is None:
+                    from langchain_ollama import OllamaEmbeddings
+
+                    self._embed_model = OllamaEmbeddings(
+                        base_url=os.getenv("OLLAMA_BASE_URL", "http://host.docker.internal:11434"),
+                        model=SCHEMA_EMBED_MODEL,
+                    )
+                if self._embeddings is None:
+                    self._embeddings = self._embed_model.embed_documents([doc for _, _, doc in self.entries])
+            q = self._embed_model.embed_query(query)
+        except Exception as e:
+            logger.warning("임베딩 사용 불가, 3-gram 유사도만 사용: %s", e)
+            return None
+
+        q_norm = math.sqrt(sum(x * x for x in q)) or 1.0
+        scores = []
+        for emb in self._embeddings:
+            e_norm = math.sqrt(sum(x * x for x in emb)) or 1.0
+            scores.append(sum(a * b for a, b in zip(q, emb)) / (q_norm * e_norm))
+        return scores
+
+    def scores(self, query: str) -> list[float]:
+        q = self._weigh(_grams(query))
+        lexical = [sum(w * vec.get(g, 0.0) for g, w in q.items()) for vec in self.vectors]
+        semantic = self._embedding_scores(query)
+        if semantic is None:
+            return lexical
+        return [0.5 * a + 0.5 * b for a, b in zip(lexical, semantic)]
+
+    def prune(self, query: str, tables: dict, top_k: int = SCHEMA_TOP_K) -> dict:
+        """
+        tables 중 테이블별로 키 컬럼 + 관련도 상위 top_k 컬럼만 남김 (원래 컬럼 순서 유지)
+
+        질의와 3-gram이 겹치는 컬럼이 하나도 없는 테이블은 판단 근거가 없으므로 전체 유지합니다.
+        동기 임베딩 호출이 있을 수 있으므로 이벤트 루프에서는 asyncio.to_thread로 호출하세요.
+        """
+        q = self._weigh(_grams(query))
+        overlap = {table for (table, _, _), vec in zip(self.entries, self.vectors)
+                   if table in tables and any(g in vec for g in q)}
+        ranked: dict[str, list[tuple[float, str]]] = {}
+        for (table, col, _), score in zip(self.entries, self.scores(query)):
+            if table in tables:
+                ranked.setdefault(table, []).append((score, col["column"]))
+
+        pruned = {}
+        for table, columns in tables.items():
+            if len(columns) <= top_k:
+                pruned[table] = columns
+                continue
+            if table not in overlap:
+                pruned[table] = columns  # 질의와 겹치는 컬럼이 없으면 판단 근거가 없으므로 전체 유지
+                continue
+            scored = sorted(ranked.get(table, []), key=lambda item: item[0], reverse=True)
+            top = {name for score, name in scored[:top_k] if score > 0}
+            pruned[table] = [c for c in columns if c["column"] in top or _is_key(c)]
+        return pruned
+
+
+_index: tuple[str, SchemaIndex] | None = None
+
+
+def _fingerprint(schemas: dict) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for table in sorted(schemas):
+        h.update(table.encode())
+        for col in schemas[table]:
+            h.update(f"\0{col['column']}\0{col.get('description') or ''}".encode())
+    return h.hexdigest()
+
+
+def get_schema_index(catalog: dict) -> SchemaIndex:
+    """카탈로그가 바뀌었을 때만 색인 재생성"""
+    global _index
+    fingerprint = _fingerprint(catalog)
+    if _index is None or _index[0] != fingerprint:
+        _index = (fingerprint, SchemaIndex(catalog))
+    return _index[1]
@@ -0,0 +1,157 @@
+# mcp/src/utils/sql_guard.py
+"""
+LLM이 생성한 SQL 실행 전 검사 (text_to_sql)
+
+1. 파싱: 단일 SELECT(UNION/CTE 포함)만 허용, DML/DDL/SELECT INTO/FOR UPDATE/위험 함수 거절
+2. LIMIT 주입: LIMIT이 없거나 SQL_GUARD_MAX_ROWS보다 크면 SQL_GUARD_MAX_ROWS로 조정
+3. EXPLAIN 비용 검사:
+   - 조인 노드의 예상 행 수가 SQL_GUARD_MAX_JOIN_ROWS 초과 (cross join 등) → 거절
+   - 예상 비용이 SQL_GUARD_MAX_COST 초과 → LIMIT을 SQL_GUARD_DOWNGRADE_ROWS로 낮춰 재검사, 그래도 초과면 거절
+4. 실행: statement_timeout(SQL_STATEMENT_TIMEOUT_MS) 설정
+"""
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SQL_GUARD_MAX_ROWS = int(os.getenv("SQL_GUARD_MAX_ROWS", "1000"))
+SQL_GUARD_DOWNGRADE_ROWS = int(os.getenv("SQL_GUARD_DOWNGRADE_ROWS", "100"))
+SQL_GUARD_MAX_COST = float(os.getenv("SQL_GUARD_MAX_COST", "5000000"))
+SQL_GUARD_MAX_JOIN_ROWS = float(os.getenv("SQL_GUARD_MAX_JOIN_ROWS", "50000000"))
+SQL_STATEMENT_TIMEOUT_MS = int(os.getenv("SQL_STATEMENT_TIMEOUT_MS", "30000"))
+
+# 부작용이 있거나 서버를 붙잡아 둘 수 있는 함수
+DENIED_FUNCTIONS = {
+    "pg_sleep", "pg_sleep_for", "pg_sleep_until", "pg_terminate_backend", "pg_cancel_backend",
+    "pg_read_file", "pg_read_binary_file", "pg_ls_dir", "lo_import", "lo_export",
+    "dblink", "dblink_exec", "set_config", "pg_reload_conf", "nextval", "setval",
+}
+
+JOIN_NODES = {"Nested Loop", "Hash Join", "Merge Join"}
+
+
+class SQLGuardError(Exception):
+    """실행 전 검사에서 SQL을 거절할 때 발생 (reason: parse_error | not_select | denied_function |
+    too_many_rows | too_expensive | explain_error)"""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _parse(sql: str):
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.errors import ParseError
+
+    try:
+        statements = [s for s in sqlglot.parse(sql, read="postgres") if s is not None]
+    except ParseError as e:
+        detail = e.errors[0] if e.errors else {}
+        raise SQLGuardError("parse_error", f"SQL 파싱 실패: {detail.get('description', 'invalid SQL')} "
+                                           f"(line {detail.get('line')}, col {detail.get('col')})")
+    if len(statements) != 1:
+        raise SQLGuardError("not_select", f"SQL 문은 1개만 허용됩니다 (입력: {len(statements)}개).")
+
+    tree = statements[0]
+    if not isinstance(tree, exp.Query):
+        raise SQLGuardError("not_select", f"SELECT 문만 허용됩니다 (입력: {tree.key.upper()}).")
+
+    writes = (exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create, exp.Drop, exp.Alter, exp.Command)
+    for node in tree.walk():
+        if isinstance(node, writes):
+            raise SQLGuardError("not_select", f"SELECT 안에 {node.key.upper()} 문은 허용되지 않습니다.")
+        if isinstance(node, exp.Select) and (node.args.get("into") or node.args.get("locks")):
+            raise SQLGuardError("not_select", "SELECT INTO / FOR UPDATE는 허용되지 않습니다.")
+        if isinstance(node, exp.Func):
+            name = (node.name if isinstance(node, exp.Anonymous) else node.sql_name()).lower()
+            if name in DENIED_FUNCTIONS:
+                raise SQLGuardError("denied_function", f"'{name}' 함수는 허용되지 않습니다.")
+    return tree
+
+
+def _limit_value(tree) -> int | None:
+    from sqlglot import exp
+
+    limit = tree.args.get("limit")
+    value = limit.expression if limit is not None else None
+    if isinstance(value, exp.Literal) and value.is_int:
+        return int(value.this)
+    return None
+
+
+def rewrite(sql: str, max_rows: int = SQL_GUARD_MAX_ROWS) -> tuple[str, int]:
+    """
+    SELECT 검사 후 LIMIT을 max_rows 이하로 주입/조정
+
+    Returns:
+        (재작성된 SQL, 적용된 LIMIT)
+    """
+    tree = _parse(sql)
+    current = _limit_value(tree)
+    if current is not None and current <= max_rows:
+        return sql.strip().rstrip(";").strip(), current  # 원문 유지
+    return tree.limit(max_rows).sql(dialect="postgres"), max_rows
+
+
+def _walk_plan(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk_plan(child)
+
+
+def estimate(sql: str) -> dict:
+    """EXPLAIN (FORMAT JSON)으로 예상 비용/행 수 조회 (실행하지 않음)"""
+    from sqlalchemy import text
+    from src.utils.db import get_engine
+
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text(f"SET LOCAL statement_timeout = {SQL_STATEMENT_TIMEOUT_MS}"))
+            raw = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql)).scalar()
+    except Exception as e:
+        raise SQLGuardError("explain_error", str(e))
+
+    plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+    join_rows = [node["Plan Rows"] for node in _walk_plan(plan) if node["Node Type"] in JOIN_NODES]
+    return {
+        "total_cost": plan["Total Cost"],
+        "startup_cost": plan["Startup Cost"],
+        "plan_rows": plan["Plan Rows"],
+        "max_join_rows": max(join_rows, default=0),
+        "node_type": plan["Node Type"],
+    }
+
+
+def guard(sql: str) -> tuple[str, dict]:
+    """
+    실행 가능한 SQL과 plan 예상치 반환 (거절 시 SQLGuardError)
+
+    Returns:
+        (SQL, {"total_cost", "startup_cost", "plan_rows", "max_join_rows", "node_type",
+               "limit", "downgraded", "statement_timeout_ms"})
+    """
+    sql, limit = rewrite(sql)
+    plan = estimate(sql)
+    if plan["max_join_rows"] > SQL_GUARD_MAX_JOIN_ROWS:
+        raise SQLGuardError(
+            "too_many_rows",
+            f"조인 결과 예상 {int(plan['max_join_rows']):,}행 (한도 {int(SQL_GUARD_MAX_JOIN_ROWS):,}행). "
+            f"조인 조건이 빠졌는지 확인하고 필터를 추가하세요.",
+        )
+
+    downgraded = False
+    if plan["total_cost"] > SQL_GUARD_MAX_COST and limit > SQL_GUARD_DOWNGRADE_ROWS:
+        sql, limit = rewrite(sql, SQL_GUARD_DOWNGRADE_ROWS)
+        plan = estimate(sql)
+        downgraded = True
+    if plan["total_cost"] > SQL_GUARD_MAX_COST:
+        raise SQLGuardError(
+            "too_expensive",
+            f"예상 비용 {plan['total_cost']:,.0f} (한도 {SQL_GUARD_MAX_COST:,.0f}). "
+            f"기간/장비 필터를 추가하거나 집계 테이블을 사용하세요.",
+        )
+
+    plan.update({"limit": limit, "downgraded": downgraded, "statement_timeout_ms": SQL_STATEMENT_TIMEOUT_MS})
+    return sql, plan
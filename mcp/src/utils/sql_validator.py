@@ -0,0 +1,187 @@
+# mcp/src/utils/sql_validator.py
+"""
+DB 왕복 없이 캐시된 스키마로 생성 SQL 검사 (text_to_sql)
+
+- 테이블/컬럼 이름이 실제 스키마에 있는지 확인 (CTE/서브쿼리 컬럼은 검사하지 않음)
+- PostgreSQL은 따옴표 없는 식별자를 소문자로 바꾸므로, 대소문자만 다른 이름(FDC, Lot_ID 등)은
+  실제 이름으로 따옴표를 붙여 자동 수정 (JOIN USING 포함) → LLM 재호출 불필요
+- 고칠 수 없는 오류는 유사한 이름 후보와 함께 반환 → 다음 프롬프트에 전달
+"""
+import difflib
+
+
+def _matches(identifier, name: str) -> bool:
+    """PostgreSQL 식별자 규칙으로 같은 이름인지 (따옴표 없으면 소문자로 접힘)"""
+    return identifier.this == name if identifier.quoted else identifier.this.lower() == name
+
+
+def _resolve(identifier, names) -> tuple[str | None, bool]:
+    """
+    실제 이름 찾기
+
+    Returns:
+        (실제 이름, 수정 필요 여부) — 없으면 (None, False)
+    """
+    for name in names:
+        if _matches(identifier, name):
+            return name, False
+    lower = identifier.this.lower()
+    candidates = [name for name in names if name.lower() == lower]
+    if len(candidates) == 1:
+        return candidates[0], True
+    return None, False
+
+
+def _exposes_names(scope) -> bool:
+    """scope의 SELECT 컬럼명을 바깥 쿼리가 참조하는지 (CTE/FROM 서브쿼리, 그 안의 UNION 분기)"""
+    while scope is not None:
+        if scope.is_cte or scope.is_derived_table:
+            return True
+        if not scope.is_set_operation:
+            return False
+        scope = scope.parent
+    return False
+
+
+def _suggest(name: str, names) -> str:
+    lower = {n.lower(): n for n in names}
+    close = [lower[n] for n in difflib.get_close_matches(name.lower(), list(lower), n=3, cutoff=0.5)]
+    return f" (비슷한 이름: {', '.join(close)})" if close else ""
+
+
+def validate_sql(sql: str, schemas: dict) -> dict:
+    """
+    Args:
+        schemas: get_table_schemas() 결과 {테이블: [{"column", "type"}, ...]}
+
+    Returns:
+        {"sql": 수정된 SQL (수정 없으면 원문), "fixes": [수정 내역], "errors": [오류 메시지]}
+    """
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.errors import ParseError, OptimizeError
+    from sqlglot.optimizer.scope import Scope, traverse_scope
+
+    try:
+        tree = sqlglot.parse_one(sql, read="postgres")
+    except ParseError as e:
+        detail = e.errors[0] if e.errors else {}
+        return {"sql": sql, "fixes": [], "errors": [
+            f"SQL 파싱 실패: {detail.get('description', 'invalid SQL')} (line {detail.get('line')}, col {detail.get('col')})"
+        ]}
+
+    columns = {table: [c["column"] for c in cols] for table, cols in schemas.items()}
+    fixes, errors = [], []
+    cte_names = {cte.alias_or_name for cte in tree.find_all(exp.CTE)}
+
+    # 1. 테이블
+    table_of: dict[int, str] = {}
+    for table in tree.find_all(exp.Table):
+        if not table.name or table.name in cte_names:
+            continue
+        if table.db and table.db.lower() != "public":
+            continue  # information_schema 등 다른 스키마
+        real, fix = _resolve(table.this, columns)
+        if real is None:
+            errors.append(f"테이블 '{table.name}'이(가) 없습니다{_suggest(table.name, columns)}.")
+            continue
+        if fix:
+            fixes.append(f"테이블 {table.name} → \"{real}\"")
+            if not table.alias:
+                # 다른 곳의 mi.lot_id 같은 한정자가 그대로 동작하도록 원래 이름을 alias로 유지
+                table.set("alias", exp.TableAlias(this=table.this.copy()))
+            table.set("this", exp.to_identifier(real, quoted=True))
+        table_of[id(table)] = real
+
+    # 2. 컬럼 (scope별로 FROM 절의 실제 테이블 기준)
+    try:
+        scopes = traverse_scope(tree)
+    except OptimizeError as e:
+        return {"sql": sql, "fixes": fixes, "errors": errors + [f"SQL 구조 분석 실패: {e}"]}
+
+    def scope_sources(scope) -> tuple[dict, bool]:
+        """scope의 {alias: 실제 테이블}, 파생 소스(CTE/서브쿼리) 포함 여부"""
+        sources, derived = {}, False
+        for alias, source in scope.sources.items():
+            if isinstance(source, Scope) or id(source) not in table_of:
+                derived = True
+                continue
+            sources[alias] = table_of[id(source)]
+        return sources, derived
+
+    # traverse_scope는 안쪽 scope부터 반환하고, 바깥 scope.columns에도 서브쿼리 컬럼이 포함되므로
+    # 각 컬럼은 처음 나타난(가장 안쪽) scope에서만 검사
+    seen = set()
+    for scope in scopes:
+        # JOIN ... USING (컬럼): 식별자가 Column이 아니므로 scope.columns에 포함되지 않음
+        if isinstance(scope.expression, exp.Select):
+            sources, derived = scope_sources(scope)
+            names = list(dict.fromkeys(c for table in sources.values() for c in columns[table]))
+            for join in scope.expression.args.get("joins") or []:
+                for identifier in list(join.args.get("using") or []):
+                    real, fix = _resolve(identifier, names)
+                    if real is None:
+                        if not derived:
+                            where = ", ".join(sorted(set(sources.values())))
+                            errors.append(f"USING 컬럼 '{identifier.name}'이(가) {where}에 없습니다"
+                                          f"{_suggest(identifier.name, names)}.")
+                    elif fix:
+                        fixes.append(f"컬럼 {identifier.name} → \"{real}\"")
+                        identifier.replace(exp.to_identifier(real, quoted=True))
+
+        # 자기 scope → 바깥 scope 순으로 이름 해석 (상관 서브쿼리)
+        chain = []
+        current = scope
+        while current is not None:
+            chain.append((current, *scope_sources(current)))
+            current = current.parent
+        # ORDER BY / GROUP BY에서 참조하는 SELECT 별칭
+        select_aliases = {e.alias for e in scope.expression.expressions if isinstance(e, exp.Alias)} \
+            if isinstance(scope.expression, exp.Select) else set()
+
+        for column in scope.columns:
+            if id(column) in seen:
+                continue
+            seen.add(id(column))
+            if isinstance(column.this, exp.Star) or (not column.table and column.name in select_aliases):
+                continue
+
+            real = fix = None
+            searched = []
+            skip = False  # 파생 소스(CTE/서브쿼리)나 알 수 없는 alias는 DB에서 확인
+            for current, sources, derived in chain:
+                if column.table:
+                    if column.table in current.sources and column.table not in sources:
+                        skip = True
+                        break
+                    if column.table not in sources:
+                        continue
+                    candidates = [sources[column.table]]
+                else:
+                    if derived:
+                        skip = True
+                        break
+                    candidates = list(dict.fromkeys(sources.values()))
+                names = list(dict.fromkeys(c for table in candidates for c in columns[table]))
+                real, fix = _resolve(column.this, names)
+                searched += candidates
+                if real is not None or column.table:
+                    break
+
+            if real is None:
+                # 서브쿼리 안이거나 해석할 수 없는 컬럼은 오류로 보고하지 않음 (올바른 SQL의 재시도 방지)
+                if skip or not searched or (not column.table and len(chain) > 1):
+                    continue
+                names = [c for table in searched for c in columns[table]]
+                where = ", ".join(sorted(set(searched)))
+                errors.append(f"컬럼 '{column.name}'이(가) {where}에 없습니다{_suggest(column.name, names)}.")
+            elif fix:
+                fixes.append(f"컬럼 {column.name} → \"{real}\"")
+                original = column.this.copy()
+                column.set("this", exp.to_identifier(real, quoted=True))
+                # 서브쿼리/CTE가 내보내는 컬럼이면 바깥의 t.lot_id 같은 참조가 그대로 동작하도록 원래 이름을 별칭으로 유지
+                if column.parent is scope.expression and column.arg_key == "expressions" and _exposes_names(scope):
+                    column.replace(exp.alias_(column.copy(), original))
+
+    fixed_sql = tree.sql(dialect="postgres") if fixes else sql
+    return {"sql": fixed_sql, "fixes": fixes, "errors": errors}
@@ -0,0 +1,305 @@
+# mcp/src/utils/worker_pool.py
+import asyncio
+import atexit
+import importlib
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# CPU 연산이 큰 도구 (text_to_sql은 DB/LLM 대기 위주라 풀 대신 스레드(asyncio.to_thread)에서 DB 호출 실행)
+DEFAULT_POOL_TOOLS = [
+    "correlation_analysis",
+    "regression_analysis",
+    "anova_test",
+    "t_test",
+    "chi_square_test",
+    "pca_analysis",
+    "time_series_analysis",
+    "control_chart_analysis",
+    "generate_plot",
+]
+
+# 공유 메모리로 전달할 numpy dtype 종류 (bool, int, uint, float, datetime)
+_SHAREABLE_KINDS = "biufM"
+
+
+class _Worker:
+    """워커 프로세스 1개 (Pipe로 작업 1개씩 주고받음)"""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, task: tuple) -> tuple:
+        """작업을 보내고 결과를 기다림 (스레드에서 실행, 프로세스가 종료되면 ("dead", None))"""
+        try:
+            self.conn.send(task)
+            return self.conn.recv()
+        except (EOFError, OSError):
+            return "dead", None
+
+    def stop(self) -> None:
+        # 실행 중 작업은 중단할 방법이 없으므로 이 워커만 종료 (다른 워커의 작업은 영향 없음)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class WorkerPool:
+    """
+    CPU 연산 도구를 별도 프로세스에서 실행하는 풀
+
+    - 동시 실행 제한은 admission 계층 (src.utils.admission)에서 적용, 풀은 워커 수만큼만 동시에 실행
+    - 실행 타임아웃 및 취소 시 그 호출을 실행 중인 워커만 종료하고 다음 호출 때 새로 생성
+      (ProcessPoolExecutor는 워커 1개가 죽으면 풀 전체가 broken 되어 다른 호출까지 실패하므로 사용하지 않음)
+    - 수치형 컬럼은 pickle 대신 shared memory로 전달
+    """
+
+    def __init__(self):
+        self.workers = int(os.getenv("MCP_WORKER_PROCESSES", str(os.cpu_count() or 1)))
+        self.timeout = float(os.getenv("MCP_TOOL_TIMEOUT_SEC", "120"))
+        self.min_rows = int(os.getenv("MCP_POOL_MIN_ROWS", "5000"))
+
+        pool_tools = os.getenv("MCP_POOL_TOOLS")
+        self.tools = set(pool_tools.split(",")) if pool_tools else set(DEFAULT_POOL_TOOLS)
+
+        self._context = None
+        self._idle: list[_Worker] = []
+        self._all: set[_Worker] = set()
+        self._busy = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._threads: ThreadPoolExecutor | None = None  # 워커 결과를 기다리는 스레드 (워커당 1개)
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def should_dispatch(self, name: str, kwargs: dict) -> bool:
+        """풀로 보낼 도구/데이터 크기인지 판단 (작은 입력은 프로세스 왕복 비용이 더 큼)"""
+        if not self.enabled or name not in self.tools or "data" not in kwargs:
+            return False
+
+        from src.utils.columnar import payload_shape
+        rows, _ = payload_shape(kwargs["data"])
+        return rows >= self.min_rows
+
+    async def run(self, name: str, module: str, kwargs: dict) -> dict:
+        """도구를 워커 프로세스에서 실행하고 결과 dict를 반환"""
+        start = time.perf_counter()
+        # DataFrame 변환과 shared memory 복사는 입력 크기에 비례하므로 이벤트 루프 밖에서 실행
+        share = asyncio.ensure_future(asyncio.to_thread(_share_kwargs, kwargs))
+        try:
+            payload, segments = await asyncio.shield(share)
+        except asyncio.CancelledError:
+            share.add_done_callback(_release_shared)  # 복사가 끝나면 세그먼트 해제
+            raise
+        except ValueError:
+            # 형식 오류는 도구의 검증 로직이 에러 메시지를 만들도록 그대로 실행
+            fn = getattr(importlib.import_module(module), name)
+            return await fn(**kwargs)
+
+        try:
+            worker = await self._acquire()
+            reuse = False
+            try:
+                call = asyncio.get_running_loop().run_in_executor(
+                    self._threads, worker.call, (module, name, payload))
+                status, value = await asyncio.wait_for(call, timeout=self.timeout)
+                reuse = status != "dead"
+            except asyncio.TimeoutError:
+                return {
+                    "tool_name": name,
+                    "error": f"실행 시간 초과 ({self.timeout:.0f}초)",
+                    "execution_time_ms": int((time.perf_counter() - start) * 1000),
+                }
+            finally:
+                # 타임아웃/취소(클라이언트 연결 종료 등)면 이 워커만 종료
+                self._release(worker, reuse)
+        finally:
+            _unlink(segments)
+
+        if status == "dead":
+            # execution_time_ms는 서버가 실제 소요 시간으로 채움
+            return {"tool_name": name, "error": "워커 프로세스가 비정상 종료되었습니다."}
+        if status == "error":
+            raise value
+        return value
+
+    async def _acquire(self) -> _Worker:
+        """유휴 워커를 받거나 새로 생성 (워커 수만큼 실행 중이면 대기)"""
+        while self._busy >= self.workers:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()  # 깨워진 직후 취소되면 다음 대기자에게 넘김
+                else:
+                    self._waiters.remove(waiter)
+                raise
+        self._busy += 1
+
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.process.is_alive():
+                return worker
+            self._all.discard(worker)
+        try:
+            return self._spawn()
+        except BaseException:
+            self._busy -= 1
+            self._wake()
+            raise
+
+    def _spawn(self) -> _Worker:
+        if self._context is None:
+            self._context = multiprocessing.get_context("forkserver")
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="worker-pool")
+        multiprocessing.active_children()  # 종료된 워커 프로세스 회수
+        worker = _Worker(self._context)
+        self._all.add(worker)
+        return worker
+
+    def _release(self, worker: _Worker, reuse: bool) -> None:
+        self._busy -= 1
+        if reuse:
+            self._idle.append(worker)
+        else:
+            worker.stop()
+            self._all.discard(worker)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def shutdown(self) -> None:
+        for worker in list(self._all):
+            worker.stop()
+        self._all.clear()
+        self._idle.clear()
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+
+
+def _share_kwargs(kwargs: dict) -> tuple[dict, list]:
+    """data 인자의 수치형 컬럼을 shared memory에 올리고 (전달 payload, 세그먼트 목록) 반환"""
+    import numpy as np
+    import pandas as pd
+    from src.utils.columnar import is_columnar, columnar_to_dataframe
+
+    data = kwargs["data"]
+    if is_columnar(data):
+        df = columnar_to_dataframe(data)
+    elif isinstance(data, list):
+        df = pd.DataFrame(data)
+    else:
+        raise ValueError("지원하지 않는 data 형식")
+
+    columns = {}
+    segments = []
+    try:
+        for name in df.columns:
+            values = df[name].to_numpy()
+            if values.dtype.kind in _SHAREABLE_KINDS and values.nbytes > 0:
+                values = np.ascontiguousarray(values)
+                shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+                segments.append(shm)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+                columns[name] = ("shm", shm.name, values.dtype.str, len(values))
+            else:
+                columns[name] = ("raw", values.tolist())
+    except Exception:
+        _unlink(segments)
+        raise
+
+    payload = {k: v for k, v in kwargs.items() if k != "data"}
+    payload["data"] = columns
+    return payload, segments
+
+
+def _unlink(segments: list) -> None:
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+
+
+def _release_shared(share: asyncio.Future) -> None:
+    """호출이 취소된 뒤 끝난 _share_kwargs의 세그먼트 해제"""
+    if not share.cancelled() and share.exception() is None:
+        _unlink(share.result()[1])
+
+
+def _worker_main(conn) -> None:
+    """워커 프로세스 루프: 작업을 받아 실행하고 ("ok", 결과) 또는 ("error", 예외)를 반환"""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = "ok", _run_in_worker(*task)
+        except Exception as e:
+            reply = "error", e
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # 결과/예외를 pickle할 수 없는 경우
+            conn.send(("error", RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+def _run_in_worker(module: str, name: str, payload: dict) -> dict:
+    """shared memory 컬럼을 연결하여 도구 실행"""
+    import gc
+    import numpy as np
+
+    segments = []
+    columns = {}
+    for col, spec in payload["data"].items():
+        if spec[0] == "shm":
+            _, shm_name, dtype, length = spec
+            shm = _attach(shm_name)
+            segments.append(shm)
+            columns[col] = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf)
+        else:
+            columns[col] = spec[1]
+
+    kwargs = dict(payload)
+    kwargs["data"] = {"columns": columns}
+    try:
+        fn = getattr(importlib.import_module(module), name)
+        return asyncio.run(fn(**kwargs))
+    finally:
+        del kwargs, columns
+        gc.collect()
+        for shm in segments:
+            try:
+                shm.close()
+            except BufferError:
+                # 결과 객체가 버퍼를 참조 중이면 프로세스 종료 시 해제됨
+                pass
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """부모가 unlink 하므로 워커에서는 resource_tracker 추적 없이 연결"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # 3.12 이하: 워커는 부모의 resource_tracker를 공유하므로 등록이 중복되지 않음
+        return shared_memory.SharedMemory(name=name)
+
+
+worker_pool = WorkerPool()
+atexit.register(worker_pool.shutdown)